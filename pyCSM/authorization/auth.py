@@ -1,14 +1,19 @@
 # Copyright (C) 2022 IBM CORPORATION
 # Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
 
-import json
+import threading
+import time
 import warnings
-import requests
+from pyCSM.authorization import token_cache
+from pyCSM.util import json_backend, transport
 
 properties = {
     "language": "en-US",
     "verify": False,
-    "cert": None
+    "cert": None,
+    "token_lifetime": 1800,
+    "token_refresh_margin": 60,
+    "token_cache_file": None
 }
 
 
@@ -63,7 +68,200 @@ def get_token(url, username, password):
         "password": password
     }
     warnings.filterwarnings("ignore")
-    resp = requests.post(tk_url, headers=auth_headers,
-                         data=params, verify=properties["verify"], cert=properties["cert"])
-    tk = json.loads(resp.text)['token']
+    resp = transport.post(tk_url, headers=auth_headers,
+                          data=params, verify=properties["verify"], cert=properties["cert"])
+    tk = json_backend.loads(resp.content)['token']
     return tk
+
+
+_token_managers = {}
+_token_managers_lock = threading.Lock()
+
+
+class tokenManager:
+    """
+    The tokenManager class holds the REST token for one user on one CSM server.
+    A single manager is shared by every client created for the same base url and username
+    so that the clients log in once and refresh the token once when it expires.
+    Use get_token_manager() to obtain the shared manager rather than creating one directly.
+
+    The manager is safe to share between threads.  When several calls fail with an expired token at the
+    same time only one of them logs in again, the others wait for that login and then use the new token.
+
+    The manager also tracks the age of the token and refreshes it just before it is used once it is older than
+    the "token_lifetime" property less the "token_refresh_margin" property (both in seconds), so most calls never
+    pay the extra round trips of a 401 followed by a login and a retry.  Set "token_lifetime" to None to only
+    refresh after a 401.  get_statistics() reports how often each kind of refresh happened.
+
+    Set the "token_cache_file" property to a file path (ex. "~/.pyCSM/tokens.json") to share tokens between
+    processes.  New managers reuse a cached token that is still within its lifetime instead of logging in, and
+    every new token is written back to the file.  A cached token that the server no longer accepts is replaced
+    through the normal 401 refresh.
+    """
+
+    def __init__(self, url, username, password=None, token=None):
+        """
+        Creates a token manager for the given server and user.
+
+        Args:
+            url (str): Base url of csm server ex. https://servername:port/CSM/web.
+            username (str): username for server login.
+            password (str): (Optional) password for server login.  Required to log in or refresh the token.
+            token (str): (Optional) existing token to use until it expires.
+        """
+        self.url = url
+        self.username = username
+        self.password = password
+        self.token = None
+        self.token_time = None
+        self._lock = threading.Lock()
+        self._statistics = {
+            "logins": 0,
+            "proactive_refreshes": 0,
+            "expired_refreshes": 0
+        }
+        if token is not None:
+            self.set_token(token)
+
+    def set_token(self, token):
+        """
+        Replaces the current token with one obtained elsewhere.  The token is treated as newly issued.
+
+        Args:
+            token (str): REST token for the server.
+        """
+        self.token = token
+        self.token_time = time.monotonic()
+
+    def get_token(self):
+        """
+        Returns the current token, logging in to the server first if no token has been obtained yet
+        and refreshing it first if it is about to expire.
+
+        Returns:
+            Returns a token string to be used to make future rest calls to the server.
+        """
+        token = self.token
+        if token is not None and not self._is_expiring():
+            return token
+        with self._lock:
+            if self.token is None:
+                if not self._load_cached_token():
+                    self._new_token()
+            elif self._is_expiring():
+                if not self._load_cached_token(self.token):
+                    self._new_token()
+                self._statistics["proactive_refreshes"] += 1
+            return self.token
+
+    def refresh_token(self, stale_token=None):
+        """
+        Obtains a new token from the server after a call failed because its token expired.
+
+        Args:
+            stale_token (str): (Optional) The token that was rejected by the server.  If another caller already
+                replaced that token, the current token is returned without logging in again.
+
+        Returns:
+            Returns the new token string.
+        """
+        with self._lock:
+            if stale_token is not None and self.token is not None and stale_token != self.token:
+                return self.token
+            if not self._load_cached_token(stale_token):
+                self._new_token()
+            self._statistics["expired_refreshes"] += 1
+            return self.token
+
+    def get_statistics(self):
+        """
+        Returns a dictionary with the number of logins, the number of refreshes made before the token expired
+        ("proactive_refreshes") and the number of refreshes made after a call failed with a 401
+        ("expired_refreshes").
+        """
+        with self._lock:
+            return dict(self._statistics)
+
+    def _is_expiring(self):
+        if self.password is None or self.token_time is None:
+            return False
+        return self._is_too_old(time.monotonic() - self.token_time)
+
+    @staticmethod
+    def _is_too_old(age):
+        lifetime = properties["token_lifetime"]
+        return lifetime is not None and age >= lifetime - properties["token_refresh_margin"]
+
+    def _load_cached_token(self, stale_token=None):
+        cache_file = properties["token_cache_file"]
+        if cache_file is None:
+            return False
+        cached = token_cache.load_token(cache_file, self.url, self.username)
+        if cached is None:
+            return False
+        token, age = cached
+        if token == stale_token or self._is_too_old(age):
+            return False
+        self.token = token
+        self.token_time = time.monotonic() - age
+        return True
+
+    def _new_token(self):
+        self.set_token(self._login())
+        cache_file = properties["token_cache_file"]
+        if cache_file is not None:
+            token_cache.store_token(cache_file, self.url, self.username, self.token)
+
+    def _login(self):
+        if self.password is None:
+            raise ValueError(f"A password is required to obtain a token for {self.username} on {self.url}")
+        token = get_token(self.url, self.username, self.password)
+        self._statistics["logins"] += 1
+        return token
+
+
+def get_token_manager(url, username, password=None, token=None):
+    """
+    Returns the token manager shared by all clients for the given server and user,
+    creating it if one does not exist yet.
+
+    Args:
+        url (str): Base url of csm server ex. https://servername:port/CSM/web.
+        username (str): username for server login.
+        password (str): (Optional) password for server login.  Replaces the password held by an existing manager.
+        token (str): (Optional) existing token to use if the manager does not hold a token yet.
+
+    Returns:
+        Returns the tokenManager for the server and user.
+    """
+    key = (url, username)
+    with _token_managers_lock:
+        manager = _token_managers.get(key)
+        if manager is None:
+            manager = tokenManager(url, username, password, token)
+            _token_managers[key] = manager
+            return manager
+    with manager._lock:
+        if password is not None:
+            manager.password = password
+        if token is not None and manager.token is None:
+            manager.set_token(token)
+    return manager
+
+
+def request_token(resp):
+    """
+    Returns the token that was sent on the request for the given response.
+    Pass this to tokenManager.refresh_token() after a call fails with a 401 so that concurrent
+    failures with the same token cause a single login.
+
+    Args:
+        resp (requests.Response): The response of a failed REST call.
+
+    Returns:
+        The X-Auth-Token header value of the request, or None if there was none.
+    """
+    request = getattr(resp, "request", None)
+    if request is None:
+        return None
+    return request.headers.get("X-Auth-Token")
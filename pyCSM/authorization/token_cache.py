@@ -0,0 +1,111 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def _key(url, username):
+    return f"{username}@{url}"
+
+
+@contextmanager
+def _locked(path):
+    if fcntl is None:
+        yield
+        return
+    fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def _read(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write(path, entries):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tokens-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _prepare(path):
+    path = os.path.abspath(os.path.expanduser(path))
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    return path
+
+
+def load_token(path, url, username):
+    """
+    Reads the cached token for the given server and user from the token cache file.
+
+    Args:
+        path (str): Path of the token cache file.  ex. ~/.pyCSM/tokens.json
+        url (str): Base url of csm server ex. https://servername:port/CSM/web.
+        username (str): username for server login.
+
+    Returns:
+        A tuple of the token and its age in seconds, or None if no token is cached.
+    """
+    path = _prepare(path)
+    with _locked(path):
+        entry = _read(path).get(_key(url, username))
+    if entry is None:
+        return None
+    return entry["token"], max(0.0, time.time() - entry["issued"])
+
+
+def store_token(path, url, username, token):
+    """
+    Saves a newly issued token for the given server and user in the token cache file.
+    The file is only readable and writable by the current user, and is replaced atomically
+    under a file lock so that concurrent processes can share it.
+
+    Args:
+        path (str): Path of the token cache file.  ex. ~/.pyCSM/tokens.json
+        url (str): Base url of csm server ex. https://servername:port/CSM/web.
+        username (str): username for server login.
+        token (str): REST token for the server.
+    """
+    path = _prepare(path)
+    with _locked(path):
+        entries = _read(path)
+        entries[_key(url, username)] = {"token": token, "issued": time.time()}
+        _write(path, entries)
+
+
+def remove_token(path, url, username):
+    """
+    Removes the cached token for the given server and user from the token cache file.
+
+    Args:
+        path (str): Path of the token cache file.  ex. ~/.pyCSM/tokens.json
+        url (str): Base url of csm server ex. https://servername:port/CSM/web.
+        username (str): username for server login.
+    """
+    path = _prepare(path)
+    with _locked(path):
+        entries = _read(path)
+        if entries.pop(_key(url, username), None) is not None:
+            _write(path, entries)
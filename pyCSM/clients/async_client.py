@@ -0,0 +1,402 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import asyncio
+import functools
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import pyCSM.authorization.auth as auth
+import pyCSM.util.transport as transport
+from pyCSM.clients.hardware_client import hardwareClient
+from pyCSM.clients.session_client import sessionClient
+from pyCSM.clients.system_client import systemClient
+
+properties = {
+    "max_workers_per_server": 10
+}
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_properties():
+    """
+    Returns a dictionary of the current async client properties and
+    their values set for the file.
+    """
+    return properties
+
+
+def change_properties(property_dictionary):
+    """
+    Takes a dictionary of async client properties and the values that
+    user wants to change and changes them in the file.
+    Workers that are already started keep their number until shutdown() is called.
+
+    Args:
+        property_dictionary (dict): Dictionary of the keys and values that need
+        to be changed in the file.
+        ex. {"max_workers_per_server": 32}
+
+    Return:
+        Returns the new properties dictionary.
+    """
+    for key in property_dictionary:
+        properties[key] = property_dictionary[key]
+    return properties
+
+
+def _get_executor(url):
+    key = transport._server_key(url)
+    with _executors_lock:
+        executor = _executors.get(key)
+        if executor is None:
+            executor = _executors[key] = ThreadPoolExecutor(max_workers=properties["max_workers_per_server"],
+                                                            thread_name_prefix="pyCSM-async")
+        return executor
+
+
+def shutdown():
+    """
+    Waits for running calls to finish and stops the worker threads used by the async clients.
+    The workers are started again automatically on the next call.
+    """
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=True)
+
+
+class _asyncClient:
+    _client_class = None
+
+    def __init__(self, server_address, server_port, username, password=None, token=None, token_manager=None):
+        """
+        Creates an async client for the server.  No call is made to the server until the first method
+        is awaited, which logs in through the token manager shared with all other clients for the same
+        server and username.
+
+        Args:
+            server_address(str): IP address or hostname of the CSM server.
+            server_port (str): The port of the CSM server.
+            username (str): username for server login.
+            password (str): password for server login.  May be omitted when a token or token_manager is passed in.
+            token (str): (Optional) existing token to use instead of logging in.
+            token_manager (tokenManager): (Optional) token manager to share with other clients.
+        """
+        self.server_address = server_address
+        self.server_port = server_port
+        self.username = username
+        self.password = password
+        self.base_url = f"https://{server_address}:{server_port}/CSM/web"
+        if token_manager is None:
+            token_manager = auth.get_token_manager(self.base_url, username, password, token)
+        self.token_manager = token_manager
+        self._client = None
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(self.base_url), functools.partial(func, *args, **kwargs))
+
+    async def _get_client(self):
+        if self._client is None:
+            self._client = await self._run(self._client_class, self.server_address, self.server_port,
+                                           self.username, self.password, token_manager=self.token_manager,
+                                           **self._client_kwargs())
+        return self._client
+
+    def _client_kwargs(self):
+        return {}
+
+    async def close(self):
+        """
+        Closes the pooled connections to the CSM server used by this client.
+        The connections are shared with any other client or service call made to the same server and
+        are reopened automatically on the next call.
+        """
+        transport.close(self.base_url)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+class _cachedAsyncClient(_asyncClient):
+
+    def __init__(self, server_address, server_port, username, password=None, token=None, token_manager=None,
+                 response_cache=None):
+        """
+        Creates an async client for the server.  No call is made to the server until the first method
+        is awaited, which logs in through the token manager shared with all other clients for the same
+        server and username.
+
+        Args:
+            server_address(str): IP address or hostname of the CSM server.
+            server_port (str): The port of the CSM server.
+            username (str): username for server login.
+            password (str): password for server login.  May be omitted when a token or token_manager is passed in.
+            token (str): (Optional) existing token to use instead of logging in.
+            token_manager (tokenManager): (Optional) token manager to share with other clients.
+            response_cache (responseCache): (Optional) cache for the responses of slow changing GET calls.
+        """
+        super().__init__(server_address, server_port, username, password, token, token_manager)
+        self.response_cache = response_cache
+
+    def _client_kwargs(self):
+        return {"response_cache": self.response_cache}
+
+
+def _async_method(client_class, name):
+    sync_method = getattr(client_class, name)
+
+    @functools.wraps(sync_method)
+    async def method(self, *args, **kwargs):
+        client = await self._get_client()
+        return await self._run(getattr(client, name), *args, **kwargs)
+
+    return method
+
+
+def _async_static_method(client_class, name):
+    # Static methods, such as get_properties, do not call the server, so they do not need to log in
+    sync_method = getattr(client_class, name)
+
+    @functools.wraps(sync_method)
+    async def method(self, *args, **kwargs):
+        return sync_method(*args, **kwargs)
+
+    return method
+
+
+def _async_generator_method(client_class, name):
+    # Each item of the generator is read on a worker thread, so the event loop is not blocked between items
+    sync_method = getattr(client_class, name)
+    end = object()
+
+    @functools.wraps(sync_method)
+    async def method(self, *args, **kwargs):
+        client = await self._get_client()
+        generator = getattr(client, name)(*args, **kwargs)
+        try:
+            while True:
+                item = await self._run(next, generator, end)
+                if item is end:
+                    return
+                yield item
+        finally:
+            await self._run(generator.close)
+
+    return method
+
+
+def _add_async_methods(cls):
+    for name, value in vars(cls._client_class).items():
+        if name.startswith("_") or name in vars(_asyncClient) or name in vars(cls) or isinstance(value, property):
+            continue
+        func = value.__func__ if isinstance(value, staticmethod) else value
+        if not callable(func):
+            continue
+        if isinstance(value, staticmethod):
+            setattr(cls, name, _async_static_method(cls._client_class, name))
+        elif inspect.isgeneratorfunction(func):
+            setattr(cls, name, _async_generator_method(cls._client_class, name))
+        else:
+            setattr(cls, name, _async_method(cls._client_class, name))
+    return cls
+
+
+@_add_async_methods
+class asyncSessionClient(_asyncClient):
+    """
+        The asyncSessionClient class is the asyncio counterpart of the sessionClient class.
+        It has the same methods as the sessionClient, each of which is awaited.
+        ex. ``info = await client.get_session_info(name)``
+        The generator methods, whose names start with "iter_", are async iterators instead.
+        ex. ``async for name, result in client.iter_wait_for_states(session_states):``
+|
+        The REST calls run on worker threads, with a separate set of "max_workers_per_server" threads for each
+        server, and use the same pooled connections and shared token manager as the blocking clients.  A token
+        that expires is refreshed once and the call retried as in the sessionClient.
+        wait_for_state, wait_for_states and iter_wait_for_states wait between polls with asyncio.sleep, so a
+        worker is only used while a poll is running.  The other long running methods, ex. add_copysets_bulk,
+        hold a worker until they return, and calls to a server beyond its number of workers wait for a free one.
+|
+    """
+    _client_class = sessionClient
+
+    async def wait_for_state(self, ses_name, state, minutes, debug=False,
+                             initial_interval=1, max_interval=30, backoff=2):
+        """
+        Runs until the session is in a given state
+        or until it times out and returns the results.
+        The session is polled after a short initial interval which grows by the backoff factor
+        after each poll up to the maximum interval.
+
+        Args:
+            ses_name (str): The name of the session.
+            state (str): state of the server that user wants to wait for.
+            minutes (double): number of minutes before it times out
+            debug (boolean): True if you want the state and status to print in console
+            initial_interval (double): seconds to wait before the second poll
+            max_interval (double): maximum number of seconds to wait between polls
+            backoff (double): factor the interval is multiplied by after each poll
+
+        Returns:
+            A dictionary with "state_reached": boolean for whether the state was reached,
+            "session_info": JSON string representing the response of the command,
+            "polls": the number of times the session was queried and
+            "elapsed_seconds": the number of seconds until the state was seen or the wait ended
+        """
+        start_time = time.monotonic()
+        end_time = start_time + minutes * 60
+        interval = initial_interval
+        polls = 0
+        while True:
+            resp = await self.get_session_info(ses_name)
+            polls += 1
+            now = time.monotonic()
+            result = {"state_reached": False, "session_info": resp,
+                      "polls": polls, "elapsed_seconds": now - start_time}
+            if resp.status_code == 401:
+                return result
+            info = resp.json()
+            if str(info['state']) == state:
+                if debug:
+                    print(f"Session has reached {state} state.")
+                result["state_reached"] = True
+                return result
+            if now >= end_time:
+                if debug:
+                    print(f'Timeout: Command exceeded {minutes} minutes.')
+                return result
+            if debug:
+                print("Status: " + info['status'] + ", State: " + info['state'])
+            await asyncio.sleep(min(interval, end_time - now))
+            interval = min(interval * backoff, max_interval)
+
+    async def iter_wait_for_states(self, session_states, minutes=5, initial_interval=1, max_interval=30, backoff=2):
+        """
+        Waits for many sessions to reach their states using a single get_session_overviews poll
+        per interval for all of them, instead of polling each session on its own.
+        Each session is reported as soon as the poll that shows it in its state returns.
+        The sessions that have not reached their states when the time runs out are reported last.
+        A poll that fails, ex. with a server error or a dropped connection, counts as a missed interval
+        and polling continues until the time runs out.
+
+        Args:
+            session_states (dict): Dictionary of session names and the state to wait for in each.
+                ex. {"SessA": "Prepared", "SessB": "Target Available"}
+            minutes (double): number of minutes before it times out
+            initial_interval (double): seconds to wait before the second poll
+            max_interval (double): maximum number of seconds to wait between polls
+            backoff (double): factor the interval is multiplied by after each poll
+
+        Returns:
+            An async iterator of (name, result) tuples where result is a dictionary with
+            "state_reached": boolean for whether the state was reached,
+            "session_info": the overview of the session from the last poll, or None if it was not listed,
+            "polls": the number of polls made,
+            "elapsed_seconds": the number of seconds until the state was seen or the wait ended and
+            "error": the exception raised by the last poll that failed, or None
+        """
+        start_time = time.monotonic()
+        deadline = start_time + minutes * 60
+        pending = dict(session_states)
+        interval = initial_interval
+        polls = 0
+        overviews = {}
+        error = None
+        while pending:
+            polls += 1
+            try:
+                resp = await self.get_session_overviews()
+                resp.raise_for_status()
+                overviews = {str(overview["name"]): overview for overview in resp.json()}
+                polled = True
+            except (requests.exceptions.RequestException, ValueError) as e:
+                error = e
+                polled = False
+            now = time.monotonic()
+            for name, state in list(pending.items()):
+                overview = overviews.get(name)
+                if polled and overview is not None and str(overview["state"]) == state:
+                    del pending[name]
+                    yield name, {"state_reached": True, "session_info": overview,
+                                 "polls": polls, "elapsed_seconds": now - start_time, "error": error}
+            if pending and now >= deadline:
+                for name in pending:
+                    yield name, {"state_reached": False, "session_info": overviews.get(name),
+                                 "polls": polls, "elapsed_seconds": now - start_time, "error": error}
+                return
+            if pending:
+                await asyncio.sleep(min(interval, deadline - now))
+                interval = min(interval * backoff, max_interval)
+
+    async def wait_for_states(self, session_states, minutes=5, callback=None,
+                              initial_interval=1, max_interval=30, backoff=2):
+        """
+        Runs until all the given sessions are in their states or until it times out and returns the results.
+        All sessions are resolved from one get_session_overviews poll per interval.
+
+        Args:
+            session_states (dict): Dictionary of session names and the state to wait for in each.
+                ex. {"SessA": "Prepared", "SessB": "Target Available"}
+            minutes (double): number of minutes before it times out
+            callback (function): (Optional) Called with (name, result) as each session completes.
+            initial_interval (double): seconds to wait before the second poll
+            max_interval (double): maximum number of seconds to wait between polls
+            backoff (double): factor the interval is multiplied by after each poll
+
+        Returns:
+            A dictionary keyed by session name.  Each value is the result dictionary
+            described in iter_wait_for_states.
+        """
+        results = {}
+        async for name, result in self.iter_wait_for_states(session_states, minutes, initial_interval,
+                                                            max_interval, backoff):
+            results[name] = result
+            if callback is not None:
+                callback(name, result)
+        return results
+
+
+@_add_async_methods
+class asyncHardwareClient(_cachedAsyncClient):
+    """
+        The asyncHardwareClient class is the asyncio counterpart of the hardwareClient class.
+        It has the same methods as the hardwareClient, each of which is awaited.
+        ex. ``volumes = await client.get_volumes(system_name)``
+        The generator methods, whose names start with "iter_", are async iterators instead.
+        ex. ``async for volume in client.iter_volumes(system_name):``
+|
+        The REST calls run on worker threads, with a separate set of "max_workers_per_server" threads for each
+        server, and use the same pooled connections and shared token manager as the blocking clients.  A token
+        that expires is refreshed once and the call retried as in the hardwareClient.  Each call holds a
+        worker until it returns, and calls to a server beyond its number of workers wait for a free one.
+|
+    """
+    _client_class = hardwareClient
+
+
+@_add_async_methods
+class asyncSystemClient(_cachedAsyncClient):
+    """
+        The asyncSystemClient class is the asyncio counterpart of the systemClient class.
+        It has the same methods as the systemClient, each of which is awaited.
+        ex. ``version = await client.get_server_version()``
+|
+        The REST calls run on worker threads, with a separate set of "max_workers_per_server" threads for each
+        server, and use the same pooled connections and shared token manager as the blocking clients.  A token
+        that expires is refreshed once and the call retried as in the systemClient.  Each call holds a
+        worker until it returns, and calls to a server beyond its number of workers wait for a free one.
+|
+    """
+    _client_class = systemClient
@@ -0,0 +1,170 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class backupArchive:
+    """
+        The backupArchive class keeps server backups downloaded with systemClient.backup_server_and_download
+        in a directory, storing each distinct backup only once.  Every download is hashed while it is written,
+        and a backup with the same content as one already in the archive only adds an entry to the index,
+        so disk use grows with the number of changed backups rather than with the number of backups taken.
+|
+        The directory holds an "objects" directory with one file per distinct backup, named by its checksum,
+        and an "index.json" file listing the server, time and checksum of every backup taken.
+|
+    """
+
+    def __init__(self, directory, keep_last=None, max_age_days=None):
+        """
+        Opens the archive in the given directory, creating it if needed.
+
+        Args:
+            directory (str): Directory to keep the archive in.
+            keep_last (int): (Optional) Number of most recent backups to keep for each server.
+            max_age_days (double): (Optional) Number of days after which a backup is removed.
+                The most recent backup of each server is always kept.
+        """
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.objects_directory = os.path.join(self.directory, "objects")
+        self.index_file = os.path.join(self.directory, "index.json")
+        self.keep_last = keep_last
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        os.makedirs(self.objects_directory, exist_ok=True)
+
+    def _read_index(self):
+        try:
+            with open(self.index_file, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+
+    def _write_index(self, entries):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".index-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f, indent=2)
+            os.replace(tmp_path, self.index_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _object_file(self, checksum):
+        return os.path.join(self.objects_directory, checksum.replace(":", "-"))
+
+    def backup(self, client, chunk_size=None, callback=None):
+        """
+        Creates and downloads a backup of the server the client is connected to and adds it to the archive,
+        then applies the retention policy.
+
+        Args:
+            client (systemClient): Client for the server to back up.
+            chunk_size (int): (Optional) Number of bytes written at a time.
+                Defaults to the transport "chunk_size" property.
+            callback (function): (Optional) Called with (bytes_written, total_bytes) as the download progresses.
+
+        Returns:
+            The index entry for the backup, a dictionary with the "server", "timestamp", "checksum",
+            "size" and whether the content was "new" to the archive.
+            A requests.exceptions.HTTPError is raised if the backup could not be downloaded.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".backup-")
+        os.close(fd)
+        try:
+            resp = client.backup_server_and_download(tmp_path, chunk_size, callback)
+            resp.raise_for_status()
+            size = os.path.getsize(tmp_path)
+            object_file = self._object_file(resp.checksum)
+            with self._lock:
+                new = not os.path.exists(object_file)
+                if new:
+                    os.replace(tmp_path, object_file)
+                entry = {"server": urlsplit(client.base_url).netloc, "timestamp": time.time(),
+                         "checksum": resp.checksum, "size": size, "new": new}
+                entries = self._read_index()
+                entries.append(entry)
+                self._write_index(entries)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        self.prune()
+        return entry
+
+    def get_entries(self, server=None):
+        """
+        Returns the index entries of the backups in the archive, oldest first.
+
+        Args:
+            server (str): (Optional) Only return the backups of this server, in the format "server_address:port".
+        """
+        with self._lock:
+            entries = self._read_index()
+        return [entry for entry in entries if server is None or entry["server"] == server]
+
+    def restore(self, entry, file_name):
+        """
+        Copies the backup for an index entry out of the archive.
+
+        Args:
+            entry (dict): Index entry returned by backup or get_entries.
+            file_name (str): The file to write the server backup to.
+        """
+        shutil.copyfile(self._object_file(entry["checksum"]), file_name)
+
+    def prune(self):
+        """
+        Applies the retention policy, removing the index entries that are no longer kept
+        and the stored backups that no remaining entry refers to.
+
+        Returns:
+            The list of removed index entries.
+        """
+        now = time.time()
+        with self._lock:
+            entries = self._read_index()
+            kept = []
+            removed = []
+            by_server = {}
+            for entry in entries:
+                by_server.setdefault(entry["server"], []).append(entry)
+            for server_entries in by_server.values():
+                server_entries.sort(key=lambda e: e["timestamp"], reverse=True)
+                for position, entry in enumerate(server_entries):
+                    too_many = self.keep_last is not None and position >= self.keep_last
+                    too_old = (self.max_age_days is not None and position > 0
+                               and now - entry["timestamp"] > self.max_age_days * 86400)
+                    (removed if too_many or too_old else kept).append(entry)
+            if not removed:
+                return []
+            kept.sort(key=lambda e: e["timestamp"])
+            self._write_index(kept)
+            referenced = {entry["checksum"] for entry in kept}
+            for checksum in {entry["checksum"] for entry in removed} - referenced:
+                try:
+                    os.unlink(self._object_file(checksum))
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    def get_statistics(self):
+        """
+        Returns a dictionary with the number of "backups" in the index, the number of distinct "objects" stored,
+        the "stored_bytes" used by them and the "logical_bytes" the backups would use without deduplication.
+        """
+        with self._lock:
+            entries = self._read_index()
+        objects = {entry["checksum"]: entry["size"] for entry in entries}
+        return {
+            "backups": len(entries),
+            "objects": len(objects),
+            "stored_bytes": sum(objects.values()),
+            "logical_bytes": sum(entry["size"] for entry in entries)
+        }
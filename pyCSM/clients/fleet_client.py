@@ -0,0 +1,187 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from pyCSM.clients.hardware_client import hardwareClient
+from pyCSM.clients.session_client import sessionClient
+from pyCSM.clients.system_client import systemClient
+from pyCSM.services.hardware_service import hardware_service
+
+
+class fleetClient:
+    """
+        The fleetClient class holds clients for many CSM servers and runs the same query against all of them
+        concurrently, returning the results merged and tagged with the server they came from.
+        Each server is given the same time limit, so a slow or unreachable server is reported as an error
+        instead of holding up the results from the others.
+|
+        Set the "timeout" transport property as well so that calls to an unreachable server do not keep a
+        worker thread busy after the fleet query has returned.
+|
+    """
+
+    def __init__(self, servers, timeout=30, max_workers=None):
+        """
+        Creates a fleet client for the given servers.  No calls are made until the first query, and each server
+        logs in through the token manager shared with other clients for the same server and username.
+
+        Args:
+            servers (list): List of dictionaries with the "server_address", "server_port", "username" and
+                "password" of each server.  "token" or "token_manager" may be given instead of "password".
+                ex. [{"server_address": "csm1", "server_port": "9559", "username": "csmadmin", "password": "csm"}]
+            timeout (float): Default number of seconds to wait for each server on a query.
+            max_workers (int): Maximum number of servers queried at the same time.  Defaults to all of them.
+        """
+        self.servers = {}
+        for server in servers:
+            self.servers[f"{server['server_address']}:{server['server_port']}"] = dict(server)
+        self.timeout = timeout
+        self.max_workers = max_workers or max(len(self.servers), 1)
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+
+    def _get_client(self, client_class, server_name):
+        key = (client_class, server_name)
+        with self._clients_lock:
+            client = self._clients.get(key)
+        if client is None:
+            client = client_class(**self.servers[server_name])
+            with self._clients_lock:
+                client = self._clients.setdefault(key, client)
+        return client
+
+    def session_client(self, server_name):
+        """
+        Returns the sessionClient for the given server.
+
+        Args:
+            server_name (str): Name of the server in the format "server_address:server_port".
+        """
+        return self._get_client(sessionClient, server_name)
+
+    def hardware_client(self, server_name):
+        """
+        Returns the hardwareClient for the given server.
+
+        Args:
+            server_name (str): Name of the server in the format "server_address:server_port".
+        """
+        return self._get_client(hardwareClient, server_name)
+
+    def system_client(self, server_name):
+        """
+        Returns the systemClient for the given server.
+
+        Args:
+            server_name (str): Name of the server in the format "server_address:server_port".
+        """
+        return self._get_client(systemClient, server_name)
+
+    def run(self, func, timeout=None):
+        """
+        Calls func(server_name) for every server concurrently.
+
+        Args:
+            func (function): Function that takes the server name and returns the result for that server.
+            timeout (float): (Optional) Seconds to wait for the servers.  Defaults to the fleet timeout.
+
+        Returns:
+            A dictionary with "results" keyed by server name for the servers that answered in time and
+            "errors" keyed by server name holding the exception for the servers that failed or timed out.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pyCSM-fleet")
+        try:
+            futures = {executor.submit(func, name): name for name in self.servers}
+            done, not_done = wait(futures, timeout=timeout)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        results = {}
+        errors = {}
+        for future in done:
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                errors[name] = e
+        for future in not_done:
+            errors[futures[future]] = TimeoutError(f"{futures[future]} did not respond within {timeout} seconds")
+        return {"results": results, "errors": errors}
+
+    def _query(self, client_getter, method_name, timeout, *args):
+        def call(server_name):
+            resp = getattr(client_getter(server_name), method_name)(*args)
+            resp.raise_for_status()
+            return resp.json()
+        return self.run(call, timeout)
+
+    def get_session_overviews(self, timeout=None):
+        """
+        Gets the session overviews from every server.
+
+        Args:
+            timeout (float): (Optional) Seconds to wait for the servers.  Defaults to the fleet timeout.
+
+        Returns:
+            A dictionary with "sessions", the session overviews from all servers merged into one list with a
+            "server" field added to each, "results" keyed by server name and "errors" keyed by server name.
+        """
+        fleet_result = self._query(self.session_client, "get_session_overviews", timeout)
+        sessions = []
+        for name, overviews in fleet_result["results"].items():
+            if isinstance(overviews, list):
+                for overview in overviews:
+                    sessions.append(dict(overview, server=name))
+        fleet_result["sessions"] = sessions
+        return fleet_result
+
+    def get_volume_counts(self, timeout=None):
+        """
+        Gets the summary of volume usage from every server.
+
+        Args:
+            timeout (float): (Optional) Seconds to wait for the servers.  Defaults to the fleet timeout.
+
+        Returns:
+            A dictionary with "results" keyed by server name and "errors" keyed by server name.
+        """
+        return self._query(self.system_client, "get_volume_counts", timeout)
+
+    def get_active_standby_status(self, timeout=None):
+        """
+        Gets the state of the active standby server connection from every server.
+
+        Args:
+            timeout (float): (Optional) Seconds to wait for the servers.  Defaults to the fleet timeout.
+
+        Returns:
+            A dictionary with "results" keyed by server name and "errors" keyed by server name.
+        """
+        return self._query(self.system_client, "get_active_standby_status", timeout)
+
+    def add_zos_cert(self, file_path, timeout=None):
+        """
+        Adds a certificate to the zos connection of every server.  The certificate is read once
+        and the same bytes are sent to all servers concurrently.
+
+        Args:
+            file_path: Path for the certificate file.  An open binary file object, bytes,
+                or a tuple of (file name, bytes) from hardware_service.load_zos_cert can also be passed in.
+            timeout (float): (Optional) Seconds to wait for the servers.  Defaults to the fleet timeout.
+
+        Returns:
+            A dictionary with "results" keyed by server name and "errors" keyed by server name.
+        """
+        cert = hardware_service.load_zos_cert(file_path)
+        return self._query(self.hardware_client, "add_zos_cert", timeout, cert)
+
+    def close(self):
+        """
+        Closes the pooled connections to all servers in the fleet.
+        """
+        with self._clients_lock:
+            clients = list(self._clients.values())
+        for client in clients:
+            client.close()
@@ -1,8 +1,12 @@
 # Copyright (C) 2022 IBM CORPORATION
 # Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
 
+import requests
+
 import pyCSM.authorization.auth as auth
 import pyCSM.services.hardware_service.hardware_service as hardware_service
+import pyCSM.util.response_cache as response_cache
+import pyCSM.util.transport as transport
 
 
 class hardwareClient:
@@ -17,7 +21,8 @@ class hardwareClient:
     see the `CSM Documentation <https://www.ibm.com/docs/en/csm>`_ for the specific release.
     """
 
-    def __init__(self, server_address, server_port, username, password):
+    def __init__(self, server_address, server_port, username, password=None, token=None, token_manager=None,
+                 response_cache=None):
         """
         Creates a hardware client to store the server_address,
         port, username, password and token once created.
@@ -26,13 +31,43 @@ class hardwareClient:
             server_address(str): IP address or hostname of the CSM server
             server_port (str): The port of the CSM server.
             username (str): username for server login.
-            password (str): password for server login.
+            password (str): password for server login.  May be omitted when a token or token_manager is passed in.
+            token (str): (Optional) existing token to use instead of logging in.
+            token_manager (tokenManager): (Optional) token manager to share with other clients.
+                By default the client shares the manager for the same server and username.
+            response_cache (responseCache): (Optional) cache for the responses of slow changing GET calls.
+                By default nothing is cached.
 
         """
         self.username = username
         self.password = password
         self.base_url = f"https://{server_address}:{server_port}/CSM/web"
-        self.tk = auth.get_token(self.base_url, username, password)
+        if token_manager is None:
+            token_manager = auth.get_token_manager(self.base_url, username, password, token)
+        self.token_manager = token_manager
+        self.response_cache = response_cache
+        self.token_manager.get_token()
+
+    @property
+    def tk(self):
+        """
+        The current REST token, held by the token manager shared with other clients.
+        """
+        return self.token_manager.get_token()
+
+    def close(self):
+        """
+        Closes the pooled connections to the CSM server used by this client.
+        The connections are shared with any other client or service call made to the same server and
+        are reopened automatically on the next call.
+        """
+        transport.close(self.base_url)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     @staticmethod
     def get_properties():
@@ -58,6 +93,7 @@ class hardwareClient:
         """
         return hardware_service.change_properties(property_dictionary)
 
+    @response_cache.cached
     def get_devices(self, device_type):
         """
         Use this call to return the storage system for all storage systems of the passed in type.
@@ -71,10 +107,11 @@ class hardwareClient:
         """
         resp = hardware_service.get_devices(self.base_url, self.tk, device_type)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.get_devices(self.base_url, self.tk, device_type)
         return resp
 
+    @response_cache.invalidates("get_devices", "get_paths", "get_path_on_storage_system", "get_svchosts")
     def add_device(self, device_type, device_ip,
                    device_username, device_password,
                    device_port=None, second_ip=None,
@@ -105,7 +142,7 @@ class hardwareClient:
                                            device_password, device_port, second_ip, second_port,
                                            second_username, second_password)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.add_device(self.base_url, self.tk, device_type,
                                                device_ip, device_username,
                                                device_password, device_port,
@@ -113,6 +150,7 @@ class hardwareClient:
                                                second_username, second_password)
         return resp
 
+    @response_cache.invalidates("get_devices", "get_paths", "get_path_on_storage_system", "get_svchosts")
     def remove_device(self, system_id):
         """
 
@@ -128,10 +166,11 @@ class hardwareClient:
         """
         resp = hardware_service.remove_device(self.base_url, self.tk, system_id)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.remove_device(self.base_url, self.tk, system_id)
         return resp
 
+    @response_cache.invalidates("get_devices")
     def update_device_site_location(self, system_id, location):
         """
         Set a user defined site location for a given storage system
@@ -148,7 +187,7 @@ class hardwareClient:
         resp = hardware_service.update_device_site_location(self.base_url, self.tk,
                                                             system_id, location)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.update_device_site_location(self.base_url, self.tk,
                                                                 system_id, location)
         return resp
@@ -167,10 +206,34 @@ class hardwareClient:
         """
         resp = hardware_service.get_volumes(self.base_url, self.tk, system_name)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.get_volumes(self.base_url, self.tk, system_name)
         return resp
 
+    def iter_volumes(self, system_name, chunk_size=None, key="data.volumes"):
+        """
+        Use this method to go through all volumes for a given storage system one at a time,
+        without holding the whole list in memory.
+
+        Args:
+            system_name (str): The name of the storage system.
+            chunk_size (int): (Optional) Number of bytes read at a time.
+                Defaults to the transport "chunk_size" property.
+            key (str): Key path of the list of volumes when the response is an object.  A response that is a list
+                is used as is.
+
+        Returns:
+            A generator that yields the record of each volume on the storage system.
+            A requests.exceptions.HTTPError is raised before the first volume if the call fails.
+        """
+        try:
+            yield from hardware_service.iter_volumes(self.base_url, self.tk, system_name, chunk_size, key)
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code != 401:
+                raise
+            self.token_manager.refresh_token(auth.request_token(e.response))
+            yield from hardware_service.iter_volumes(self.base_url, self.tk, system_name, chunk_size, key)
+
     def export_vol_writeio_history(self, session_name, start_time, end_time):
         """
 
@@ -189,12 +252,13 @@ class hardwareClient:
         resp = hardware_service.export_vol_writeio_history(self.base_url, self.tk,
                                                            session_name, start_time, end_time)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.export_vol_writeio_history(self.base_url, self.tk,
                                                                session_name, start_time,
                                                                end_time)
         return resp
 
+    @response_cache.cached
     def get_paths(self):
         """
 
@@ -206,10 +270,11 @@ class hardwareClient:
         """
         resp = hardware_service.get_paths(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.get_paths(self.base_url, self.tk)
         return resp
 
+    @response_cache.cached
     def get_path_on_storage_system(self, system_id):
         """
 
@@ -224,10 +289,12 @@ class hardwareClient:
         """
         resp = hardware_service.get_path_on_storage_system(self.base_url, self.tk, system_id)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.get_path_on_storage_system(self.base_url, self.tk, system_id)
         return resp
 
+    @response_cache.invalidates("get_devices", "get_paths", "get_path_on_storage_system", "get_svchosts",
+                                "get_zos_host", "get_zos_candidate")
     def refresh_config(self, system_id):
         """
 
@@ -244,10 +311,11 @@ class hardwareClient:
         """
         resp = hardware_service.refresh_config(self.base_url, self.tk, system_id)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.refresh_config(self.base_url, self.tk, system_id)
         return resp
 
+    @response_cache.invalidates("get_svchosts")
     def map_volumes_to_host(self, device_id, force,
                             hostname, is_host_cluster,
                             volumes, scsi=""):
@@ -269,12 +337,13 @@ class hardwareClient:
                                                     hostname, is_host_cluster,
                                                     volumes, scsi)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.map_volumes_to_host(self.base_url, self.tk, device_id, force,
                                                         hostname, is_host_cluster,
                                                         volumes, scsi)
         return resp
 
+    @response_cache.cached
     def get_svchosts(self, device_id):
         """
         Get the hosts defined on the SVC based storage system
@@ -288,10 +357,11 @@ class hardwareClient:
         """
         resp = hardware_service.get_svchosts(self.base_url, self.tk, device_id)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.get_svchosts(self.base_url, self.tk, device_id)
         return resp
 
+    @response_cache.invalidates("get_svchosts")
     def unmap_volumes_to_host(self, device_id, force,
                               hostname, is_host_cluster,
                               volumes):
@@ -312,12 +382,13 @@ class hardwareClient:
                                                       hostname, is_host_cluster,
                                                       volumes)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.unmap_volumes_to_host(self.base_url, self.tk, device_id, force,
                                                           hostname, is_host_cluster,
                                                           volumes)
         return resp
 
+    @response_cache.invalidates("get_devices", "get_paths", "get_path_on_storage_system")
     def update_connection_info(self, device_ip, device_password, device_username,
                                connection_name):
         """
@@ -336,28 +407,34 @@ class hardwareClient:
         resp = hardware_service.update_connection_info(self.base_url, self.tk, device_ip,
                                                        device_password, device_username, connection_name)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.update_connection_info(self.base_url, self.tk, device_ip,
                                                            device_password, device_username, connection_name)
         return resp
 
+    @response_cache.invalidates("get_zos_host", "get_zos_candidate")
     def add_zos_cert(self, file_path):
         """
         This method will add a given cert to zos connection.
 
         Args:
-            file_path (str): path for given certificate file.
+            file_path: path for given certificate file.  An open binary file object, bytes,
+                or a tuple of (file name, bytes) from hardware_service.load_zos_cert can also be passed in.
 
         Returns:
             JSON String representing the result of the command.
             'I' = successful, 'W' = warning, 'E' = error.
         """
+        if not isinstance(file_path, str):
+            # Read a file object once so the certificate can be sent again after a token refresh
+            file_path = hardware_service.load_zos_cert(file_path)
         resp = hardware_service.add_zos_cert(self.base_url, self.tk, file_path)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.add_zos_cert(self.base_url, self.tk, file_path)
         return resp
 
+    @response_cache.invalidates("get_zos_host", "get_zos_candidate", "get_devices")
     def add_zos_host(self, host_ip, password, username, host_port):
         """
         This method will create a zos connection to the current IP
@@ -375,12 +452,13 @@ class hardwareClient:
         resp = hardware_service.add_zos_host(self.base_url, self.tk, host_ip,
                                              password, username, host_port)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.add_zos_host(self.base_url, self.tk, host_ip,
                                                  password, username, host_port)
         return resp
 
 
+    @response_cache.cached
     def get_zos_candidate(self):
         """
         This method will query for the devices in REST that are attached to the zos system
@@ -391,10 +469,11 @@ class hardwareClient:
         """
         resp = hardware_service.get_zos_candidate(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.get_zos_candidate(self.base_url, self.tk)
         return resp
 
+    @response_cache.cached
     def get_zos_host(self):
         """
         This method will get the information for all zos host connections.
@@ -405,11 +484,12 @@ class hardwareClient:
         """
         resp = hardware_service.get_zos_host(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.get_zos_host(self.base_url, self.tk)
         return resp
 
 
+    @response_cache.invalidates("get_zos_host", "get_zos_candidate", "get_devices")
     def remove_zos_host(self, host_ip, host_port):
         """
         This method will create a zos connection to the current IP
@@ -425,12 +505,13 @@ class hardwareClient:
         resp = hardware_service.remove_zos_host(self.base_url, self.tk, host_ip,
                                                 host_port)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.remove_zos_host(self.base_url, self.tk, host_ip,
                                                     host_port)
         return resp
 
 
+    @response_cache.invalidates("get_zos_candidate", "get_devices")
     def add_zos_device(self, device_id):
         """
         This method will add a storage system through the zoshost connection.
@@ -445,7 +526,7 @@ class hardwareClient:
         """
         resp = hardware_service.add_zos_device(self.base_url, self.tk, device_id)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.add_zos_device(self.base_url, self.tk, device_id)
         return resp
 
@@ -464,6 +545,6 @@ class hardwareClient:
         """
         resp = hardware_service.get_volumes_by_wwn(self.base_url, self.tk, wwn_name)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return hardware_service.get_volumes_by_wwn(self.base_url, self.tk, wwn_name)
         return resp
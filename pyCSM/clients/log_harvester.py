@@ -0,0 +1,180 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import json
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from pyCSM.util import utility
+
+
+class _rateLimiter:
+    # Shares a number of bytes per second between all the downloads that use it
+
+    def __init__(self, bytes_per_second):
+        self.bytes_per_second = bytes_per_second
+        self._lock = threading.Lock()
+        self._next_time = time.monotonic()
+
+    def consume(self, byte_count):
+        with self._lock:
+            now = time.monotonic()
+            self._next_time = max(self._next_time, now) + byte_count / self.bytes_per_second
+            delay = self._next_time - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class logHarvester:
+    """
+        The logHarvester class collects the log packages from many CSM servers into a local directory.
+        It compares the packages listed by systemClient.get_log_pkgs with a local manifest and downloads
+        only the packages it does not have yet, so collecting support data does not create new packages
+        on the servers or transfer the same package twice.
+|
+        Each server's packages are saved in a directory named after the server, and the manifest is kept
+        in "manifest.json".  Servers are harvested in parallel, and the downloads are streamed to disk
+        and can share a bandwidth limit.
+|
+    """
+
+    def __init__(self, directory, max_workers=4, bandwidth_limit=None, chunk_size=None):
+        """
+        Opens the harvester in the given directory, creating it if needed.
+
+        Args:
+            directory (str): Directory to save the log packages and manifest in.
+            max_workers (int): Maximum number of servers downloading at the same time.
+            bandwidth_limit (int): (Optional) Maximum number of bytes per second for all downloads together.
+            chunk_size (int): (Optional) Number of bytes written at a time.
+                Defaults to the transport "chunk_size" property.
+        """
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.manifest_file = os.path.join(self.directory, "manifest.json")
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self._limiter = _rateLimiter(bandwidth_limit) if bandwidth_limit else None
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_file, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write_manifest(self, manifest):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".manifest-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp_path, self.manifest_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _record(self, server, name, entry):
+        with self._lock:
+            manifest = self._read_manifest()
+            manifest.setdefault(server, {})[name] = entry
+            self._write_manifest(manifest)
+
+    def get_manifest(self):
+        """
+        Returns the manifest, a dictionary keyed by server in the format "server_address:port" holding a
+        dictionary keyed by package name with the "file", "size", "checksum" and "downloaded" time of each package.
+        """
+        with self._lock:
+            return self._read_manifest()
+
+    def _progress_callback(self, callback, server, name, offset):
+        if self._limiter is None and callback is None:
+            return None
+        # A resumed download reports the bytes written counting the partial file already on disk
+        last = [offset]
+
+        def progress(written, total):
+            if written < last[0]:
+                # The partial file was not continued and the download started over
+                last[0] = 0
+            if self._limiter is not None:
+                self._limiter.consume(written - last[0])
+            last[0] = written
+            if callback is not None:
+                callback(server, name, written, total)
+        return progress
+
+    def harvest_server(self, client, callback=None):
+        """
+        Downloads the log packages of one server that are not in the manifest yet.
+        A download that is interrupted is continued on the next harvest.
+
+        Args:
+            client (systemClient): Client for the server to harvest.
+            callback (function): (Optional) Called with (server, name, bytes_written, total_bytes)
+                as each download progresses.
+
+        Returns:
+            A dictionary with the names of the "downloaded" and "skipped" packages, and the "errors"
+            keyed by package name for the packages that could not be downloaded.
+            A requests.exceptions.HTTPError is raised if the packages could not be listed, or a ValueError
+            if the list of packages is not in the response.
+        """
+        server = urlsplit(client.base_url).netloc
+        resp = client.get_log_pkgs()
+        resp.raise_for_status()
+        packages = resp.json()
+        if isinstance(packages, dict):
+            packages = packages.get("data", packages)
+        if isinstance(packages, dict):
+            packages = packages.get("packages", [])
+        if not isinstance(packages, list):
+            raise ValueError(f"The log packages of {server} could not be read from the response: {packages!r}")
+        known = self.get_manifest().get(server, {})
+        server_directory = os.path.join(self.directory, server.replace(":", "_"))
+        os.makedirs(server_directory, exist_ok=True)
+        result = {"downloaded": [], "skipped": [], "errors": {}}
+        for package in packages:
+            name = os.path.basename(str(package["name"]))
+            if name in known:
+                result["skipped"].append(name)
+                continue
+            file_name = os.path.join(server_directory, name)
+            part_name = f"{file_name}.part"
+            offset = os.path.getsize(part_name) if os.path.exists(part_name) else 0
+            try:
+                resp = client.download_log_pkg(package["name"], file_name, self.chunk_size,
+                                               self._progress_callback(callback, server, name, offset), resume=True)
+                resp.raise_for_status()
+            except Exception as e:
+                result["errors"][name] = e
+                continue
+            self._record(server, name, {"file": os.path.relpath(file_name, self.directory),
+                                        "size": os.path.getsize(file_name),
+                                        "checksum": resp.checksum,
+                                        "downloaded": time.time()})
+            result["downloaded"].append(name)
+        return result
+
+    def harvest(self, clients, callback=None):
+        """
+        Downloads the log packages that are not in the manifest yet from many servers in parallel.
+
+        Args:
+            clients (list): systemClient objects for the servers to harvest.
+            callback (function): (Optional) Called with (server, name, bytes_written, total_bytes)
+                as each download progresses.
+
+        Returns:
+            A dictionary keyed by server in the format "server_address:port".  Each value is the result of
+            harvest_server, or the exception raised if the server's packages could not be listed.
+        """
+        results = {}
+        for client, result, error in utility.run_concurrently(lambda c: self.harvest_server(c, callback),
+                                                              clients, self.max_workers):
+            results[urlsplit(client.base_url).netloc] = result if error is None else error
+        return results
@@ -1,11 +1,17 @@
 # Copyright (C) 2022 IBM CORPORATION
 # Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
 
-from datetime import datetime
+import time
+
+import requests
+
 import pyCSM.authorization.auth as auth
 import pyCSM.services.session_service.session_service as session_service
 import pyCSM.services.session_service.schedule_service as schedule_service
 import pyCSM.services.session_service.copyset_service as copyset_service
+import pyCSM.util.transport as transport
+from pyCSM.util import copysets as copyset_util
+from pyCSM.util import utility
 
 
 class sessionClient:
@@ -22,7 +28,7 @@ class sessionClient:
 |
     """
 
-    def __init__(self, server_address, server_port, username, password):
+    def __init__(self, server_address, server_port, username, password=None, token=None, token_manager=None):
         """
         Creates a session client to store the server_address,
         port, username, password and token once created.
@@ -32,12 +38,39 @@ class sessionClient:
             server_address(str): IP address or hostname of the CSm server.
             server_port (str): The port of the CSM server.
             username (str): username for server login.
-            password (str): password for server login.
+            password (str): password for server login.  May be omitted when a token or token_manager is passed in.
+            token (str): (Optional) existing token to use instead of logging in.
+            token_manager (tokenManager): (Optional) token manager to share with other clients.
+                By default the client shares the manager for the same server and username.
         """
         self.username = username
         self.password = password
         self.base_url = f"https://{server_address}:{server_port}/CSM/web"
-        self.tk = auth.get_token(self.base_url, self.username, self.password)
+        if token_manager is None:
+            token_manager = auth.get_token_manager(self.base_url, username, password, token)
+        self.token_manager = token_manager
+        self.token_manager.get_token()
+
+    @property
+    def tk(self):
+        """
+        The current REST token, held by the token manager shared with other clients.
+        """
+        return self.token_manager.get_token()
+
+    def close(self):
+        """
+        Closes the pooled connections to the CSM server used by this client.
+        The connections are shared with any other client or service call made to the same server and
+        are reopened automatically on the next call.
+        """
+        transport.close(self.base_url)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def create_session(self, name, sess_type, desc):
         """
@@ -56,7 +89,7 @@ class sessionClient:
         resp = session_service.create_session(self.base_url, self.tk,
                                               name, sess_type, desc)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.create_session(self.base_url, self.tk,
                                                   name, sess_type, desc)
         return resp
@@ -77,7 +110,7 @@ class sessionClient:
         resp = session_service.create_session_by_volgroup_name(self.base_url, self.tk,
                                                                volgroup, type, desc)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.create_session_by_volgroup_name(self.base_url, self.tk,
                                                                    volgroup, type, desc, )
         return resp
@@ -96,7 +129,7 @@ class sessionClient:
         """
         resp = session_service.delete_session(self.base_url, self.tk, name)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.delete_session(self.base_url, self.tk, name)
         return resp
 
@@ -113,7 +146,7 @@ class sessionClient:
         """
         resp = session_service.get_session_info(self.base_url, self.tk, name)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.get_session_info(self.base_url, self.tk, name)
         return resp
 
@@ -128,7 +161,7 @@ class sessionClient:
         """
         resp = session_service.get_session_overviews(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.get_session_overviews(self.base_url, self.tk)
         return resp
 
@@ -143,7 +176,7 @@ class sessionClient:
         """
         resp = session_service.get_session_overviews_short(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.get_session_overviews_short(self.base_url, self.tk)
         return resp
 
@@ -161,7 +194,7 @@ class sessionClient:
         """
         resp = session_service.get_available_commands(self.base_url, self.tk, name)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.get_available_commands(self.base_url, self.tk, name)
         return resp
 
@@ -179,10 +212,96 @@ class sessionClient:
         """
         resp = session_service.get_session_options(self.base_url, self.tk, name)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.get_session_options(self.base_url, self.tk, name)
         return resp
 
+    def set_session_options(self, name, options):
+        """
+        Sets options for the given session.  Call get_session_options to get a list of the valid options.
+
+        Args:
+            name (str): The name of the session.
+            options: The options to set, as a JSON string or a list or dictionary that can be serialized to JSON.
+
+        Returns:
+            JSON String representing the result of the command.
+        """
+        resp = session_service.set_session_options(self.base_url, self.tk, name, options)
+        if resp.status_code == 401:
+            self.token_manager.refresh_token(auth.request_token(resp))
+            return session_service.set_session_options(self.base_url, self.tk, name, options)
+        return resp
+
+    def _batch(self, method, names, max_workers, callback):
+        results = {}
+        for name, resp, error in utility.run_concurrently(method, names, max_workers):
+            result = resp if error is None else error
+            results[name] = result
+            if callback is not None:
+                callback(name, result)
+        return results
+
+    def get_session_info_batch(self, names, max_workers=8, callback=None):
+        """
+        Calls get_session_info for each of the given sessions concurrently.
+
+        Args:
+            names (list): The names of the sessions.
+            max_workers (int): Maximum number of calls to run at the same time.
+            callback (function): (Optional) Called with (name, result) as each call completes.
+
+        Returns:
+            A dictionary keyed by session name.  Each value is the response of the call, or the
+            exception raised by the call if it failed.  A failed call does not stop the others.
+        """
+        return self._batch(self.get_session_info, names, max_workers, callback)
+
+    def get_available_commands_batch(self, names, max_workers=8, callback=None):
+        """
+        Calls get_available_commands for each of the given sessions concurrently.
+
+        Args:
+            names (list): The names of the sessions.
+            max_workers (int): Maximum number of calls to run at the same time.
+            callback (function): (Optional) Called with (name, result) as each call completes.
+
+        Returns:
+            A dictionary keyed by session name.  Each value is the response of the call, or the
+            exception raised by the call if it failed.  A failed call does not stop the others.
+        """
+        return self._batch(self.get_available_commands, names, max_workers, callback)
+
+    def get_copysets_batch(self, names, max_workers=8, callback=None):
+        """
+        Calls get_copysets for each of the given sessions concurrently.
+
+        Args:
+            names (list): The names of the sessions.
+            max_workers (int): Maximum number of calls to run at the same time.
+            callback (function): (Optional) Called with (name, result) as each call completes.
+
+        Returns:
+            A dictionary keyed by session name.  Each value is the response of the call, or the
+            exception raised by the call if it failed.  A failed call does not stop the others.
+        """
+        return self._batch(self.get_copysets, names, max_workers, callback)
+
+    def get_session_options_batch(self, names, max_workers=8, callback=None):
+        """
+        Calls get_session_options for each of the given sessions concurrently.
+
+        Args:
+            names (list): The names of the sessions.
+            max_workers (int): Maximum number of calls to run at the same time.
+            callback (function): (Optional) Called with (name, result) as each call completes.
+
+        Returns:
+            A dictionary keyed by session name.  Each value is the response of the call, or the
+            exception raised by the call if it failed.  A failed call does not stop the others.
+        """
+        return self._batch(self.get_session_options, names, max_workers, callback)
+
     def modify_session_description(self, name, desc):
         """
         Changes the description field for a given session.
@@ -196,7 +315,7 @@ class sessionClient:
         """
         resp = session_service.modify_session_description(self.base_url, self.tk, name, desc)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.modify_session_description(self.base_url, self.tk, name, desc)
         return resp
 
@@ -213,36 +332,132 @@ class sessionClient:
         """
         resp = session_service.run_session_command(self.base_url, self.tk, ses_name, com_name)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.run_session_command(self.base_url, self.tk, ses_name, com_name)
         return resp
 
-    def wait_for_state(self, ses_name, state, minutes, debug=False):
+    def wait_for_state(self, ses_name, state, minutes, debug=False,
+                       initial_interval=1, max_interval=30, backoff=2):
         """
         Runs until the session is in a given state
         or until it times out and returns the results.
+        The session is polled after a short initial interval which grows by the backoff factor
+        after each poll up to the maximum interval.
 
         Args:
             ses_name (str): The name of the session.
             state (str): state of the server that user wants to wait for.
             minutes (double): number of minutes before it times out
             debug (boolean): True if you want the state and status to print in console
+            initial_interval (double): seconds to wait before the second poll
+            max_interval (double): maximum number of seconds to wait between polls
+            backoff (double): factor the interval is multiplied by after each poll
 
         Returns:
-            A dictionary with "state_reached": boolean for whether the state was reached
-            and "session_info": JSON string representing the response of the command
-        """
-        start_time = datetime.utcnow()
-        result_dict = session_service.wait_for_state(self.base_url, self.tk,
-                                                     ses_name, state, minutes, debug)
-        resp = result_dict["state_reached"]
+            A dictionary with "state_reached": boolean for whether the state was reached,
+            "session_info": JSON string representing the response of the command,
+            "polls": the number of times the session was queried and
+            "elapsed_seconds": the number of seconds until the state was seen or the wait ended
+        """
+        start_time = time.monotonic()
+        deadline = start_time + minutes * 60
+        result_dict = session_service.wait_for_state(self.base_url, self.tk, ses_name, state, minutes, debug,
+                                                     initial_interval, max_interval, backoff, deadline)
+        resp = result_dict["session_info"]
         if resp.status_code == 401:
-            elapsed_minutes = int((datetime.utcnow() - start_time).total_seconds() / 60)
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
-            return session_service.wait_for_state(self.base_url, self.tk, ses_name,
-                                                  state, elapsed_minutes, debug)
+            self.token_manager.refresh_token(auth.request_token(resp))
+            retry_dict = session_service.wait_for_state(self.base_url, self.tk, ses_name, state, minutes, debug,
+                                                        initial_interval, max_interval, backoff, deadline)
+            retry_dict["polls"] += result_dict["polls"]
+            retry_dict["elapsed_seconds"] = time.monotonic() - start_time
+            return retry_dict
         return result_dict
 
+    def iter_wait_for_states(self, session_states, minutes=5, initial_interval=1, max_interval=30, backoff=2):
+        """
+        Waits for many sessions to reach their states using a single get_session_overviews poll
+        per interval for all of them, instead of polling each session on its own.
+        Each session is reported as soon as the poll that shows it in its state returns.
+        The sessions that have not reached their states when the time runs out are reported last.
+        A poll that fails, ex. with a server error or a dropped connection, counts as a missed interval
+        and polling continues until the time runs out.
+
+        Args:
+            session_states (dict): Dictionary of session names and the state to wait for in each.
+                ex. {"SessA": "Prepared", "SessB": "Target Available"}
+            minutes (double): number of minutes before it times out
+            initial_interval (double): seconds to wait before the second poll
+            max_interval (double): maximum number of seconds to wait between polls
+            backoff (double): factor the interval is multiplied by after each poll
+
+        Returns:
+            A generator of (name, result) tuples where result is a dictionary with
+            "state_reached": boolean for whether the state was reached,
+            "session_info": the overview of the session from the last poll, or None if it was not listed,
+            "polls": the number of polls made,
+            "elapsed_seconds": the number of seconds until the state was seen or the wait ended and
+            "error": the exception raised by the last poll that failed, or None
+        """
+        start_time = time.monotonic()
+        deadline = start_time + minutes * 60
+        pending = dict(session_states)
+        interval = initial_interval
+        polls = 0
+        overviews = {}
+        error = None
+        while pending:
+            polls += 1
+            try:
+                resp = self.get_session_overviews()
+                resp.raise_for_status()
+                overviews = {str(overview["name"]): overview for overview in resp.json()}
+                polled = True
+            except (requests.exceptions.RequestException, ValueError) as e:
+                error = e
+                polled = False
+            now = time.monotonic()
+            for name, state in list(pending.items()):
+                overview = overviews.get(name)
+                if polled and overview is not None and str(overview["state"]) == state:
+                    del pending[name]
+                    yield name, {"state_reached": True, "session_info": overview,
+                                 "polls": polls, "elapsed_seconds": now - start_time, "error": error}
+            if pending and now >= deadline:
+                for name in pending:
+                    yield name, {"state_reached": False, "session_info": overviews.get(name),
+                                 "polls": polls, "elapsed_seconds": now - start_time, "error": error}
+                return
+            if pending:
+                time.sleep(min(interval, deadline - now))
+                interval = min(interval * backoff, max_interval)
+
+    def wait_for_states(self, session_states, minutes=5, callback=None,
+                        initial_interval=1, max_interval=30, backoff=2):
+        """
+        Runs until all the given sessions are in their states or until it times out and returns the results.
+        All sessions are resolved from one get_session_overviews poll per interval.
+
+        Args:
+            session_states (dict): Dictionary of session names and the state to wait for in each.
+                ex. {"SessA": "Prepared", "SessB": "Target Available"}
+            minutes (double): number of minutes before it times out
+            callback (function): (Optional) Called with (name, result) as each session completes.
+            initial_interval (double): seconds to wait before the second poll
+            max_interval (double): maximum number of seconds to wait between polls
+            backoff (double): factor the interval is multiplied by after each poll
+
+        Returns:
+            A dictionary keyed by session name.  Each value is the result dictionary
+            described in iter_wait_for_states.
+        """
+        results = {}
+        for name, result in self.iter_wait_for_states(session_states, minutes, initial_interval,
+                                                      max_interval, backoff):
+            results[name] = result
+            if callback is not None:
+                callback(name, result)
+        return results
+
     def sgc_recover(self, ses_name, com_name, role, backup_id):
         """
         Run a Recover command to the specified Safeguarded Copy backup ID.
@@ -259,7 +474,7 @@ class sessionClient:
         resp = session_service.sgc_recover(self.base_url, self.tk,
                                            ses_name, com_name, role, backup_id)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.sgc_recover(self.base_url, self.tk, ses_name,
                                                com_name, role, backup_id)
         return resp
@@ -279,7 +494,7 @@ class sessionClient:
         resp = session_service.get_backup_details(self.base_url, self.tk,
                                                   name, role, backup_id)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.get_backup_details(self.base_url, self.tk,
                                                       name, role, backup_id)
         return resp
@@ -299,7 +514,7 @@ class sessionClient:
         resp = session_service.get_snapshot_details_by_name(self.base_url, self.tk,
                                                             name, role, snapshot_name)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.get_snapshot_details_by_name(self.base_url, self.tk,
                                                                 name, role, snapshot_name)
         return resp
@@ -314,7 +529,7 @@ class sessionClient:
         """
         resp = schedule_service.get_scheduled_tasks(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return schedule_service.get_scheduled_tasks(self.base_url, self.tk)
         return resp
 
@@ -328,7 +543,7 @@ class sessionClient:
         """
         resp = schedule_service.get_scheduled_task(self.base_url, self.tk, taskid)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return schedule_service.get_scheduled_task(self.base_url, self.tk, taskid)
         return resp
 
@@ -342,7 +557,7 @@ class sessionClient:
         """
         resp = schedule_service.create_scheduled_task(self.base_url, self.tk, json)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return schedule_service.create_scheduled_task(self.base_url, self.tk, json)
         return resp
 
@@ -356,7 +571,7 @@ class sessionClient:
         """
         resp = schedule_service.duplicate_scheduled_task(self.base_url, self.tk, taskid)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return schedule_service.duplicate_scheduled_task(self.base_url, self.tk, taskid)
         return resp
 
@@ -398,7 +613,7 @@ class sessionClient:
         """
         resp = schedule_service.enable_scheduled_task(self.base_url, self.tk, taskid)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return schedule_service.enable_scheduled_task(self.base_url, self.tk, taskid)
         return resp
 
@@ -415,7 +630,7 @@ class sessionClient:
         """
         resp = schedule_service.disable_scheduled_task(self.base_url, self.tk, taskid)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return schedule_service.disable_scheduled_task(self.base_url, self.tk, taskid)
         return resp
 
@@ -434,7 +649,7 @@ class sessionClient:
         """
         resp = schedule_service.run_scheduled_task(self.base_url, self.tk, taskid, synchronous)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return schedule_service.run_scheduled_task(self.base_url, self.tk, taskid, synchronous)
         return resp
 
@@ -451,7 +666,7 @@ class sessionClient:
         """
         resp = copyset_service.get_copysets(self.base_url, self.tk, name)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return copyset_service.get_copysets(self.base_url, self.tk, name)
         return resp
 
@@ -477,11 +692,141 @@ class sessionClient:
         resp = copyset_service.add_copysets(self.base_url, self.tk, name, copyset,
                                             roleorder)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return copyset_service.add_copysets(self.base_url, self.tk, name, copyset,
                                                 roleorder)
         return resp
 
+    @staticmethod
+    def _names_copyset(resp, batch):
+        # A rejection caused by the contents of the batch names one of its volumes in the message
+        text = resp.text
+        return any(volume in text for copyset in batch for volume in copyset)
+
+    def _applied_copysets(self, name, batch):
+        # Indexes of the copy sets in the batch that are already in the session, or None if they cannot be read
+        try:
+            resp = self.get_copysets(name)
+        except requests.exceptions.RequestException:
+            return None
+        if not resp.ok:
+            return None
+        current = copyset_util.copysetCollection.from_response(resp)
+        return {i for i, copyset in enumerate(batch) if current.has_volume(copyset[0])}
+
+    def _add_copysets_in_batches(self, name, copysets, roleorder, batch_size, retries, callback):
+        results = [None] * len(copysets)
+        batches = 0
+        # Ranges of copysets still to send with the number of times each has been retried, first range last
+        pending = [(first, min(first + batch_size, len(copysets)), 0)
+                   for first in range(0, len(copysets), batch_size)][::-1]
+
+        def finish(first, last, succeeded, result):
+            results[first:last] = [{"copyset": copyset, "succeeded": succeeded, "result": result}
+                                   for copyset in copysets[first:last]]
+            if callback is not None:
+                callback(name, copysets[first:last], succeeded)
+
+        while pending:
+            first, last, attempt = pending.pop()
+            batch = copysets[first:last]
+            batches += 1
+            try:
+                resp = self.add_copysets(name, batch, roleorder)
+                error = None
+            except requests.exceptions.RequestException as e:
+                resp = None
+                error = e
+            if resp is not None and resp.ok:
+                finish(first, last, True, resp)
+                continue
+            if resp is not None and resp.status_code < 500:
+                # Only a batch that is too large or names one of its copy sets is split, any other
+                # rejection is of the session itself, ex. it does not exist or the role order is wrong
+                batch_rejected = resp.status_code == 413 or (resp.status_code not in (401, 403, 404) and
+                                                             self._names_copyset(resp, batch))
+                if batch_rejected and last - first > 1:
+                    middle = (first + last) // 2
+                    pending.append((middle, last, attempt))
+                    pending.append((first, middle, attempt))
+                    continue
+                finish(first, last, False, resp)
+                if not batch_rejected:
+                    for pending_first, pending_last, _ in pending:
+                        finish(pending_first, pending_last, False, resp)
+                    break
+                continue
+            if isinstance(error, requests.exceptions.ReadTimeout):
+                # The server may have added the copy sets before the call timed out, so check the session
+                # and only send the copy sets that are not in it yet
+                applied = self._applied_copysets(name, batch) if attempt < retries else None
+                if applied is None:
+                    finish(first, last, False, error)
+                elif not applied:
+                    pending.append((first, last, attempt + 1))
+                else:
+                    for i in reversed(range(first, last)):
+                        if i - first in applied:
+                            finish(i, i + 1, True, error)
+                        else:
+                            pending.append((i, i + 1, attempt + 1))
+                continue
+            if attempt < retries:
+                time.sleep(min(2 ** attempt, 30))
+                pending.append((first, last, attempt + 1))
+                continue
+            finish(first, last, False, resp if resp is not None else error)
+        return results, batches
+
+    def add_copysets_bulk(self, session_copysets, roleorder=None, batch_size=250, max_workers=4, retries=2,
+                          callback=None):
+        """
+        Adds a large number of copy sets to one or more sessions.  The copy sets of each session are sent in
+        batches, and different sessions are loaded in parallel.  A batch that fails with a connection error or
+        server error is retried.  A batch that is too large, or is rejected with a message naming one of its
+        volumes, is split in half and sent again, so that one bad copy set only fails itself.  Any other
+        rejection, ex. the session does not exist or the role order is wrong, fails the rest of the session
+        without sending more calls.  After a call times out, the copy sets of the session are read and only
+        the copy sets that were not added are sent again.
+
+        Args:
+            session_copysets (dict): Lists of copysets to add, keyed by session name.
+                ex. {"SessA": [["DS8000:2107.GXZ91:VOL:D000","DS8000:2107.GXZ91:VOL:D001"]]}
+            roleorder: Optional list of the role names depicting the order of the volumes passed in on copysets,
+                or a dictionary of such lists keyed by session name.  ex. ["H1", "H2"]
+            batch_size (int): Number of copy sets sent in each call.
+            max_workers (int): Maximum number of sessions loaded at the same time.
+            retries (int): Number of times a batch is retried after a connection error or server error.
+            callback (function): (Optional) Called with (name, copysets, succeeded) as each batch completes.
+
+        Returns:
+            A dictionary with "results", keyed by session name, holding a list in the order of the copysets passed
+            in with the "copyset", whether it "succeeded" and the "result" (the response of the call that added
+            or rejected it, or the exception raised).  Also "added" and "failed" counts, the number of "batches"
+            sent, "elapsed_seconds" and "copysets_per_second" added.
+        """
+        start_time = time.monotonic()
+
+        def load_session(name):
+            order = roleorder.get(name) if isinstance(roleorder, dict) else roleorder
+            return self._add_copysets_in_batches(name, list(session_copysets[name]), order, batch_size,
+                                                 retries, callback)
+
+        bulk_result = {"results": {}, "added": 0, "failed": 0, "batches": 0}
+        for name, result, error in utility.run_concurrently(load_session, list(session_copysets), max_workers):
+            if error is not None:
+                result = ([{"copyset": copyset, "succeeded": False, "result": error}
+                           for copyset in session_copysets[name]], 0)
+            results, batches = result
+            bulk_result["results"][name] = results
+            bulk_result["batches"] += batches
+            for copyset_result in results:
+                bulk_result["added" if copyset_result["succeeded"] else "failed"] += 1
+        elapsed = time.monotonic() - start_time
+        bulk_result["elapsed_seconds"] = elapsed
+        bulk_result["copysets_per_second"] = bulk_result["added"] / elapsed if elapsed > 0 else 0.0
+        return bulk_result
+
     def remove_copysets(self, name, copysets, force=False, soft=False):
         """
         Removes Copy Sets from the given session.
@@ -499,25 +844,89 @@ class sessionClient:
         """
         resp = copyset_service.remove_copysets(self.base_url, self.tk, name, copysets, force, soft)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return copyset_service.remove_copysets(self.base_url, self.tk, name, copysets, force, soft)
         return resp
 
-    def export_copysets(self, name, file_name):
+    def iter_remove_copysets(self, name, copysets, force=False, soft=False, batch_size=250, max_in_flight=4):
+        """
+        Removes a very large number of copy sets from the given session.  The copy sets are read from any
+        iterable, such as a generator, one batch at a time and removed with up to max_in_flight calls running
+        at once, so the whole list is never held in memory or sent in one call.
+
+        Args:
+            name (str): The name of the session.
+            copysets (iterable): Copy sets to remove.  ex. a generator of "DS8000:1245.KTLM:VOL:0001" strings
+            force (boolean): Force Set to true if you wish to remove the pair from CSM ignoring hardware errors.
+            soft (boolean): Keep base relationships on the hardware but remove the copy set from the session.
+            batch_size (int): Number of copy sets removed in each call.
+            max_in_flight (int): Maximum number of calls running at the same time.
+
+        Returns:
+            A generator that yields a dictionary for each batch as it completes with the "copysets" in the batch,
+            whether it "succeeded" and the "result" (the response of the call, or the exception raised).
+        """
+        def remove(batch):
+            return self.remove_copysets(name, batch, force, soft)
+
+        for batch, resp, error in utility.run_pipelined(remove, utility.batched(copysets, batch_size),
+                                                        max_in_flight):
+            yield {"copysets": batch, "succeeded": error is None and resp.ok,
+                   "result": resp if error is None else error}
+
+    def remove_copysets_bulk(self, name, copysets, force=False, soft=False, batch_size=250, max_in_flight=4,
+                             callback=None):
+        """
+        Removes a very large number of copy sets from the given session with iter_remove_copysets,
+        keeping only the failed batches.
+
+        Args:
+            name (str): The name of the session.
+            copysets (iterable): Copy sets to remove.  ex. a generator of "DS8000:1245.KTLM:VOL:0001" strings
+            force (boolean): Force Set to true if you wish to remove the pair from CSM ignoring hardware errors.
+            soft (boolean): Keep base relationships on the hardware but remove the copy set from the session.
+            batch_size (int): Number of copy sets removed in each call.
+            max_in_flight (int): Maximum number of calls running at the same time.
+            callback (function): (Optional) Called with the result dictionary of each batch as it completes.
+
+        Returns:
+            A dictionary with the number of copy sets "removed" and "failed", the number of "batches",
+            the result dictionaries of the "failed_batches", "elapsed_seconds" and "copysets_per_second" removed.
+        """
+        start_time = time.monotonic()
+        bulk_result = {"removed": 0, "failed": 0, "batches": 0, "failed_batches": []}
+        for batch_result in self.iter_remove_copysets(name, copysets, force, soft, batch_size, max_in_flight):
+            bulk_result["batches"] += 1
+            if batch_result["succeeded"]:
+                bulk_result["removed"] += len(batch_result["copysets"])
+            else:
+                bulk_result["failed"] += len(batch_result["copysets"])
+                bulk_result["failed_batches"].append(batch_result)
+            if callback is not None:
+                callback(batch_result)
+        elapsed = time.monotonic() - start_time
+        bulk_result["elapsed_seconds"] = elapsed
+        bulk_result["copysets_per_second"] = bulk_result["removed"] / elapsed if elapsed > 0 else 0.0
+        return bulk_result
+
+    def export_copysets(self, name, file_name, chunk_size=None, callback=None):
         """
         Exports copysets from given session as a csv file and downloads it to the calling system.
 
         Args:
             name:  Name of the session to export copysets for
             file_name: Name for the csv file location  (ex.  ""/Users/myuser/CSM/Export/myexport.csv")
+            chunk_size (int): (Optional) Number of bytes written at a time.
+                Defaults to the transport "chunk_size" property.
+            callback (function): (Optional) Called with (bytes_written, total_bytes) as the download progresses.
 
         Returns:
             JSON String representing the result of the command.
         """
-        resp = copyset_service.export_copysets(self.base_url, self.tk, name, file_name)
+        resp = copyset_service.export_copysets(self.base_url, self.tk, name, file_name, chunk_size, callback)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
-            return copyset_service.export_copysets(self.base_url, self.tk, name, file_name)
+            self.token_manager.refresh_token(auth.request_token(resp))
+            return copyset_service.export_copysets(self.base_url, self.tk, name, file_name, chunk_size, callback)
         return resp
 
     def get_pair_info(self, name, rolepair):
@@ -537,7 +946,7 @@ class sessionClient:
         resp = copyset_service.get_pair_info(self.base_url, self.tk, name,
                                              rolepair)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return copyset_service.get_pair_info(self.base_url, self.tk, name,
                                                               rolepair)
         return resp
@@ -557,7 +966,7 @@ class sessionClient:
         resp = schedule_service.enable_scheduled_task_at_time(self.base_url, self.tk, task_id,
                                                              start_time)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return schedule_service.enable_scheduled_task_at_time(self.base_url, self.tk, task_id,
                                                                  start_time)
         return resp
@@ -577,7 +986,7 @@ class sessionClient:
         resp = schedule_service.run_scheduled_task_at_time(self.base_url, self.tk, task_id,
                                                           start_time)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return schedule_service.run_scheduled_task_at_time(self.base_url, self.tk, task_id,
                                                               start_time)
         return resp
@@ -599,7 +1008,7 @@ class sessionClient:
                                                   name, role, backup_id,
                                                   cmd)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.run_backup_command(self.base_url, self.tk,
                                                       name, role, backup_id,
                                                       cmd)
@@ -623,7 +1032,7 @@ class sessionClient:
                                                       name, rolepair, start_time,
                                                       end_time)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.export_lss_oos_history(self.base_url, self.tk,
                                                           name, rolepair, start_time,
                                                           end_time)
@@ -646,7 +1055,7 @@ class sessionClient:
                                                              name, start_time,
                                                              end_time)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.export_device_writeio_history(self.base_url, self.tk,
                                                                  name, start_time,
                                                                  end_time)
@@ -671,7 +1080,7 @@ class sessionClient:
                                                name, rolepair, start_time,
                                                end_time)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.get_rpo_history(self.base_url, self.tk,
                                                    name, rolepair, start_time,
                                                    end_time)
@@ -690,7 +1099,7 @@ class sessionClient:
         resp = session_service.get_recovered_backups(self.base_url, self.tk,
                                                      name)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.get_recovered_backups(self.base_url, self.tk,
                                                          name)
         return resp
@@ -709,7 +1118,7 @@ class sessionClient:
         resp = session_service.get_recovered_backup_details(self.base_url, self.tk,
                                                             name, backup_id)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.get_recovered_backup_details(self.base_url, self.tk,
                                                                 name, backup_id)
         return resp
@@ -727,7 +1136,7 @@ class sessionClient:
         resp = session_service.get_snapshot_clones(self.base_url, self.tk,
                                                    name)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.get_snapshot_clones(self.base_url, self.tk,
                                                        name)
         return resp
@@ -746,7 +1155,7 @@ class sessionClient:
         resp = session_service.get_snapshot_clone_details_by_name(self.base_url, self.tk,
                                                                   name, snapshot_name)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.get_snapshot_clone_details_by_name(self.base_url, self.tk,
                                                                       name, snapshot_name)
         return resp
@@ -765,7 +1174,7 @@ class sessionClient:
         resp = session_service.get_rolepair_info(self.base_url, self.tk,
                                                  name, rolepair)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return session_service.get_rolepair_info(self.base_url, self.tk,
                                                      name, rolepair)
         return resp
@@ -782,7 +1191,7 @@ class sessionClient:
         """
         resp = schedule_service.delete_task(self.base_url, self.tk, taskid)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return schedule_service.delete_task(self.base_url, self.tk, taskid)
         
         return resp
@@ -799,7 +1208,7 @@ class sessionClient:
         """
         resp = schedule_service.cancel_task(self.base_url, self.tk, taskid)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return schedule_service.cancel_task(self.base_url, self.tk, taskid)
         
         return resp
@@ -816,7 +1225,7 @@ class sessionClient:
 
         resp = schedule_service.cancel_task(self.base_url, self.tk, taskid)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             resp = schedule_service.cancel_task(self.base_url, self.tk, taskid)
 
         run_resp = schedule_service.run_task_now(url=self.base_url, tk=self.tk, taskid=taskid, step=step, synchronous=synchronous)
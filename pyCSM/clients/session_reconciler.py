@@ -0,0 +1,241 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import time
+
+from pyCSM.util import copysets as copyset_util
+from pyCSM.util import models
+from pyCSM.util import utility
+
+
+def _current_options(resp):
+    # Finds the "options" in the response, ex. {"data": {"options": {"rpo_threshold": {"value": 300, ...}}}}
+    def find(data):
+        if isinstance(data, dict):
+            if isinstance(data.get("options"), dict):
+                return data["options"]
+            for value in data.values():
+                found = find(value)
+                if found is not None:
+                    return found
+        return None
+
+    options = find(resp.json()) or {}
+    return {key: value.get("value") if isinstance(value, dict) else value for key, value in options.items()}
+
+
+def _option_value(value):
+    # The server may send option values as strings, so 300 and "300" or True and "true" are the same value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower()
+    return str(value)
+
+
+def _align_copysets(current, wanted, roles):
+    # Puts the copy sets read from the server in the role order of the spec.  When the server does not say
+    # which role each volume has, a copy set with the same volumes as a wanted copy set is taken to be it.
+    if roles is None:
+        return current
+    if current.roles is not None:
+        return current.in_role_order(roles)
+    wanted_by_volumes = {frozenset(copyset): copyset for copyset in wanted}
+    return copyset_util.copysetCollection([wanted_by_volumes.get(frozenset(copyset), copyset)
+                                           for copyset in current])
+
+
+class sessionReconciler:
+    """
+        The sessionReconciler class brings the sessions on a CSM server to a desired state.  The desired type,
+        description, options and copy sets of each session are given in a spec, and the reconciler reads the
+        current state of the sessions, works out the smallest set of calls needed and runs them, creating
+        missing sessions and only adding or changing what differs.  Running it again on sessions that are
+        already in the desired state makes only the read calls.
+|
+        The spec is a dictionary keyed by session name.  Each value may hold the "type" of the session (needed
+        to create it), its "description", a dictionary of "options" as passed to set_session_options, its
+        "copysets", and the "roleorder" of the volumes in the copy sets.  Keys that are left out are not changed.
+        The copy sets read from the server are put in the role order of the spec before they are compared.
+        ex. {"SessA": {"type": "MM", "description": "Payroll", "copysets": [["DS8000:2107.GXZ91:VOL:D000",
+        "DS8000:2107.HXZ91:VOL:D000"]], "roleorder": ["H1", "H2"]}}
+|
+    """
+
+    def __init__(self, client, max_workers=8, batch_size=250, remove_extra=False, force=False, soft=False):
+        """
+        Creates a reconciler for the sessions of one server.
+
+        Args:
+            client (sessionClient): Client for the server.
+            max_workers (int): Maximum number of sessions read or changed at the same time.
+            batch_size (int): Number of copy sets added or removed in each call.
+            remove_extra (boolean): Remove copy sets that are in a session but not in the spec.
+                By default copy sets are only added.
+            force (boolean): Remove copy sets ignoring hardware errors.
+            soft (boolean): Keep base relationships on the hardware when removing copy sets.
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.remove_extra = remove_extra
+        self.force = force
+        self.soft = soft
+
+    def _read(self, item):
+        name, what = item
+        if what == "copysets":
+            resp = self.client.get_copysets(name)
+            resp.raise_for_status()
+            return copyset_util.copysetCollection.from_response(resp)
+        resp = self.client.get_session_options(name)
+        resp.raise_for_status()
+        return _current_options(resp)
+
+    def plan(self, spec):
+        """
+        Reads the current state of the sessions in the spec and works out the calls needed, without changing
+        anything.  The sessions are listed with one call, and the copy sets and options of existing sessions
+        are read concurrently.
+
+        Args:
+            spec (dict): The desired state of each session, keyed by session name.
+
+        Returns:
+            A dictionary with the "steps" for each session, keyed by session name, as a list of (action, value)
+            tuples in the order they are run, the "errors" keyed by session name for the sessions that could not
+            be read or cannot be reconciled, and the number of "reads" made.  The actions are "create_session",
+            "modify_session_description", "set_session_options", "remove_copysets" and "add_copysets".
+        """
+        resp = self.client.get_session_overviews()
+        resp.raise_for_status()
+        current = {session.name: session for session in models.parse(resp, models.session)}
+        result = {"steps": {}, "errors": {}, "reads": 1}
+
+        reads = [(name, what) for name in spec if name in current
+                 for what in ("copysets", "options") if spec[name].get(what) is not None]
+        state = {}
+        for item, value, error in utility.run_concurrently(self._read, reads, self.max_workers):
+            result["reads"] += 1
+            if error is not None:
+                result["errors"][item[0]] = error
+            state[item] = value
+
+        for name, desired in spec.items():
+            if name in result["errors"]:
+                continue
+            session = current.get(name)
+            steps = []
+            if session is None:
+                if desired.get("type") is None:
+                    result["errors"][name] = ValueError(f"Session {name} does not exist and has no type to create it")
+                    continue
+                steps.append(("create_session", (desired["type"], desired.get("description"))))
+            elif desired.get("type") is not None and desired["type"] != session.type:
+                result["errors"][name] = ValueError(f"Session {name} is of type {session.type}, not {desired['type']}."
+                                                    f" The type of a session cannot be changed")
+                continue
+            elif desired.get("description") is not None and desired["description"] != session.description:
+                steps.append(("modify_session_description", desired["description"]))
+
+            if desired.get("options") is not None:
+                options = state.get((name, "options"), {})
+                changed = {key: value for key, value in desired["options"].items()
+                           if key not in options or _option_value(options[key]) != _option_value(value)}
+                if changed:
+                    steps.append(("set_session_options", changed))
+
+            if desired.get("copysets") is not None:
+                wanted = desired["copysets"]
+                roles = desired.get("roleorder")
+                if not isinstance(wanted, copyset_util.copysetCollection):
+                    wanted = copyset_util.copysetCollection(wanted, roles)
+                elif roles is not None and wanted.roles is not None:
+                    wanted = wanted.in_role_order(roles)
+                roles = roles if roles is not None else wanted.roles
+                have = state.get((name, "copysets"), copyset_util.copysetCollection())
+                try:
+                    have = _align_copysets(have, wanted, roles)
+                except ValueError as e:
+                    result["errors"][name] = e
+                    continue
+                if self.remove_extra:
+                    extra = have - wanted
+                    if extra:
+                        # Copy sets are removed by their host volume, the volume in the H1 role
+                        host = roles.index("H1") if have.roles is not None and "H1" in roles else 0
+                        steps.append(("remove_copysets", [copyset[host] for copyset in extra.to_lists()]))
+                missing = wanted - have
+                if missing:
+                    steps.append(("add_copysets", missing.to_lists()))
+            result["steps"][name] = steps
+        return result
+
+    def _apply_session(self, name, steps, roleorder, callback):
+        results = []
+        calls = 0
+        for action, value in steps:
+            if action == "create_session":
+                resp = self.client.create_session(name, value[0], value[1])
+                calls += 1
+                succeeded = resp.ok
+            elif action == "modify_session_description":
+                resp = self.client.modify_session_description(name, value)
+                calls += 1
+                succeeded = resp.ok
+            elif action == "set_session_options":
+                resp = self.client.set_session_options(name, value)
+                calls += 1
+                succeeded = resp.ok
+            elif action == "remove_copysets":
+                resp = self.client.remove_copysets_bulk(name, value, self.force, self.soft, self.batch_size)
+                calls += resp["batches"]
+                succeeded = resp["failed"] == 0
+            else:
+                resp = self.client.add_copysets_bulk({name: value}, roleorder, self.batch_size, max_workers=1)
+                calls += resp["batches"]
+                succeeded = resp["failed"] == 0
+            results.append({"action": action, "succeeded": succeeded, "result": resp})
+            if callback is not None:
+                callback(name, action, succeeded)
+            if not succeeded:
+                # Later steps depend on the earlier ones, ex. copy sets cannot be added to a session not created
+                break
+        return results, calls
+
+    def reconcile(self, spec, dry_run=False, callback=None):
+        """
+        Brings the sessions to the state in the spec.  The calls for different sessions are run in parallel,
+        and the calls for one session are run in order, stopping at the first one that fails.
+
+        Args:
+            spec (dict): The desired state of each session, keyed by session name.
+            dry_run (boolean): Only work out the calls needed, as returned in "steps", without running them.
+            callback (function): (Optional) Called with (name, action, succeeded) as each step completes.
+
+        Returns:
+            A dictionary with the "steps" and "errors" of plan, the "results" of the steps run for each session
+            as a list with the "action", whether it "succeeded" and the "result" (the response of the call or the
+            result of add_copysets_bulk or remove_copysets_bulk), the number of "reads" and "writes" made, and
+            "elapsed_seconds".  A session whose steps raised an exception has it in "errors".
+        """
+        start_time = time.monotonic()
+        result = self.plan(spec)
+        result["results"] = {}
+        result["writes"] = 0
+        pending = [name for name, steps in result["steps"].items() if steps]
+        if not dry_run:
+            def apply(name):
+                roleorder = spec[name].get("roleorder")
+                if roleorder is None and isinstance(spec[name].get("copysets"), copyset_util.copysetCollection):
+                    roleorder = spec[name]["copysets"].roles
+                return self._apply_session(name, result["steps"][name], roleorder, callback)
+
+            for name, applied, error in utility.run_concurrently(apply, pending, self.max_workers):
+                if error is not None:
+                    result["errors"][name] = error
+                    continue
+                result["results"][name], calls = applied
+                result["writes"] += calls
+        result["elapsed_seconds"] = time.monotonic() - start_time
+        return result
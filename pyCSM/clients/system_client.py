@@ -1,7 +1,7 @@
-import requests
-
 import pyCSM.authorization.auth as auth
 import pyCSM.services.system_service.system_service as system_service
+import pyCSM.util.response_cache as response_cache
+import pyCSM.util.transport as transport
 
 
 class systemClient:
@@ -18,7 +18,8 @@ class systemClient:
 |
     """
 
-    def __init__(self, server_address, server_port, username, password):
+    def __init__(self, server_address, server_port, username, password=None, token=None, token_manager=None,
+                 response_cache=None):
         """
         Creates a system client to store the server_address, port,
         username, password and token once created.
@@ -28,12 +29,42 @@ class systemClient:
             server_address(str): IP address or hostname of the CSm server
             server_port (str): The port of the CSM server.
             username (str): username for server login.
-            password (str): password for server login.
+            password (str): password for server login.  May be omitted when a token or token_manager is passed in.
+            token (str): (Optional) existing token to use instead of logging in.
+            token_manager (tokenManager): (Optional) token manager to share with other clients.
+                By default the client shares the manager for the same server and username.
+            response_cache (responseCache): (Optional) cache for the responses of slow changing GET calls.
+                By default nothing is cached.
         """
         self.username = username
         self.password = password
         self.base_url = f"https://{server_address}:{server_port}/CSM/web"
-        self.tk = auth.get_token(self.base_url, username, password)
+        if token_manager is None:
+            token_manager = auth.get_token_manager(self.base_url, username, password, token)
+        self.token_manager = token_manager
+        self.response_cache = response_cache
+        self.token_manager.get_token()
+
+    @property
+    def tk(self):
+        """
+        The current REST token, held by the token manager shared with other clients.
+        """
+        return self.token_manager.get_token()
+
+    def close(self):
+        """
+        Closes the pooled connections to the CSM server used by this client.
+        The connections are shared with any other client or service call made to the same server and
+        are reopened automatically on the next call.
+        """
+        transport.close(self.base_url)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     @staticmethod
     def get_properties():
@@ -71,15 +102,15 @@ class systemClient:
                         "Content-Type": "application/x-www-form-urlencoded"}
         """
         headers["X-Auth-Token"] = self.tk
-        resp = requests.delete(url, headers=headers, data=data,
-                               verify=system_service.properties["verify"],
-                               cert=system_service.properties["cert"])
+        resp = transport.delete(url, headers=headers, data=data,
+                                verify=system_service.properties["verify"],
+                                cert=system_service.properties["cert"])
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             headers["X-Auth-Token"] = self.tk
-            return requests.delete(url, headers=headers, data=data,
-                                   verify=system_service.properties["verify"],
-                                   cert=system_service.properties["cert"])
+            return transport.delete(url, headers=headers, data=data,
+                                    verify=system_service.properties["verify"],
+                                    cert=system_service.properties["cert"])
         return resp
 
     def rest_put(self, url, data, headers):
@@ -94,15 +125,15 @@ class systemClient:
                         "Content-Type": "application/x-www-form-urlencoded"}
         """
         headers["X-Auth-Token"] = self.tk
-        resp = requests.put(url, headers=headers, data=data,
-                            verify=system_service.properties["verify"],
-                            cert=system_service.properties["cert"])
+        resp = transport.put(url, headers=headers, data=data,
+                             verify=system_service.properties["verify"],
+                             cert=system_service.properties["cert"])
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             headers["X-Auth-Token"] = self.tk
-            return requests.put(url, headers=headers, data=data,
-                                verify=system_service.properties["verify"],
-                                cert=system_service.properties["cert"])
+            return transport.put(url, headers=headers, data=data,
+                                 verify=system_service.properties["verify"],
+                                 cert=system_service.properties["cert"])
         return resp
 
     def rest_post(self, url, data, headers):
@@ -117,15 +148,15 @@ class systemClient:
                         "Content-Type": "application/x-www-form-urlencoded"}
         """
         headers["X-Auth-Token"] = self.tk
-        resp = requests.post(url, headers=headers, data=data,
-                             verify=system_service.properties["verify"],
-                             cert=system_service.properties["cert"])
+        resp = transport.post(url, headers=headers, data=data,
+                              verify=system_service.properties["verify"],
+                              cert=system_service.properties["cert"])
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             headers["X-Auth-Token"] = self.tk
-            return requests.post(url, headers=headers, data=data,
-                                 verify=system_service.properties["verify"],
-                                 cert=system_service.properties["cert"])
+            return transport.post(url, headers=headers, data=data,
+                                  verify=system_service.properties["verify"],
+                                  cert=system_service.properties["cert"])
         return resp
 
     def rest_get(self, url, data, headers):
@@ -140,15 +171,15 @@ class systemClient:
                         "Content-Type": "application/x-www-form-urlencoded"}
         """
         headers["X-Auth-Token"] = self.tk
-        resp = requests.get(url, headers=headers, data=data,
-                            verify=system_service.properties["verify"],
-                            cert=system_service.properties["cert"])
+        resp = transport.get(url, headers=headers, data=data,
+                             verify=system_service.properties["verify"],
+                             cert=system_service.properties["cert"])
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             headers["X-Auth-Token"] = self.tk
-            return requests.get(url, headers=headers, data=data,
-                                verify=system_service.properties["verify"],
-                                cert=system_service.properties["cert"])
+            return transport.get(url, headers=headers, data=data,
+                                 verify=system_service.properties["verify"],
+                                 cert=system_service.properties["cert"])
         return resp
 
     def create_log_pkg(self):
@@ -161,7 +192,7 @@ class systemClient:
         """
         resp = system_service.create_log_pkg(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.create_log_pkg(self.base_url, self.tk)
         return resp
 
@@ -175,10 +206,34 @@ class systemClient:
             """
         resp = system_service.get_log_pkgs(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.get_log_pkgs(self.base_url, self.tk)
         return resp
 
+    def download_log_pkg(self, name, file_name, chunk_size=None, callback=None, resume=False, checksum=None):
+        """
+        Downloads a log package that is already on the server, as listed by get_log_pkgs.
+
+        Args:
+            name (str): Name of the log package on the server.
+            file_name: Name of the file to write the log package to
+            chunk_size (int): (Optional) Number of bytes written at a time.
+                Defaults to the transport "chunk_size" property.
+            callback (function): (Optional) Called with (bytes_written, total_bytes) as the download progresses.
+            resume (boolean): True to continue a partial download left by an earlier call instead of starting over.
+            checksum (str): (Optional) Expected checksum of the file as "algorithm:hexdigest".
+
+        Returns:
+            Log package data that is written to the specified file.
+        """
+        resp = system_service.download_log_pkg(self.base_url, self.tk, name, file_name, chunk_size, callback,
+                                               resume, checksum)
+        if resp.status_code == 401:
+            self.token_manager.refresh_token(auth.request_token(resp))
+            return system_service.download_log_pkg(self.base_url, self.tk, name, file_name, chunk_size, callback,
+                                                   resume, checksum)
+        return resp
+
     def backup_server(self):
         """
         Creates a zip backup of the CSM server data that can
@@ -190,7 +245,7 @@ class systemClient:
         """
         resp = system_service.backup_server(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.backup_server(self.base_url, self.tk)
         return resp
 
@@ -204,24 +259,31 @@ class systemClient:
         """
         resp = system_service.get_server_backups(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.get_server_backups(self.base_url, self.tk)
         return resp
 
-    def backup_server_and_download(self, file_name):
+    def backup_server_and_download(self, file_name, chunk_size=None, callback=None, resume=False, checksum=None):
         """
         Create and downloads a server backup.'
 
         Args:
             file_name:  The file to write the server backup to
+            chunk_size (int): (Optional) Number of bytes written at a time.
+                Defaults to the transport "chunk_size" property.
+            callback (function): (Optional) Called with (bytes_written, total_bytes) as the download progresses.
+            resume (boolean): True to continue a partial download left by an earlier call instead of starting over.
+            checksum (str): (Optional) Expected checksum of the file as "algorithm:hexdigest".
 
         Returns:
             Server backup data that is written to the specified file.
         """
-        resp = system_service.backup_server_and_download(self.base_url, self.tk, file_name)
+        resp = system_service.backup_server_and_download(self.base_url, self.tk, file_name, chunk_size, callback,
+                                                         resume, checksum)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
-            return system_service.backup_server_and_download(self.base_url, self.tk, file_name)
+            self.token_manager.refresh_token(auth.request_token(resp))
+            return system_service.backup_server_and_download(self.base_url, self.tk, file_name, chunk_size, callback,
+                                                             resume, checksum)
         return resp
 
     def set_server_as_standby(self, active_server):
@@ -243,7 +305,7 @@ class systemClient:
         resp = system_service.set_server_as_standby(self.base_url, self.tk,
                                                     active_server)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.set_server_as_standby(self.base_url, self.tk,
                                                         active_server)
         return resp
@@ -258,7 +320,7 @@ class systemClient:
         """
         resp = system_service.get_dual_control_state(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.get_dual_control_state(self.base_url, self.tk)
         return resp
 
@@ -276,7 +338,7 @@ class systemClient:
         """
         resp = system_service.change_dual_control_state(self.base_url, self.tk, enable)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.change_dual_control_state(self.base_url, self.tk, enable)
         return resp
 
@@ -290,7 +352,7 @@ class systemClient:
         """
         resp = system_service.get_dual_control_requests(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.get_dual_control_requests(self.base_url, self.tk)
         return resp
 
@@ -308,7 +370,7 @@ class systemClient:
         """
         resp = system_service.approve_dual_control_request(self.base_url, self.tk, id)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.approve_dual_control_request(self.base_url, self.tk, id)
         return resp
 
@@ -328,7 +390,7 @@ class systemClient:
         """
         resp = system_service.reject_dual_control_request(self.base_url, self.tk, id, comment)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.reject_dual_control_request(self.base_url, self.tk, id, comment)
         return resp
 
@@ -342,7 +404,7 @@ class systemClient:
         """
         resp = system_service.get_active_standby_status(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.get_active_standby_status(self.base_url, self.tk)
         return resp
 
@@ -356,7 +418,7 @@ class systemClient:
         """
         resp = system_service.reconnect_active_standby_server(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.reconnect_active_standby_server(self.base_url, self.tk)
         return resp
 
@@ -374,7 +436,7 @@ class systemClient:
         """
         resp = system_service.remove_active_or_standby_server(self.base_url, self.tk, ha_server)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.remove_active_or_standby_server(self.base_url, self.tk, ha_server)
         return resp
 
@@ -394,7 +456,7 @@ class systemClient:
         resp = system_service.set_standby_server(self.base_url, self.tk, standby_server,
                                                  standby_username, standby_password)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.set_standby_server(self.base_url, self.tk, standby_server,
                                                      standby_username, standby_password)
         return resp
@@ -409,7 +471,7 @@ class systemClient:
         """
         resp = system_service.takeover_standby_server(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.takeover_standby_server(self.base_url, self.tk)
         return resp
 
@@ -428,12 +490,12 @@ class systemClient:
         resp = system_service.get_log_events(self.base_url, self.tk,
                                              count, session)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.get_log_events(self.base_url, self.tk,
                                                  count, session)
         return resp
 
-    def create_and_download_log_pkg(self, file_name):
+    def create_and_download_log_pkg(self, file_name, chunk_size=None, callback=None, resume=False, checksum=None):
         """
         This method will package all log files on the server into a .jar file
         that can be used for support - this call is a synchronous call and
@@ -441,17 +503,25 @@ class systemClient:
 
         Args:
             file_name: Name of the file to write the log package to
+            chunk_size (int): (Optional) Number of bytes written at a time.
+                Defaults to the transport "chunk_size" property.
+            callback (function): (Optional) Called with (bytes_written, total_bytes) as the download progresses.
+            resume (boolean): True to continue a partial download left by an earlier call instead of starting over.
+            checksum (str): (Optional) Expected checksum of the file as "algorithm:hexdigest".
 
         Returns:
             JSON String representing the result of the command.
             'I' = successful, 'W' = warning, 'E' = error.
         """
-        resp = system_service.create_and_download_log_pkg(self.base_url, self.tk, file_name)
+        resp = system_service.create_and_download_log_pkg(self.base_url, self.tk, file_name, chunk_size, callback,
+                                                          resume, checksum)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
-            return system_service.create_and_download_log_pkg(self.base_url, self.tk, file_name)
+            self.token_manager.refresh_token(auth.request_token(resp))
+            return system_service.create_and_download_log_pkg(self.base_url, self.tk, file_name, chunk_size, callback,
+                                                              resume, checksum)
         return resp
 
+    @response_cache.cached
     def get_session_types(self):
         """
         Get supported session types
@@ -462,10 +532,11 @@ class systemClient:
         """
         resp = system_service.get_session_types(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.get_session_types(self.base_url, self.tk)
         return resp
 
+    @response_cache.cached
     def get_server_version(self):
         """
         Get the version of the server being called
@@ -476,7 +547,7 @@ class systemClient:
         """
         resp = system_service.get_server_version(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.get_server_version(self.base_url, self.tk)
         return resp
 
@@ -490,7 +561,7 @@ class systemClient:
         """
         resp = system_service.get_volume_counts(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.get_volume_counts(self.base_url, self.tk)
         return resp
 
@@ -509,7 +580,7 @@ class systemClient:
         """
         resp = system_service.set_property(self.base_url, self.tk, file, property_name, value)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.remove_active_or_standby_server(self.base_url, self.tk, file)
         return resp
     
@@ -523,7 +594,7 @@ class systemClient:
         """
         resp = system_service.put_email_notifications_enabled(self.base_url, self.tk, enabled)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.put_email_notifications_enabled(self.base_url, self.tk, enabled)
         return resp
     
@@ -537,7 +608,7 @@ class systemClient:
         """
         resp = system_service.get_email_recipients(self.base_url, self.tk)
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.get_email_recipients(self.base_url, self.tk)
         return resp
     
@@ -551,7 +622,7 @@ class systemClient:
         """
         resp = system_service.add_email_recipients(self.base_url, self.tk, addresses, alert_type, session_names )
         if resp.status_code == 401:
-            self.tk = auth.get_token(self.base_url, self.username, self.password)
+            self.token_manager.refresh_token(auth.request_token(resp))
             return system_service.add_email_recipients(self.base_url, self.tk, addresses, alert_type, session_names)
         return resp
 
@@ -1,9 +1,9 @@
 # Copyright (C) 2022 IBM CORPORATION
 # Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
 
-import requests
+import os
 
-from pyCSM.util import utility
+from pyCSM.util import transport, utility
 
 properties = {
     "language": "en-US",
@@ -59,7 +59,7 @@ def get_devices(url, tk, device_type):
     queryparams = [dict(name="type", value=device_type)]
 
     get_url = utility.add_query_params(get_url, queryparams)
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def add_device(url, tk, device_type, device_ip, device_username,
@@ -103,8 +103,8 @@ def add_device(url, tk, device_type, device_ip, device_username,
         "seconddeviceusername": second_username,
         "seconddevicepassword": second_password
     }
-    return requests.put(addd_url, headers=headers, data=params,
-                        verify=properties["verify"], cert=properties["cert"])
+    return transport.put(addd_url, headers=headers, data=params,
+                         verify=properties["verify"], cert=properties["cert"])
 
 
 def remove_device(url, tk, system_id):
@@ -126,8 +126,8 @@ def remove_device(url, tk, system_id):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.delete(remove_url, headers=headers,
-                           verify=properties["verify"], cert=properties["cert"])
+    return transport.delete(remove_url, headers=headers,
+                            verify=properties["verify"], cert=properties["cert"])
 
 
 def update_device_site_location(url, tk, system_id, location):
@@ -153,8 +153,8 @@ def update_device_site_location(url, tk, system_id, location):
     params = {
         "location": location
     }
-    return requests.post(update_url, headers=headers, data=params,
-                         verify=properties["verify"], cert=properties["cert"])
+    return transport.post(update_url, headers=headers, data=params,
+                          verify=properties["verify"], cert=properties["cert"])
 
 
 def get_volumes(url, tk, system_name):
@@ -175,7 +175,40 @@ def get_volumes(url, tk, system_name):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"],
+                         conditional=True)
+
+
+def iter_volumes(url, tk, system_name, chunk_size=None, key="data.volumes"):
+    """
+    Use this method to go through all volumes for a given storage system one at a time.
+    The response is parsed as it is read from the connection, so the memory used does not grow
+    with the number of volumes on the storage system.
+
+    Args:
+        url (str): Base url of CSM server. ex. https://servername:port/CSM/web.
+        tk (str): Rest token for the CSM server.
+        system_name (str): The name of the storage system.
+        chunk_size (int): (Optional) Number of bytes read at a time.  Defaults to the transport "chunk_size" property.
+        key (str): Key path of the list of volumes when the response is an object.  A response that is a list
+            is used as is.
+
+    Returns:
+        A generator that yields the record of each volume on the storage system.
+        A requests.exceptions.HTTPError is raised before the first volume if the call fails.
+    """
+    get_url = f"{url}/storagedevices/volumes/{system_name}"
+    headers = {
+        "Accept-Language": properties["language"],
+        "X-Auth-Token": str(tk),
+        "Content-Type": "application/x-www-form-urlencoded"
+    }
+    resp = transport.request("GET", get_url, headers=headers, verify=properties["verify"],
+                             cert=properties["cert"], stream=True)
+    with resp:
+        resp.raise_for_status()
+        chunk_size = chunk_size or transport.get_properties()["chunk_size"]
+        yield from utility.iter_json_array(resp.iter_content(chunk_size=chunk_size), key)
 
 
 def export_vol_writeio_history(url, tk, session_name, start_time, end_time):
@@ -203,8 +236,8 @@ def export_vol_writeio_history(url, tk, session_name, start_time, end_time):
         "starttime": start_time,
         "endtime": end_time
     }
-    return requests.put(export_url, headers=headers, data=params,
-                        verify=properties["verify"], cert=properties["cert"])
+    return transport.put(export_url, headers=headers, data=params,
+                         verify=properties["verify"], cert=properties["cert"])
 
 
 def get_paths(url, tk):
@@ -224,7 +257,7 @@ def get_paths(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_path_on_storage_system(url, tk, system_id):
@@ -245,7 +278,7 @@ def get_path_on_storage_system(url, tk, system_id):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def refresh_config(url, tk, system_id):
@@ -268,7 +301,7 @@ def refresh_config(url, tk, system_id):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.put(refresh_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(refresh_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def map_volumes_to_host(url, tk, device_id, force,
@@ -315,7 +348,7 @@ def map_volumes_to_host(url, tk, device_id, force,
             "volumes": str(volumes)
         }
 
-    return requests.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_svchosts(url, tk, device_id):
@@ -337,7 +370,7 @@ def get_svchosts(url, tk, device_id):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def unmap_volumes_to_host(url, tk, device_id, force,
@@ -372,7 +405,7 @@ def unmap_volumes_to_host(url, tk, device_id, force,
         "isHostCluster": is_host_cluster,
         "volumes": str(volumes)
     }
-    return requests.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
 
 
 def update_connection_info(url, tk, device_ip, device_password, device_username,
@@ -406,7 +439,7 @@ def update_connection_info(url, tk, device_ip, device_password, device_username,
         "name": connection_name
     }
 
-    return requests.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
 
 
 
@@ -432,7 +465,7 @@ def get_zos_candidate(url, tk):
     params = {
     }
 
-    return requests.get(get_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
 
 
 
@@ -467,7 +500,7 @@ def add_zos_host(url, tk, host_ip, password, username, host_port):
         "hostport": host_port
     }
 
-    return requests.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
 
 
 def remove_zos_host(url, tk, host_ip, host_port):
@@ -496,7 +529,31 @@ def remove_zos_host(url, tk, host_ip, host_port):
         "hostport": host_port
     }
 
-    return requests.delete(delete_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
+    return transport.delete(delete_url, headers=headers, data=params,
+                            verify=properties["verify"], cert=properties["cert"])
+
+
+def load_zos_cert(cert):
+    """
+    Reads a certificate into memory once so that it can be sent to many servers, or sent again
+    after a token refresh, without opening or reading the file again.
+
+    Args:
+        cert: Path of the certificate file, an open binary file object, bytes,
+            or a tuple of (file name, bytes) as returned by this method.
+
+    Returns:
+        A tuple of the file name and the bytes of the certificate.  A file opened from a path is closed
+        before returning, a file object passed in is read but left open for the caller to close.
+    """
+    if isinstance(cert, tuple):
+        return cert
+    if isinstance(cert, (bytes, bytearray)):
+        return "file", bytes(cert)
+    if isinstance(cert, (str, os.PathLike)):
+        with open(cert, 'rb') as f:
+            return os.path.basename(cert), f.read()
+    return os.path.basename(getattr(cert, "name", "file")), cert.read()
 
 
 def add_zos_cert(url, tk, file_path):
@@ -506,7 +563,9 @@ def add_zos_cert(url, tk, file_path):
     Args:
         url (str): Base url of CSM server. ex. https://servername:port/CSM/web.
         tk (str): Rest token for the CSM server.
-        file_path (str): Path for given certificate file.
+        file_path: Path for given certificate file.  An open binary file object, bytes,
+            or a tuple of (file name, bytes) from load_zos_cert can also be passed in.
+            A file opened from a path is closed when the call completes.
 
     Returns:
         JSON String representing the result of the command.
@@ -518,11 +577,18 @@ def add_zos_cert(url, tk, file_path):
         "X-Auth-Token": str(tk),
     }
 
+    if isinstance(file_path, (str, os.PathLike)):
+        with open(file_path, 'rb') as f:
+            return transport.post(post_url, headers=headers, files={"file": f},
+                                  verify=properties["verify"], cert=properties["cert"])
+    if isinstance(file_path, (bytes, bytearray)):
+        file_path = load_zos_cert(file_path)
+
     files = {
-        "file": open(file_path, 'rb')
+        "file": file_path
     }
 
-    return requests.post(post_url, headers=headers, files=files, verify=properties["verify"], cert=properties["cert"])
+    return transport.post(post_url, headers=headers, files=files, verify=properties["verify"], cert=properties["cert"])
 
 def add_zos_device(url, tk, device_id):
     """
@@ -548,7 +614,7 @@ def add_zos_device(url, tk, device_id):
         "deviceid": device_id
     }
 
-    return requests.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_zos_host(url, tk):
@@ -569,7 +635,7 @@ def get_zos_host(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers,  verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers,  verify=properties["verify"], cert=properties["cert"])
 
 
 
@@ -594,4 +660,4 @@ def get_volumes_by_wwn(url, tk, wwn_name):
         "Content-Type": "application/x-www-form-urlencoded"
     }
 
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
@@ -1,7 +1,7 @@
 # Copyright (C) 2022 IBM CORPORATION
 # Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
 
-import requests
+from pyCSM.util import transport
 
 properties = {
     "language": "en-US",
@@ -54,7 +54,8 @@ def get_copysets(url, tk, name):
         "Accept-Language": properties["language"],
         "X-Auth-Token": str(tk),
     }
-    return requests.get(getcs_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(getcs_url, headers=headers, verify=properties["verify"], cert=properties["cert"],
+                         conditional=True)
 
 
 def add_copysets(url, tk, name, copysets, roleorder=None):
@@ -89,8 +90,8 @@ def add_copysets(url, tk, name, copysets, roleorder=None):
         "copysets": str(copysets),
         "roleOrder": str(roleorder)
     }
-    return requests.post(add_url, headers=headers, data=params,
-                         verify=properties["verify"], cert=properties["cert"])
+    return transport.post(add_url, headers=headers, data=params,
+                          verify=properties["verify"], cert=properties["cert"])
 
 
 def remove_copysets(url, tk, name, copysets, force=False, soft=False):
@@ -121,11 +122,11 @@ def remove_copysets(url, tk, name, copysets, force=False, soft=False):
     params = {
         "copysets": str(copysets)
     }
-    return requests.delete(remove_url, headers=headers,
-                           data=params, verify=properties["verify"], cert=properties["cert"])
+    return transport.delete(remove_url, headers=headers,
+                            data=params, verify=properties["verify"], cert=properties["cert"])
 
 
-def export_copysets(url, tk, name, file_name):
+def export_copysets(url, tk, name, file_name, chunk_size=None, callback=None):
     """
     Exports copysets as a csv file and downloads it to the calling system.
 
@@ -134,6 +135,9 @@ def export_copysets(url, tk, name, file_name):
         tk (str): Rest token for the CSM server.
         name:  Name of the session to export copysets for
         file_name: Name for the csv file location  (ex.  ""/Users/myuser/CSM/Export/myexport.csv")
+        chunk_size (int): (Optional) Number of bytes written at a time.
+            Defaults to the transport "chunk_size" property.
+        callback (function): (Optional) Called with (bytes_written, total_bytes) as the download progresses.
 
     Returns:
         JSON String representing the result of the command.
@@ -144,10 +148,8 @@ def export_copysets(url, tk, name, file_name):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    resp = requests.get(export_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
-    with open(file_name, 'wb') as f:
-        f.write(resp.content)
-    return resp
+    return transport.download(export_url, file_name, chunk_size, callback, headers=headers,
+                              verify=properties["verify"], cert=properties["cert"])
 
 
 def get_pair_info(url, tk, name, rolepair):
@@ -170,5 +172,5 @@ def get_pair_info(url, tk, name, rolepair):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
@@ -1,7 +1,7 @@
 # Copyright (C) 2022 IBM CORPORATION
 # Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
 
-import requests
+from pyCSM.util import transport
 
 properties = {
     "language": "en-US",
@@ -54,7 +54,8 @@ def get_scheduled_tasks(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(getst_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(getst_url, headers=headers, verify=properties["verify"], cert=properties["cert"],
+                         conditional=True)
 
 
 def get_scheduled_task(url, tk, taskid):
@@ -75,7 +76,7 @@ def get_scheduled_task(url, tk, taskid):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(getst_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(getst_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def create_scheduled_task(url, tk, json):
@@ -101,7 +102,7 @@ def create_scheduled_task(url, tk, json):
         "json": json
     }
 
-    return requests.put(put_url, headers=headers, verify=properties["verify"], cert=properties["cert"], data=params)
+    return transport.put(put_url, headers=headers, verify=properties["verify"], cert=properties["cert"], data=params)
 
 
 def duplicate_scheduled_task(url, tk, taskid):
@@ -123,7 +124,7 @@ def duplicate_scheduled_task(url, tk, taskid):
         "Content-Type": "application/x-www-form-urlencoded"
     }
 
-    return requests.put(put_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(put_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def enable_scheduled_task(url, tk, taskid):
@@ -145,7 +146,7 @@ def enable_scheduled_task(url, tk, taskid):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.post(enable_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.post(enable_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def disable_scheduled_task(url, tk, taskid):
@@ -168,8 +169,8 @@ def disable_scheduled_task(url, tk, taskid):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.post(disable_url, headers=headers,
-                         verify=properties["verify"], cert=properties["cert"])
+    return transport.post(disable_url, headers=headers,
+                          verify=properties["verify"], cert=properties["cert"])
 
 
 def run_scheduled_task(url, tk, taskid, synchronous=False):
@@ -192,7 +193,7 @@ def run_scheduled_task(url, tk, taskid, synchronous=False):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.post(run_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.post(run_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 def enable_scheduled_task_at_time(url, tk, task_id, start_time):
     """
@@ -215,7 +216,7 @@ def enable_scheduled_task_at_time(url, tk, task_id, start_time):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.post(post_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.post(post_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def run_scheduled_task_at_time(url, tk, task_id, start_time):
@@ -239,7 +240,7 @@ def run_scheduled_task_at_time(url, tk, task_id, start_time):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.post(post_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.post(post_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def delete_task(url, tk, taskid):
@@ -262,7 +263,7 @@ def delete_task(url, tk, taskid):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.post(delete_task_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.post(delete_task_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 def cancel_task(url, tk, taskid):
     """
@@ -284,7 +285,7 @@ def cancel_task(url, tk, taskid):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.post(cancel_task_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.post(cancel_task_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def run_task_now(url, tk, taskid, synchronous=False, step=0):
@@ -311,4 +312,4 @@ def run_task_now(url, tk, taskid, synchronous=False, step=0):
         "Content-Type": "application/json"
     }
     
-    return requests.post(run_task_now_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.post(run_task_now_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
@@ -3,8 +3,7 @@
 
 import json
 import time
-from datetime import datetime
-import requests
+from pyCSM.util import transport
 
 properties = {
     "language": "en-US",
@@ -64,8 +63,8 @@ def create_session(url, tk, name, sess_type, desc=None):
         "type": sess_type,
         "description": desc
     }
-    return requests.put(create_url, headers=headers, data=params,
-                        verify=properties["verify"], cert=properties["cert"])
+    return transport.put(create_url, headers=headers, data=params,
+                         verify=properties["verify"], cert=properties["cert"])
 
 
 def delete_session(url, tk, name):
@@ -88,8 +87,8 @@ def delete_session(url, tk, name):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.delete(delete_url, headers=headers,
-                           verify=properties["verify"], cert=properties["cert"])
+    return transport.delete(delete_url, headers=headers,
+                            verify=properties["verify"], cert=properties["cert"])
 
 
 def get_session_info(url, tk, name):
@@ -111,7 +110,7 @@ def get_session_info(url, tk, name):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(getsi_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(getsi_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_session_overviews(url, tk):
@@ -133,7 +132,8 @@ def get_session_overviews(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(gets_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(gets_url, headers=headers, verify=properties["verify"], cert=properties["cert"],
+                         conditional=True)
 
 
 def get_session_overviews_short(url, tk):
@@ -155,7 +155,7 @@ def get_session_overviews_short(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(gets_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(gets_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_available_commands(url, tk, name):
@@ -178,7 +178,7 @@ def get_available_commands(url, tk, name):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(getc_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(getc_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def modify_session_description(url, tk, name, desc):
@@ -203,8 +203,8 @@ def modify_session_description(url, tk, name, desc):
     params = {
         "description": desc
     }
-    return requests.post(desc_url, headers=headers, data=params,
-                         verify=properties["verify"], cert=properties["cert"])
+    return transport.post(desc_url, headers=headers, data=params,
+                          verify=properties["verify"], cert=properties["cert"])
 
 
 def run_session_command(url, tk, ses_name, com_name):
@@ -229,14 +229,18 @@ def run_session_command(url, tk, ses_name, com_name):
     params = {
         "cmd": com_name
     }
-    return requests.post(runc_url, headers=headers, data=params,
-                         verify=properties["verify"], cert=properties["cert"])
+    return transport.post(runc_url, headers=headers, data=params,
+                          verify=properties["verify"], cert=properties["cert"])
 
 
-def wait_for_state(url, tk, ses_name, state, minutes=5, debug=False):
+def wait_for_state(url, tk, ses_name, state, minutes=5, debug=False,
+                   initial_interval=1, max_interval=30, backoff=2, deadline=None):
     """
     Runs until the session is in a given state
     or until it times out and returns the results.
+    The session is polled after a short initial interval which grows by the backoff factor
+    after each poll up to the maximum interval, so quick state changes are seen quickly
+    and long waits do not poll more often than needed.
 
     Args:
         url (str): Base url of CSM server. ex. https://servername:port/CSM/web.
@@ -245,33 +249,46 @@ def wait_for_state(url, tk, ses_name, state, minutes=5, debug=False):
         state (str): state of the server that user wants to wait for.
         minutes (double): number of minutes before it times out
         debug (boolean): True if you want the state and status to print in console
+        initial_interval (double): seconds to wait before the second poll
+        max_interval (double): maximum number of seconds to wait between polls
+        backoff (double): factor the interval is multiplied by after each poll
+        deadline (double): (Optional) time.monotonic() value at which to time out
+            if it is earlier than the number of minutes
 
     Returns:
-        A dictionary with "state_reached": boolean for whether the state was reached
-        and "session_info": JSON string representing the response of the command
-    """
-    start_time = datetime.utcnow()
-    resp = get_session_info(url, tk, ses_name)
-    time_passed = (datetime.utcnow() - start_time).total_seconds()
-    while str(json.loads(resp.text)['state']) != state \
-            and time_passed < minutes * 60:
-        if debug:
-            print("Status: " + json.loads(resp.text)['status']
-                  + ", State: " + json.loads(resp.text)['state'])
-        time.sleep(10)
+        A dictionary with "state_reached": boolean for whether the state was reached,
+        "session_info": JSON string representing the response of the command,
+        "polls": the number of times the session was queried and
+        "elapsed_seconds": the number of seconds until the state was seen or the wait ended
+    """
+    start_time = time.monotonic()
+    end_time = start_time + minutes * 60
+    if deadline is not None:
+        end_time = min(end_time, deadline)
+    interval = initial_interval
+    polls = 0
+    while True:
         resp = get_session_info(url, tk, ses_name)
+        polls += 1
+        now = time.monotonic()
+        result = {"state_reached": False, "session_info": resp,
+                  "polls": polls, "elapsed_seconds": now - start_time}
         if resp.status_code == 401:
-            return {"state_reached": False, "session_info": resp}
-        time_passed = (datetime.utcnow() - start_time).total_seconds()
-
-    if time_passed < minutes * 60:
-        if debug:
-            print(f"Session has reached {state} state.")
-        return {"state_reached": True, "session_info": resp}
-    else:
+            return result
+        info = resp.json()
+        if str(info['state']) == state:
+            if debug:
+                print(f"Session has reached {state} state.")
+            result["state_reached"] = True
+            return result
+        if now >= end_time:
+            if debug:
+                print(f'Timeout: Command exceeded {minutes} minutes.')
+            return result
         if debug:
-            print(f'Timeout: Command exceeded {minutes} minutes.')
-        return {"state_reached": False, "session_info": resp}
+            print("Status: " + info['status'] + ", State: " + info['state'])
+        time.sleep(min(interval, end_time - now))
+        interval = min(interval * backoff, max_interval)
 
 
 def sgc_recover(url, tk, ses_name, com_name, role, backup_id):
@@ -298,8 +315,8 @@ def sgc_recover(url, tk, ses_name, com_name, role, backup_id):
     params = {
         "cmd": com_name
     }
-    return requests.post(rec_url, headers=headers, data=params,
-                         verify=properties["verify"], cert=properties["cert"])
+    return transport.post(rec_url, headers=headers, data=params,
+                          verify=properties["verify"], cert=properties["cert"])
 
 
 def get_backup_details(url, tk, name, role, backup_id):
@@ -322,7 +339,7 @@ def get_backup_details(url, tk, name, role, backup_id):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_snapshot_details_by_name(url, tk, name, role, snapshot_name):
@@ -345,7 +362,7 @@ def get_snapshot_details_by_name(url, tk, name, role, snapshot_name):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def run_backup_command(url, tk, name, role, backup_id, cmd):
@@ -372,7 +389,7 @@ def run_backup_command(url, tk, name, role, backup_id, cmd):
     params = {
         "cmd": cmd
     }
-    return requests.post(post_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
+    return transport.post(post_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
 
 
 def export_lss_oos_history(url, tk, name, rolepair, start_time,
@@ -401,7 +418,7 @@ def export_lss_oos_history(url, tk, name, rolepair, start_time,
         "starttime": start_time,
         "endtime": end_time
     }
-    return requests.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
 
 
 def export_device_writeio_history(url, tk, name, start_time,
@@ -429,7 +446,7 @@ def export_device_writeio_history(url, tk, name, start_time,
         "starttime": start_time,
         "endtime": end_time
     }
-    return requests.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_rpo_history(url, tk, name, rolepair, start_time,
@@ -457,7 +474,7 @@ def get_rpo_history(url, tk, name, rolepair, start_time,
         "starttime": start_time,
         "endtime": end_time
     }
-    return requests.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_recovered_backups(url, tk, name):
@@ -478,7 +495,7 @@ def get_recovered_backups(url, tk, name):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_recovered_backup_details(url, tk, name, backup_id):
@@ -500,7 +517,7 @@ def get_recovered_backup_details(url, tk, name, backup_id):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_snapshot_clones(url, tk, name):
@@ -521,7 +538,7 @@ def get_snapshot_clones(url, tk, name):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def create_session_by_volgroup_name(url, tk, volgroup, type, desc=None):
@@ -550,7 +567,7 @@ def create_session_by_volgroup_name(url, tk, volgroup, type, desc=None):
         "type": type,
         "description": desc
     }
-    return requests.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_snapshot_clone_details_by_name(url, tk, name, snapshot_name):
@@ -572,7 +589,7 @@ def get_snapshot_clone_details_by_name(url, tk, name, snapshot_name):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_rolepair_info(url, tk, name, rolepair):
@@ -594,7 +611,7 @@ def get_rolepair_info(url, tk, name, rolepair):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 def get_session_options(url, tk, name):
     """
@@ -616,7 +633,7 @@ def get_session_options(url, tk, name):
         "Content-Type": "application/json" 
     }
     
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties.get("cert"))    
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties.get("cert"))    
 
 def set_session_options(url, tk, name, options_str):
     """
@@ -660,7 +677,7 @@ def set_session_options(url, tk, name, options_str):
         payload = json.dumps(payload)
 
     params = {"options": payload}
-    return requests.put( set_url, headers=headers,data=params, verify=properties["verify"],cert=properties["cert"])
+    return transport.put( set_url, headers=headers,data=params, verify=properties["verify"],cert=properties["cert"])
 
 
 
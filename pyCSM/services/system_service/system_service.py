@@ -1,9 +1,7 @@
 # Copyright (C) 2022 IBM CORPORATION
 # Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
 
-import requests
-
-from pyCSM.util import utility
+from pyCSM.util import transport, utility
 
 properties = {
     "language": "en-US",
@@ -56,7 +54,7 @@ def create_log_pkg(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.put(make_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(make_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_log_pkgs(url, tk):
@@ -77,7 +75,36 @@ def get_log_pkgs(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+
+
+def download_log_pkg(url, tk, name, file_name, chunk_size=None, callback=None, resume=False, checksum=None):
+    """
+    Downloads a log package that is already on the server, as listed by get_log_pkgs.
+
+    Args:
+        url (str): Base url of CSM server. ex. https://servername:port/CSM/web.
+        tk (str): Rest token for the CSM server.
+        name (str): Name of the log package on the server.
+        file_name: Name of the file to write the log package to
+        chunk_size (int): (Optional) Number of bytes written at a time.
+            Defaults to the transport "chunk_size" property.
+        callback (function): (Optional) Called with (bytes_written, total_bytes) as the download progresses.
+        resume (boolean): True to continue a partial download left by an earlier call instead of starting over.
+        checksum (str): (Optional) Expected checksum of the file as "algorithm:hexdigest". ex. "sha256:9f86d0..."
+
+    Returns:
+        A file downloaded into the client with the specified filename
+    """
+    get_url = f"{url}/system/logpackages/download"
+    headers = {
+        "Accept-Language": properties["language"],
+        "X-Auth-Token": str(tk),
+        "Content-Type": "application/x-www-form-urlencoded"
+    }
+    get_url = utility.add_query_params(get_url, [dict(name="name", value=name)])
+    return transport.download(get_url, file_name, chunk_size, callback, resume, checksum, headers=headers,
+                              verify=properties["verify"], cert=properties["cert"])
 
 
 def backup_server(url, tk):
@@ -99,7 +126,7 @@ def backup_server(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.put(backup_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(backup_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_server_backups(url, tk):
@@ -120,10 +147,10 @@ def get_server_backups(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(backup_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(backup_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
-def backup_server_and_download(url, tk, file_name):
+def backup_server_and_download(url, tk, file_name, chunk_size=None, callback=None, resume=False, checksum=None):
     """
     Create and downloads a server backup.
 
@@ -131,6 +158,11 @@ def backup_server_and_download(url, tk, file_name):
         url (str): Base url of CSM server. ex. https://servername:port/CSM/web.
         tk (str): Rest token for the CSM server.
         file_name:  The file to write the server backup to
+        chunk_size (int): (Optional) Number of bytes written at a time.
+            Defaults to the transport "chunk_size" property.
+        callback (function): (Optional) Called with (bytes_written, total_bytes) as the download progresses.
+        resume (boolean): True to continue a partial download left by an earlier call instead of starting over.
+        checksum (str): (Optional) Expected checksum of the file as "algorithm:hexdigest". ex. "sha256:9f86d0..."
 
     Returns:
         A file downloaded into the client with the specified filename
@@ -142,10 +174,8 @@ def backup_server_and_download(url, tk, file_name):
         "Content-Type": "application/x-www-form-urlencoded"
     }
 
-    resp = requests.get(backup_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
-    with open(file_name, 'wb') as f:
-        f.write(resp.content)
-    return resp
+    return transport.download(backup_url, file_name, chunk_size, callback, resume, checksum, headers=headers,
+                              verify=properties["verify"], cert=properties["cert"])
 
 
 def set_server_as_standby(url, tk, active_server):
@@ -170,7 +200,7 @@ def set_server_as_standby(url, tk, active_server):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.put(set_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(set_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_dual_control_state(url, tk):
@@ -191,7 +221,7 @@ def get_dual_control_state(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def change_dual_control_state(url, tk, enable):
@@ -214,7 +244,7 @@ def change_dual_control_state(url, tk, enable):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.post(post_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.post(post_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_dual_control_requests(url, tk):
@@ -235,7 +265,7 @@ def get_dual_control_requests(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def approve_dual_control_request(url, tk, id):
@@ -258,7 +288,7 @@ def approve_dual_control_request(url, tk, id):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.post(post_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.post(post_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def reject_dual_control_request(url, tk, id, comment):
@@ -282,7 +312,7 @@ def reject_dual_control_request(url, tk, id, comment):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.post(post_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.post(post_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_active_standby_status(url, tk):
@@ -303,7 +333,7 @@ def get_active_standby_status(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def reconnect_active_standby_server(url, tk):
@@ -324,7 +354,7 @@ def reconnect_active_standby_server(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.put(put_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(put_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def remove_active_or_standby_server(url, tk, haServer):
@@ -346,7 +376,7 @@ def remove_active_or_standby_server(url, tk, haServer):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.put(put_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(put_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def set_standby_server(url, tk, standby_server, standby_username, standby_password):
@@ -371,7 +401,7 @@ def set_standby_server(url, tk, standby_server, standby_username, standby_passwo
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.put(put_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(put_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def takeover_standby_server(url, tk):
@@ -392,7 +422,7 @@ def takeover_standby_server(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.put(put_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(put_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_log_events(url, tk, count, session=None):
@@ -421,10 +451,10 @@ def get_log_events(url, tk, count, session=None):
 
     get_url = utility.add_query_params(get_url, queryparams)
 
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
-def create_and_download_log_pkg(url, tk, file_name):
+def create_and_download_log_pkg(url, tk, file_name, chunk_size=None, callback=None, resume=False, checksum=None):
     """
     This method will package all log files on the server into a .jar file
     that can be used for support - this call is a synchronous call and
@@ -434,6 +464,11 @@ def create_and_download_log_pkg(url, tk, file_name):
         url (str): Base url of CSM server. ex. https://servername:port/CSM/web.
         tk (str): Rest token for the CSM server.
         file_name: Name of the file to write the log package to
+        chunk_size (int): (Optional) Number of bytes written at a time.
+            Defaults to the transport "chunk_size" property.
+        callback (function): (Optional) Called with (bytes_written, total_bytes) as the download progresses.
+        resume (boolean): True to continue a partial download left by an earlier call instead of starting over.
+        checksum (str): (Optional) Expected checksum of the file as "algorithm:hexdigest". ex. "sha256:9f86d0..."
 
     Returns:
         JSON String representing the result of the command.
@@ -445,10 +480,8 @@ def create_and_download_log_pkg(url, tk, file_name):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    resp = requests.get(put_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
-    with open(file_name, 'wb') as f:
-        f.write(resp.content)
-    return resp
+    return transport.download(put_url, file_name, chunk_size, callback, resume, checksum, headers=headers,
+                              verify=properties["verify"], cert=properties["cert"])
 
 
 def get_session_types(url, tk):
@@ -469,7 +502,7 @@ def get_session_types(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_server_version(url, tk):
@@ -490,7 +523,7 @@ def get_server_version(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 
 def get_volume_counts(url, tk):
@@ -511,7 +544,7 @@ def get_volume_counts(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 def set_property(url, tk, file, property_name, value):
     """
@@ -534,7 +567,7 @@ def set_property(url, tk, file, property_name, value):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.put(put_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(put_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 def get_email_notifications_enabled(url, tk):
     """
@@ -554,7 +587,7 @@ def get_email_notifications_enabled(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 def put_email_notifications_enabled(url, tk, enabled):
     """
@@ -581,7 +614,7 @@ def put_email_notifications_enabled(url, tk, enabled):
     params = {
         "enabled" : enabled 
     }
-    return requests.put(set_url, headers=headers, data = params, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(set_url, headers=headers, data = params, verify=properties["verify"], cert=properties["cert"])
 
 def get_email_recipients(url, tk):
     """
@@ -601,7 +634,7 @@ def get_email_recipients(url, tk):
         "X-Auth-Token": str(tk),
         "Content-Type": "application/x-www-form-urlencoded"
     }
-    return requests.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
+    return transport.get(get_url, headers=headers, verify=properties["verify"], cert=properties["cert"])
 
 def add_email_recipients(url, tk, addresses, alert_type, session_names):
     """
@@ -632,7 +665,7 @@ def add_email_recipients(url, tk, addresses, alert_type, session_names):
         "alert_type" : alert_type, 
         "session_names" : str(session_names)
     }
-    return requests.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
+    return transport.put(put_url, headers=headers, data=params, verify=properties["verify"], cert=properties["cert"])
 
 
 
@@ -0,0 +1,180 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import asyncio
+import inspect
+import unittest
+from http import HTTPStatus
+from unittest.mock import patch
+
+import responses
+
+from pyCSM.authorization import auth
+from pyCSM.clients import async_client
+from pyCSM.clients.async_client import asyncSessionClient, asyncHardwareClient, asyncSystemClient
+from pyCSM.clients.session_client import sessionClient
+from pyCSM.util import response_cache
+
+
+class TestAsyncClient(unittest.TestCase):
+    """Test cases for the asyncio clients"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.base_url = "https://testserver:8088/CSM/web"
+        self.token_url = f"{self.base_url}/system/v1/tokens"
+        auth._token_managers.clear()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        async_client.shutdown()
+        auth._token_managers.clear()
+        super().tearDown()
+
+    def test_same_method_names(self):
+        """Test that the async clients expose the methods of the blocking clients as coroutines"""
+        for async_class in (asyncSessionClient, asyncHardwareClient, asyncSystemClient):
+            for name in ("get_properties", "change_properties"):
+                assert asyncio.iscoroutinefunction(getattr(async_class, name))
+        assert asyncio.iscoroutinefunction(asyncSessionClient.get_session_info)
+        assert asyncio.iscoroutinefunction(asyncHardwareClient.get_volumes)
+        assert asyncio.iscoroutinefunction(asyncSystemClient.get_server_version)
+        assert asyncSessionClient.get_session_info.__doc__ is not None
+        for name in ("wait_for_state", "wait_for_states"):
+            assert asyncio.iscoroutinefunction(getattr(asyncSessionClient, name))
+        for async_class, name in ((asyncSessionClient, "iter_wait_for_states"),
+                                  (asyncSessionClient, "iter_remove_copysets"),
+                                  (asyncHardwareClient, "iter_volumes")):
+            assert inspect.isasyncgenfunction(getattr(async_class, name))
+
+    def test_executor_per_server(self):
+        """Test that each server has its own workers, sized by the max_workers_per_server property"""
+        original = dict(async_client.get_properties())
+        try:
+            async_client.change_properties({"max_workers_per_server": 3})
+            executor = async_client._get_executor(self.base_url)
+            assert async_client._get_executor(f"{self.base_url}/sessions") is executor
+            assert async_client._get_executor("https://otherserver:9559/CSM/web") is not executor
+            assert executor._max_workers == 3
+        finally:
+            async_client.change_properties(original)
+
+    @responses.activate
+    def test_waits_do_not_hold_workers(self):
+        """Test that waiting sessions sleep on the event loop instead of holding a worker between polls"""
+        for name in ("SessA", "SessB"):
+            responses.add(responses.GET, f"{self.base_url}/sessions/{name}",
+                          json={"name": name, "state": "Preparing", "status": "Normal"}, status=HTTPStatus.OK.value)
+            responses.add(responses.GET, f"{self.base_url}/sessions/{name}",
+                          json={"name": name, "state": "Prepared", "status": "Normal"}, status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions",
+                      json=[{"name": "SessA", "state": "Prepared"}], status=HTTPStatus.OK.value)
+        original = dict(async_client.get_properties())
+
+        async def run():
+            client = asyncSessionClient("testserver", "8088", "csmadmin", "csm", token="token_1")
+            return await asyncio.gather(client.wait_for_state("SessA", "Prepared", 1, initial_interval=0.05),
+                                        client.wait_for_state("SessB", "Prepared", 1, initial_interval=0.05),
+                                        client.wait_for_states({"SessA": "Prepared"}))
+
+        try:
+            async_client.change_properties({"max_workers_per_server": 1})
+            with patch("pyCSM.services.session_service.session_service.time.sleep",
+                       side_effect=AssertionError("a worker was put to sleep")), \
+                    patch("pyCSM.clients.session_client.time.sleep",
+                          side_effect=AssertionError("a worker was put to sleep")):
+                results = asyncio.run(run())
+        finally:
+            async_client.change_properties(original)
+
+        assert [result["state_reached"] for result in results[:2]] == [True, True]
+        assert results[2]["SessA"]["state_reached"] is True
+        polled = [call.request.url.rsplit("/", 1)[-1] for call in responses.calls]
+        # Both sessions were polled once before either was polled again, although there is one worker
+        assert sorted(polled[:3]) == ["SessA", "SessB", "sessions"]
+
+    @responses.activate
+    def test_properties_without_login(self):
+        """Test that the properties are read without logging in to the server"""
+        client = asyncSessionClient("testserver", "8088", "csmadmin", "csm")
+
+        properties = asyncio.run(client.get_properties())
+
+        assert properties == sessionClient.get_properties()
+        assert len(responses.calls) == 0
+
+    @responses.activate
+    def test_async_iterator(self):
+        """Test that a generator method of the blocking client is an async iterator"""
+        volumes = [{"id": "0000"}, {"id": "0001"}, {"id": "0002"}]
+        responses.add(responses.GET, f"{self.base_url}/storagedevices/volumes/DS8K",
+                      json={"data": {"volumes": volumes}}, status=HTTPStatus.OK.value)
+
+        async def run():
+            client = asyncHardwareClient("testserver", "8088", "csmadmin", "csm", token="token_1")
+            return [volume async for volume in client.iter_volumes("DS8K", chunk_size=10)]
+
+        assert asyncio.run(run()) == volumes
+
+    @responses.activate
+    def test_response_cache(self):
+        """Test that the response cache is passed to the blocking client"""
+        responses.add(responses.GET, f"{self.base_url}/system/version",
+                      json={"version": "6.3.2"}, status=HTTPStatus.OK.value)
+        cache = response_cache.responseCache()
+
+        async def run():
+            client = asyncSystemClient("testserver", "8088", "csmadmin", "csm", token="token_1",
+                                       response_cache=cache)
+            await client.get_server_version()
+            return await client.get_server_version()
+
+        assert asyncio.run(run()).json()["version"] == "6.3.2"
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_concurrent_calls_share_token(self):
+        """Test that concurrent calls from all async clients share one login"""
+        responses.add(responses.POST, self.token_url, json={"token": "token_1"}, status=HTTPStatus.OK.value)
+        for name in ("SessA", "SessB", "SessC"):
+            responses.add(responses.GET, f"{self.base_url}/sessions/{name}",
+                          json={"name": name}, status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/system/version",
+                      json={"version": "6.3.2"}, status=HTTPStatus.OK.value)
+
+        async def run():
+            sess_client = asyncSessionClient("testserver", "8088", "csmadmin", "csm")
+            sys_client = asyncSystemClient("testserver", "8088", "csmadmin", "csm")
+            return await asyncio.gather(sess_client.get_session_info("SessA"),
+                                        sess_client.get_session_info("SessB"),
+                                        sess_client.get_session_info("SessC"),
+                                        sys_client.get_server_version())
+
+        results = asyncio.run(run())
+
+        assert [resp.json() for resp in results[:3]] == [{"name": "SessA"}, {"name": "SessB"}, {"name": "SessC"}]
+        assert results[3].json()["version"] == "6.3.2"
+        logins = [call for call in responses.calls if call.request.url == self.token_url]
+        assert len(logins) == 1
+
+    @responses.activate
+    def test_expired_token_retried(self):
+        """Test that an expired token is refreshed and the call retried"""
+        responses.add(responses.POST, self.token_url, json={"token": "token_2"}, status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/storagedevices/volumes/DS8K",
+                      status=HTTPStatus.UNAUTHORIZED.value)
+        responses.add(responses.GET, f"{self.base_url}/storagedevices/volumes/DS8K",
+                      json=[], status=HTTPStatus.OK.value)
+
+        async def run():
+            async with asyncHardwareClient("testserver", "8088", "csmadmin", "csm", token="token_1") as client:
+                return await client.get_volumes("DS8K")
+
+        resp = asyncio.run(run())
+
+        assert resp.status_code == HTTPStatus.OK.value
+        assert responses.calls[-1].request.headers["X-Auth-Token"] == "token_2"
+
+
+if __name__ == '__main__':
+    unittest.main()
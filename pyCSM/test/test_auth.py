@@ -0,0 +1,180 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from unittest.mock import patch
+
+import responses
+
+from pyCSM.authorization import auth
+from pyCSM.clients.session_client import sessionClient
+from pyCSM.clients.hardware_client import hardwareClient
+from pyCSM.clients.system_client import systemClient
+
+
+class TestTokenManager(unittest.TestCase):
+    """Test cases for the shared token manager"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.base_url = "https://testserver:8088/CSM/web"
+        self.token_url = f"{self.base_url}/system/v1/tokens"
+        auth._token_managers.clear()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        auth._token_managers.clear()
+        super().tearDown()
+
+    def add_tokens(self, *tokens):
+        for token in tokens:
+            responses.add(responses.POST, self.token_url, json={"token": token}, status=HTTPStatus.OK.value)
+
+    @responses.activate
+    def test_clients_share_one_login(self):
+        """Test that all three clients for the same server and user log in once"""
+        self.add_tokens("token_1")
+
+        sess_client = sessionClient("testserver", "8088", "csmadmin", "csm")
+        hw_client = hardwareClient("testserver", "8088", "csmadmin", "csm")
+        sys_client = systemClient("testserver", "8088", "csmadmin", "csm")
+
+        assert len(responses.calls) == 1
+        assert sess_client.token_manager is hw_client.token_manager is sys_client.token_manager
+        assert sess_client.tk == hw_client.tk == sys_client.tk == "token_1"
+
+    @responses.activate
+    def test_refresh_once_across_clients(self):
+        """Test that an expired token is refreshed once for every client sharing the manager"""
+        self.add_tokens("token_1", "token_2")
+        responses.add(responses.GET, f"{self.base_url}/sessions", status=HTTPStatus.UNAUTHORIZED.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions", json=[], status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/system/version", json={}, status=HTTPStatus.OK.value)
+
+        sess_client = sessionClient("testserver", "8088", "csmadmin", "csm")
+        sys_client = systemClient("testserver", "8088", "csmadmin", "csm")
+
+        assert sess_client.get_session_overviews().status_code == HTTPStatus.OK.value
+        assert sys_client.get_server_version().status_code == HTTPStatus.OK.value
+
+        logins = [call for call in responses.calls if call.request.url == self.token_url]
+        assert len(logins) == 2
+        assert sess_client.tk == sys_client.tk == "token_2"
+        assert responses.calls[-1].request.headers["X-Auth-Token"] == "token_2"
+
+    @responses.activate
+    def test_stale_token_does_not_login_again(self):
+        """Test that a 401 for a token that was already replaced does not log in again"""
+        self.add_tokens("token_1", "token_2")
+        manager = auth.get_token_manager(self.base_url, "csmadmin", "csm")
+
+        assert manager.get_token() == "token_1"
+        assert manager.refresh_token("token_1") == "token_2"
+        assert manager.refresh_token("token_1") == "token_2"
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_concurrent_refresh_single_flight(self):
+        """Test that concurrent 401s from many threads cause a single login"""
+        logins = []
+
+        def login_callback(request):
+            logins.append(request)
+            time.sleep(0.05)
+            return (HTTPStatus.OK.value, {}, json.dumps({"token": f"token_{len(logins) + 1}"}))
+
+        def sessions_callback(request):
+            if request.headers["X-Auth-Token"] == "token_1":
+                return (HTTPStatus.UNAUTHORIZED.value, {}, "")
+            return (HTTPStatus.OK.value, {}, "[]")
+
+        responses.add_callback(responses.POST, self.token_url, callback=login_callback)
+        responses.add_callback(responses.GET, f"{self.base_url}/sessions", callback=sessions_callback)
+
+        sess_client = sessionClient("testserver", "8088", "csmadmin", token="token_1", password="csm")
+        barrier = threading.Barrier(8)
+
+        def call():
+            barrier.wait()
+            return sess_client.get_session_overviews().status_code
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: call(), range(8)))
+
+        assert results == [HTTPStatus.OK.value] * 8
+        assert len(logins) == 1
+        assert sess_client.tk == "token_2"
+
+    @responses.activate
+    def test_client_from_existing_token(self):
+        """Test that a client built from an existing token does not log in"""
+        responses.add(responses.GET, f"{self.base_url}/sessions", json=[], status=HTTPStatus.OK.value)
+
+        sess_client = sessionClient("testserver", "8088", "csmadmin", token="existing_token")
+        sess_client.get_session_overviews()
+
+        assert len(responses.calls) == 1
+        assert responses.calls[0].request.headers["X-Auth-Token"] == "existing_token"
+
+    @responses.activate
+    def test_client_from_token_manager(self):
+        """Test that a client built from a token manager uses the manager's token"""
+        manager = auth.tokenManager(self.base_url, "csmadmin", "csm", token="manager_token")
+
+        hw_client = hardwareClient("testserver", "8088", "csmadmin", token_manager=manager)
+
+        assert len(responses.calls) == 0
+        assert hw_client.token_manager is manager
+        assert hw_client.tk == "manager_token"
+
+    @responses.activate
+    def test_proactive_refresh_before_expiry(self):
+        """Test that a token close to its lifetime is refreshed before it is used"""
+        self.add_tokens("token_1", "token_2")
+        responses.add(responses.GET, f"{self.base_url}/sessions", json=[], status=HTTPStatus.OK.value)
+
+        with patch("pyCSM.authorization.auth.time.monotonic") as monotonic:
+            monotonic.return_value = 1000.0
+            sess_client = sessionClient("testserver", "8088", "csmadmin", "csm")
+            monotonic.return_value = (1000.0 + auth.properties["token_lifetime"]
+                                      - auth.properties["token_refresh_margin"])
+            sess_client.get_session_overviews()
+
+        assert responses.calls[-1].request.headers["X-Auth-Token"] == "token_2"
+        assert sess_client.token_manager.get_statistics() == {
+            "logins": 2,
+            "proactive_refreshes": 1,
+            "expired_refreshes": 0
+        }
+
+    @responses.activate
+    def test_expired_refresh_counted(self):
+        """Test that a refresh after a 401 is reported in the statistics"""
+        self.add_tokens("token_1", "token_2")
+        responses.add(responses.GET, f"{self.base_url}/sessions", status=HTTPStatus.UNAUTHORIZED.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions", json=[], status=HTTPStatus.OK.value)
+
+        sess_client = sessionClient("testserver", "8088", "csmadmin", "csm")
+        sess_client.get_session_overviews()
+
+        assert sess_client.token_manager.get_statistics() == {
+            "logins": 2,
+            "proactive_refreshes": 0,
+            "expired_refreshes": 1
+        }
+
+    def test_refresh_without_password(self):
+        """Test that refreshing a token without a password raises an error"""
+        manager = auth.get_token_manager(self.base_url, "csmadmin", token="existing_token")
+
+        with self.assertRaises(ValueError):
+            manager.refresh_token("existing_token")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import os
+import tempfile
+import time
+import unittest
+from http import HTTPStatus
+
+import requests
+import responses
+
+from pyCSM.authorization import auth
+from pyCSM.clients.backup_archive import backupArchive
+from pyCSM.clients.system_client import systemClient
+
+
+class TestBackupArchive(unittest.TestCase):
+    """Test cases for the deduplicated backup archive"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.download_url = "https://testserver:8088/CSM/web/system/backupserver/download"
+        auth._token_managers.clear()
+        self.client = systemClient("testserver", "8088", "csmadmin", token="test_token_12345")
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temp_dir.name
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.temp_dir.cleanup()
+        auth._token_managers.clear()
+        super().tearDown()
+
+    @responses.activate
+    def test_identical_backups_stored_once(self):
+        """Test that backups with the same content are stored once and indexed separately"""
+        for body in (b"backup one", b"backup one", b"backup two"):
+            responses.add(responses.GET, self.download_url, body=body, status=HTTPStatus.OK.value)
+        archive = backupArchive(self.directory)
+
+        entries = [archive.backup(self.client) for _ in range(3)]
+
+        assert [entry["new"] for entry in entries] == [True, False, True]
+        assert entries[0]["checksum"] == entries[1]["checksum"] != entries[2]["checksum"]
+        assert len(os.listdir(os.path.join(self.directory, "objects"))) == 2
+        assert archive.get_statistics() == {"backups": 3, "objects": 2, "stored_bytes": 20, "logical_bytes": 30}
+        restored = os.path.join(self.directory, "restored.zip")
+        archive.restore(archive.get_entries("testserver:8088")[0], restored)
+        with open(restored, "rb") as f:
+            assert f.read() == b"backup one"
+
+    @responses.activate
+    def test_retention_removes_unreferenced_objects(self):
+        """Test that backups beyond the retention policy are removed with their stored content"""
+        for body in (b"backup one", b"backup two", b"backup two"):
+            responses.add(responses.GET, self.download_url, body=body, status=HTTPStatus.OK.value)
+        archive = backupArchive(self.directory, keep_last=2)
+
+        for _ in range(3):
+            archive.backup(self.client)
+            time.sleep(0.01)
+
+        entries = archive.get_entries()
+        assert len(entries) == 2
+        assert entries[0]["checksum"] == entries[1]["checksum"]
+        assert os.listdir(os.path.join(self.directory, "objects")) == [entries[0]["checksum"].replace(":", "-")]
+
+    @responses.activate
+    def test_failed_backup_not_indexed(self):
+        """Test that a failed download raises and leaves the archive unchanged"""
+        responses.add(responses.GET, self.download_url, status=HTTPStatus.INTERNAL_SERVER_ERROR.value)
+        archive = backupArchive(self.directory)
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            archive.backup(self.client)
+
+        assert archive.get_entries() == []
+        assert sorted(os.listdir(self.directory)) == ["objects"]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from http import HTTPStatus
+
+import responses
+
+from pyCSM.services.session_service import copyset_service
+from pyCSM.util import copysets
+
+
+class TestCopysets(unittest.TestCase):
+    """Test cases for the copy set collections"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.base_url = "https://testserver:8088/CSM/web"
+        self.token = "test_token_12345"
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _pairs(start, stop):
+        return [[f"DS8000:2107.GXZ91:VOL:{i:04X}", f"DS8000:2107.HXZ91:VOL:{i:04X}"] for i in range(start, stop)]
+
+    """VOLUME IDS"""
+
+    def test_volume_id_parts(self):
+        """Test the parts of a volume identifier"""
+        vol = copysets.volumeId("DS8000:2107.GXZ91:VOL:D000")
+
+        assert vol == "DS8000:2107.GXZ91:VOL:D000"
+        assert vol.device_type == "DS8000"
+        assert vol.system == "2107.GXZ91"
+        assert vol.volume == "D000"
+        assert hash(vol) == hash("DS8000:2107.GXZ91:VOL:D000")
+
+    def test_volume_ids_interned(self):
+        """Test that a volume in many copy sets is held once"""
+        collection = copysets.copysetCollection([["DS8000:A:VOL:0000", "DS8000:B:VOL:0000"],
+                                                 ["DS8000:A:VOL:0000", "DS8000:C:VOL:0000"]])
+        firsts = [copyset[0] for copyset in collection]
+
+        assert firsts[0] is firsts[1]
+        assert isinstance(firsts[0], copysets.volumeId)
+
+    """SET OPERATIONS"""
+
+    def test_set_operations(self):
+        """Test union, intersection, difference and diff"""
+        planned = copysets.copysetCollection(self._pairs(0, 4))
+        current = copysets.copysetCollection(self._pairs(2, 6))
+
+        assert len(planned | current) == 6
+        assert (planned & current).to_lists() == self._pairs(2, 4)
+        assert (planned - current).to_lists() == self._pairs(0, 2)
+        diff = planned.diff(current)
+        assert diff["missing"].to_lists() == self._pairs(0, 2)
+        assert diff["extra"].to_lists() == self._pairs(4, 6)
+        assert planned == copysets.copysetCollection(reversed(self._pairs(0, 4)))
+
+    def test_membership(self):
+        """Test finding copy sets by copy set and by volume"""
+        collection = copysets.copysetCollection(self._pairs(0, 3))
+
+        assert self._pairs(1, 2)[0] in collection
+        assert "DS8000:2107.GXZ91:VOL:0001;DS8000:2107.HXZ91:VOL:0001" in collection
+        assert ["DS8000:2107.GXZ91:VOL:0001", "DS8000:2107.HXZ91:VOL:0002"] not in collection
+        assert collection.has_volume("DS8000:2107.HXZ91:VOL:0002")
+        assert not collection.has_volume("DS8000:2107.HXZ91:VOL:0003")
+        assert collection.find("DS8000:2107.HXZ91:VOL:0002") == tuple(self._pairs(2, 3)[0])
+        assert len(collection.volumes()) == 6
+
+    def test_large_diff(self):
+        """Test that diffing sessions with 100k copy sets is fast"""
+        planned = copysets.copysetCollection(self._pairs(0, 100000))
+        current = copysets.copysetCollection(self._pairs(1000, 101000))
+
+        start = time.perf_counter()
+        diff = planned.diff(current)
+        elapsed = time.perf_counter() - start
+
+        assert len(diff["missing"]) == 1000
+        assert len(diff["extra"]) == 1000
+        assert elapsed < 1
+
+    """PARSING"""
+
+    @responses.activate
+    def test_from_response(self):
+        """Test creating a collection from the response of get_copysets"""
+        responses.add(
+            responses.GET,
+            f"{self.base_url}/sessions/TestSession/copysets",
+            json=[{"name": "DS8000:2107.GXZ91:VOL:0000", "state": "Prepared",
+                   "volumes": ["DS8000:2107.GXZ91:VOL:0000", "DS8000:2107.HXZ91:VOL:0000"]},
+                  ["DS8000:2107.GXZ91:VOL:0001", "DS8000:2107.HXZ91:VOL:0001"],
+                  "DS8000:2107.GXZ91:VOL:0002;DS8000:2107.HXZ91:VOL:0002"],
+            status=HTTPStatus.OK
+        )
+
+        resp = copyset_service.get_copysets(self.base_url, self.token, "TestSession")
+        collection = copysets.copysetCollection.from_response(resp)
+
+        assert collection.to_lists() == self._pairs(0, 3)
+
+    @responses.activate
+    def test_from_response_ignores_other_values(self):
+        """Test that only volume identifiers are taken from copy set objects without a volume list"""
+        responses.add(
+            responses.GET,
+            f"{self.base_url}/sessions/TestSession/copysets",
+            json={"data": [{"h1": "DS8000:2107.GXZ91:VOL:0000", "h2": "DS8000:2107.HXZ91:VOL:0000",
+                            "lastupdate": "2026-03-17T14:30:00Z", "label": "SVC:cs1"}]},
+            status=HTTPStatus.OK
+        )
+
+        resp = copyset_service.get_copysets(self.base_url, self.token, "TestSession")
+        collection = copysets.copysetCollection.from_response(resp, "data")
+
+        assert collection.to_lists() == self._pairs(0, 1)
+
+    def test_from_csv(self):
+        """Test creating a collection from an exported copy set file"""
+        file_name = os.path.join(self.temp_dir, "copysets.csv")
+        with open(file_name, "w") as f:
+            f.write("#Session:TestSession\n#Type:MM\nH1,H2\n"
+                    "DS8000:2107.GXZ91:VOL:0000,DS8000:2107.HXZ91:VOL:0000\n\n"
+                    "DS8000:2107.GXZ91:VOL:0001 , DS8000:2107.HXZ91:VOL:0001\n")
+
+        collection = copysets.copysetCollection.from_csv(file_name)
+
+        assert collection.roles == ["H1", "H2"]
+        assert collection.to_lists() == self._pairs(0, 2)
+        with open(file_name, "r") as f:
+            assert copysets.copysetCollection.from_csv(text=f.read()) == collection
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import io
+import json
+import threading
+import time
+import unittest
+from http import HTTPStatus
+
+import requests
+import responses
+
+from pyCSM.authorization import auth
+from pyCSM.clients.fleet_client import fleetClient
+
+
+class TestFleetClient(unittest.TestCase):
+    """Test cases for the multi-server fleet client"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        auth._token_managers.clear()
+        self.fleet = fleetClient([
+            {"server_address": "csm1", "server_port": "9559", "username": "csmadmin", "token": "token_1"},
+            {"server_address": "csm2", "server_port": "9559", "username": "csmadmin", "token": "token_2"},
+            {"server_address": "csm3", "server_port": "9559", "username": "csmadmin", "token": "token_3"}
+        ], timeout=5)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        auth._token_managers.clear()
+        super().tearDown()
+
+    @responses.activate
+    def test_get_session_overviews_merged(self):
+        """Test that session overviews from all servers are merged and tagged with the server"""
+        responses.add(responses.GET, "https://csm1:9559/CSM/web/sessions",
+                      json=[{"name": "SessA"}, {"name": "SessB"}], status=HTTPStatus.OK.value)
+        responses.add(responses.GET, "https://csm2:9559/CSM/web/sessions",
+                      json=[{"name": "SessC"}], status=HTTPStatus.OK.value)
+        responses.add(responses.GET, "https://csm3:9559/CSM/web/sessions",
+                      status=HTTPStatus.INTERNAL_SERVER_ERROR.value)
+
+        fleet_result = self.fleet.get_session_overviews()
+
+        assert sorted((s["server"], s["name"]) for s in fleet_result["sessions"]) == [
+            ("csm1:9559", "SessA"), ("csm1:9559", "SessB"), ("csm2:9559", "SessC")
+        ]
+        assert set(fleet_result["results"]) == {"csm1:9559", "csm2:9559"}
+        assert isinstance(fleet_result["errors"]["csm3:9559"], requests.exceptions.HTTPError)
+
+    @responses.activate
+    def test_slow_server_times_out(self):
+        """Test that a slow server is reported as timed out without holding up the others"""
+        released = threading.Event()
+        slow_threads = []
+
+        def slow_callback(request):
+            slow_threads.append(threading.current_thread())
+            released.wait(5)
+            return (HTTPStatus.OK.value, {}, json.dumps({"total": 1}))
+
+        responses.add(responses.GET, "https://csm1:9559/CSM/web/system/volcounts",
+                      json={"total": 10}, status=HTTPStatus.OK.value)
+        responses.add(responses.GET, "https://csm2:9559/CSM/web/system/volcounts",
+                      json={"total": 20}, status=HTTPStatus.OK.value)
+        responses.add_callback(responses.GET, "https://csm3:9559/CSM/web/system/volcounts",
+                               callback=slow_callback)
+
+        start = time.monotonic()
+        try:
+            fleet_result = self.fleet.get_volume_counts(timeout=0.3)
+            elapsed = time.monotonic() - start
+        finally:
+            released.set()
+            # The slow call finishes in the background, so wait for it before the next test replaces the mocks
+            for thread in slow_threads:
+                thread.join(5)
+
+        assert elapsed < 0.9
+        assert fleet_result["results"] == {"csm1:9559": {"total": 10}, "csm2:9559": {"total": 20}}
+        assert isinstance(fleet_result["errors"]["csm3:9559"], TimeoutError)
+
+    @responses.activate
+    def test_add_zos_cert_reads_once(self):
+        """Test that one certificate is read once and sent to every server"""
+        for server in ("csm1", "csm2", "csm3"):
+            responses.add(responses.POST, f"https://{server}:9559/CSM/web/storagedevices/zoscert",
+                          json={"msg": "IWNR1023I"}, status=HTTPStatus.OK.value)
+        cert = io.BytesIO(b"-----BEGIN CERTIFICATE-----")
+        cert.name = "/certs/zos.crt"
+
+        fleet_result = self.fleet.add_zos_cert(cert)
+
+        assert set(fleet_result["results"]) == {"csm1:9559", "csm2:9559", "csm3:9559"}
+        assert cert.tell() == len(b"-----BEGIN CERTIFICATE-----")
+        assert not cert.closed
+        for call in responses.calls:
+            assert b'filename="zos.crt"' in call.request.body
+            assert b"-----BEGIN CERTIFICATE-----" in call.request.body
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -226,6 +226,89 @@ class TestHardwareService(unittest.TestCase):
         assert volumes[1]['capacity'] == '21474836480'
         assert volumes[2]['pool'] == 'P1'
 
+    @responses.activate
+    def test_iter_volumes_success(self):
+        """Test that volumes are yielded one at a time from a nested list"""
+        system_name = "DS8K_Primary"
+        volumes = [{"id": f"{i:04X}", "name": f"Volume_{i:04X}", "state": "normal"} for i in range(500)]
+
+        responses.add(
+            responses.GET,
+            f"{self.base_url}/storagedevices/volumes/{system_name}",
+            json={"status": "success", "data": {"volumes": volumes}},
+            status=HTTPStatus.OK.value,
+        )
+
+        volume_iter = hardware_service.iter_volumes(self.base_url, self.token, system_name, chunk_size=100)
+
+        assert next(volume_iter) == volumes[0]
+        assert list(volume_iter) == volumes[1:]
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_iter_volumes_key_path(self):
+        """Test that only the list at the key path is yielded, not an earlier list in the response"""
+        system_name = "DS8K_Primary"
+        volumes = [{"id": "0000", "name": "Volume_0000"}, {"id": "0001", "name": "Volume_0001"}]
+
+        responses.add(
+            responses.GET,
+            f"{self.base_url}/storagedevices/volumes/{system_name}",
+            json={"msg": "IWNR1234I [x]", "inserts": ["DS8K_Primary", {"a": [1]}],
+                  "data": {"count": 2, "volumes": volumes}},
+            status=HTTPStatus.OK.value,
+        )
+        responses.add(
+            responses.GET,
+            f"{self.base_url}/storagedevices/volumes/{system_name}",
+            json={"msg": "IWNR1234I", "inserts": ["DS8K_Primary"]},
+            status=HTTPStatus.OK.value,
+        )
+
+        assert list(hardware_service.iter_volumes(self.base_url, self.token, system_name, chunk_size=7)) == volumes
+        with self.assertRaises(ValueError):
+            list(hardware_service.iter_volumes(self.base_url, self.token, system_name))
+
+    @responses.activate
+    def test_iter_volumes_numbers_across_chunks(self):
+        """Test that numbers split between chunks are read whole for every chunk size"""
+        system_name = "DS8K_Primary"
+        url = f"{self.base_url}/storagedevices/volumes/{system_name}"
+        volumes = [{"id": "0000", "capacity": 1.25}, {"id": "0001", "capacity": -3e-2}]
+        documents = [
+            ('{"count": 1.5, "sizes": [2.5, -0.75e3], "data": {"volumes": [{"id": "0000", "capacity": 1.25}, '
+             '{"id": "0001", "capacity": -3e-2}]}}', volumes),
+            ("[1.5, 22.75, 3e10, -12, 0.5E-2]", [1.5, 22.75, 3e10, -12, 0.5e-2])
+        ]
+        responses.add(responses.GET, url, status=HTTPStatus.OK.value)
+
+        for body, expected in documents:
+            responses.replace(responses.GET, url, body=body, status=HTTPStatus.OK.value)
+            for chunk_size in range(1, 12):
+                assert list(hardware_service.iter_volumes(self.base_url, self.token, system_name,
+                                                          chunk_size)) == expected, chunk_size
+
+    @responses.activate
+    def test_iter_volumes_client_retry(self):
+        """Test that the client refreshes an expired token before the first volume"""
+        from pyCSM.authorization import auth
+        from pyCSM.clients.hardware_client import hardwareClient
+
+        system_name = "DS8K_Primary"
+        auth._token_managers.clear()
+        responses.add(responses.POST, f"{self.base_url}/system/v1/tokens",
+                      json={"token": "new_token"}, status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/storagedevices/volumes/{system_name}",
+                      status=HTTPStatus.UNAUTHORIZED.value)
+        responses.add(responses.GET, f"{self.base_url}/storagedevices/volumes/{system_name}",
+                      json=[{"id": "0000"}, {"id": "0001"}], status=HTTPStatus.OK.value)
+        try:
+            client = hardwareClient("testserver", "8088", "csmadmin", "csm", token=self.token)
+            assert list(client.iter_volumes(system_name)) == [{"id": "0000"}, {"id": "0001"}]
+            assert responses.calls[-1].request.headers['X-Auth-Token'] == "new_token"
+        finally:
+            auth._token_managers.clear()
+
     @responses.activate
     def test_export_vol_writeio_history_success(self):
         """Test successful export of volume write I/O history"""
@@ -540,6 +623,26 @@ class TestHardwareService(unittest.TestCase):
             if os.path.exists(cert_path):
                 os.unlink(cert_path)
 
+    @responses.activate
+    def test_add_zos_cert_bytes_success(self):
+        """Test addition of a z/OS certificate loaded into memory"""
+        cert = hardware_service.load_zos_cert(b"-----BEGIN CERTIFICATE-----\n")
+
+        responses.add(
+            responses.POST,
+            f"{self.base_url}/storagedevices/zoscert",
+            json={"status": "I"},
+            status=HTTPStatus.OK.value,
+        )
+
+        response = hardware_service.add_zos_cert(self.base_url, self.token, cert)
+        response = hardware_service.add_zos_cert(self.base_url, self.token, cert)
+
+        assert response.status_code == HTTPStatus.OK.value
+        assert len(responses.calls) == 2
+        for call in responses.calls:
+            assert b"-----BEGIN CERTIFICATE-----" in call.request.body
+
     @responses.activate
     def test_add_zos_device_success(self):
         """Test successful addition of a storage system through z/OS host connection"""
@@ -0,0 +1,66 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import unittest
+from http import HTTPStatus
+from unittest.mock import patch
+
+import requests
+import responses
+
+from pyCSM.services.session_service import session_service
+from pyCSM.util import json_backend
+
+
+class TestJsonBackend(unittest.TestCase):
+    """Test cases for the pluggable JSON decoding backend"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.base_url = "https://testserver:8088/CSM/web"
+        self.token = "test_token_12345"
+        self.original = dict(json_backend.get_properties())
+
+    def tearDown(self):
+        """Clean up after tests"""
+        json_backend.change_properties(self.original)
+        super().tearDown()
+
+    def test_auto_falls_back_to_json(self):
+        """Test that the standard library is used when orjson is not installed"""
+        with patch.object(json_backend, "orjson", None):
+            assert json_backend.get_backend() == "json"
+            assert json_backend.loads(b'{"name": "SessA"}') == {"name": "SessA"}
+            json_backend.change_properties({"backend": "orjson"})
+            with self.assertRaises(ImportError):
+                json_backend.loads(b"{}")
+
+    @responses.activate
+    def test_service_responses_use_backend(self):
+        """Test that responses from the services decode through the selected backend"""
+        responses.add(responses.GET, f"{self.base_url}/sessions/SessA",
+                      json={"name": "SessA", "state": "Prepared"}, status=HTTPStatus.OK.value)
+
+        resp = session_service.get_session_info(self.base_url, self.token, "SessA")
+
+        assert isinstance(resp, json_backend.fastJsonResponse)
+        with patch.object(json_backend, "loads", wraps=json_backend.loads) as mock_loads:
+            assert resp.json() == {"name": "SessA", "state": "Prepared"}
+            assert resp.json() is resp.json()
+            mock_loads.assert_called_once_with(resp.content)
+
+    @responses.activate
+    def test_invalid_json_error(self):
+        """Test that invalid JSON raises the same error as requests"""
+        responses.add(responses.GET, f"{self.base_url}/sessions/SessA",
+                      body="not json", status=HTTPStatus.OK.value)
+
+        for backend in ("json", "auto"):
+            json_backend.change_properties({"backend": backend})
+            resp = session_service.get_session_info(self.base_url, self.token, "SessA")
+            with self.assertRaises(requests.exceptions.JSONDecodeError):
+                resp.json()
+
+
+if __name__ == '__main__':
+    unittest.main()
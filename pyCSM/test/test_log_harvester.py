@@ -0,0 +1,116 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import os
+import tempfile
+import unittest
+from http import HTTPStatus
+from unittest.mock import patch
+
+import requests
+import responses
+
+from pyCSM.authorization import auth
+from pyCSM.clients.log_harvester import logHarvester, _rateLimiter
+from pyCSM.clients.system_client import systemClient
+
+
+class TestLogHarvester(unittest.TestCase):
+    """Test cases for the incremental log package harvester"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        auth._token_managers.clear()
+        self.clients = [systemClient(server, "9559", "csmadmin", token="test_token_12345")
+                        for server in ("csm1", "csm2")]
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temp_dir.name
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.temp_dir.cleanup()
+        auth._token_managers.clear()
+        super().tearDown()
+
+    def add_server(self, server, packages):
+        responses.add(responses.GET, f"https://{server}:9559/CSM/web/system/logpackages",
+                      json={"status": "success", "data": {"packages": [{"name": name} for name in packages]}},
+                      status=HTTPStatus.OK.value)
+        for name, body in packages.items():
+            responses.add(responses.GET, f"https://{server}:9559/CSM/web/system/logpackages/download?name={name}",
+                          body=body, status=HTTPStatus.OK.value)
+
+    @responses.activate
+    def test_harvest_downloads_only_new_packages(self):
+        """Test that a second harvest only downloads the packages that were added on the server"""
+        self.add_server("csm1", {"logs_1.jar": b"one"})
+        self.add_server("csm2", {"logs_2.jar": b"two"})
+        harvester = logHarvester(self.directory)
+
+        first = harvester.harvest(self.clients)
+
+        assert first["csm1:9559"]["downloaded"] == ["logs_1.jar"]
+        assert first["csm2:9559"]["downloaded"] == ["logs_2.jar"]
+        with open(os.path.join(self.directory, "csm1_9559", "logs_1.jar"), "rb") as f:
+            assert f.read() == b"one"
+
+        responses.reset()
+        self.add_server("csm1", {"logs_1.jar": b"one", "logs_3.jar": b"three"})
+        self.add_server("csm2", {"logs_2.jar": b"two"})
+
+        second = harvester.harvest(self.clients)
+
+        assert second["csm1:9559"] == {"downloaded": ["logs_3.jar"], "skipped": ["logs_1.jar"], "errors": {}}
+        assert second["csm2:9559"] == {"downloaded": [], "skipped": ["logs_2.jar"], "errors": {}}
+        downloads = [call for call in responses.calls if "/download" in call.request.url]
+        assert len(downloads) == 1
+        assert set(harvester.get_manifest()["csm1:9559"]) == {"logs_1.jar", "logs_3.jar"}
+
+    @responses.activate
+    def test_harvest_server_error(self):
+        """Test that a server that cannot be listed does not stop the others"""
+        self.add_server("csm1", {"logs_1.jar": b"one"})
+        responses.add(responses.GET, "https://csm2:9559/CSM/web/system/logpackages",
+                      status=HTTPStatus.INTERNAL_SERVER_ERROR.value)
+
+        results = logHarvester(self.directory).harvest(self.clients)
+
+        assert results["csm1:9559"]["downloaded"] == ["logs_1.jar"]
+        assert isinstance(results["csm2:9559"], requests.exceptions.HTTPError)
+
+    @responses.activate
+    @patch("pyCSM.clients.log_harvester._rateLimiter.consume")
+    def test_resumed_download_limits_new_bytes(self, mock_consume):
+        """Test that only the bytes downloaded after a resume count against the bandwidth limit"""
+        body = b"0123456789" * 10
+        responses.add(responses.GET, "https://csm1:9559/CSM/web/system/logpackages",
+                      json={"data": [{"name": "logs_1.jar"}]}, status=HTTPStatus.OK.value)
+        responses.add(responses.GET, "https://csm1:9559/CSM/web/system/logpackages/download?name=logs_1.jar",
+                      body=body[40:], status=HTTPStatus.PARTIAL_CONTENT.value,
+                      headers={"Content-Range": f"bytes 40-99/{len(body)}", "ETag": '"v1"'})
+        server_directory = os.path.join(self.directory, "csm1_9559")
+        os.makedirs(server_directory)
+        with open(os.path.join(server_directory, "logs_1.jar.part"), "wb") as f:
+            f.write(body[:40])
+        with open(os.path.join(server_directory, "logs_1.jar.part.validator"), "w") as f:
+            f.write('"v1"')
+
+        result = logHarvester(self.directory, bandwidth_limit=1000).harvest_server(self.clients[0])
+
+        assert result["downloaded"] == ["logs_1.jar"]
+        assert sum(call.args[0] for call in mock_consume.call_args_list) == 60
+        with open(os.path.join(server_directory, "logs_1.jar"), "rb") as f:
+            assert f.read() == body
+
+    @patch("pyCSM.clients.log_harvester.time.sleep")
+    @patch("pyCSM.clients.log_harvester.time.monotonic", return_value=100)
+    def test_rate_limiter(self, mock_monotonic, mock_sleep):
+        """Test that the bandwidth limit is shared by consecutive chunks"""
+        limiter = _rateLimiter(1000)
+        limiter.consume(500)
+        limiter.consume(1000)
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [0.5, 1.5]
+
+
+if __name__ == '__main__':
+    unittest.main()
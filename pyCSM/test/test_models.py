@@ -0,0 +1,72 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import unittest
+from http import HTTPStatus
+
+import responses
+
+from pyCSM.services.hardware_service import hardware_service
+from pyCSM.services.session_service import session_service
+from pyCSM.util import models
+
+
+class TestModels(unittest.TestCase):
+    """Test cases for the typed result models"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.base_url = "https://testserver:8088/CSM/web"
+        self.token = "test_token_12345"
+
+    def test_from_json(self):
+        """Test that known keys become attributes and other keys are kept"""
+        vol = models.volume.from_json({"id": "0000", "name": "Volume_0000", "state": "normal", "raid": "5"})
+
+        assert vol.id == "0000"
+        assert vol.state == "normal"
+        assert vol.pool is None
+        assert vol.extra == {"raid": "5"}
+        assert vol.to_dict() == {"id": "0000", "name": "Volume_0000", "state": "normal", "raid": "5"}
+        assert not hasattr(vol, "__dict__")
+
+    def test_identifiers_interned(self):
+        """Test that repeated identifier strings are shared between models"""
+        state = "".join(["nor", "mal"])
+        first = models.volume.from_json({"id": "0000", "state": "normal"})
+        second = models.volume.from_json({"id": "0001", "state": state})
+
+        assert first.state is second.state
+
+    @responses.activate
+    def test_parse_list_on_demand(self):
+        """Test that a nested list is converted to models only when accessed"""
+        responses.add(responses.GET, f"{self.base_url}/storagedevices/volumes/DS8K",
+                      json={"status": "success", "data": {"volumes": [{"id": "0000"}, {"id": "0001"}]}},
+                      status=HTTPStatus.OK.value)
+
+        volumes = models.parse(hardware_service.get_volumes(self.base_url, self.token, "DS8K"), models.volume,
+                               "data.volumes")
+
+        assert len(volumes) == 2
+        assert volumes._models == [None, None]
+        assert volumes[1].id == "0001"
+        assert volumes._models[0] is None
+        assert [vol.id for vol in volumes] == ["0000", "0001"]
+
+    @responses.activate
+    def test_parse_single_record(self):
+        """Test that a single record is returned as one model"""
+        responses.add(responses.GET, f"{self.base_url}/sessions/SessA",
+                      json={"name": "SessA", "state": "Prepared", "rolepairs": [{"name": "H1-H2"}]},
+                      status=HTTPStatus.OK.value)
+
+        sess = models.parse(session_service.get_session_info(self.base_url, self.token, "SessA"), models.session)
+
+        assert isinstance(sess, models.session)
+        assert sess.state == "Prepared"
+        assert sess.extra == {"rolepairs": [{"name": "H1-H2"}]}
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import unittest
+from http import HTTPStatus
+from unittest.mock import patch
+
+import responses
+
+from pyCSM.authorization import auth
+from pyCSM.clients.hardware_client import hardwareClient
+from pyCSM.clients.system_client import systemClient
+from pyCSM.util.response_cache import responseCache
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for the client response cache"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.base_url = "https://testserver:8088/CSM/web"
+        auth._token_managers.clear()
+        self.cache = responseCache()
+        self.hw_client = hardwareClient("testserver", "8088", "csmadmin", token="test_token_12345",
+                                        response_cache=self.cache)
+        self.sys_client = systemClient("testserver", "8088", "csmadmin", token="test_token_12345",
+                                       response_cache=self.cache)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        auth._token_managers.clear()
+        super().tearDown()
+
+    @responses.activate
+    def test_repeated_calls_hit_cache(self):
+        """Test that repeated calls with the same arguments are answered from the cache"""
+        responses.add(responses.GET, f"{self.base_url}/system/version",
+                      json={"version": "6.3.2"}, status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/storagedevices/connectioninfo?type=DS8000",
+                      json=[], status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/storagedevices/connectioninfo?type=SVC",
+                      json=[], status=HTTPStatus.OK.value)
+
+        for _ in range(3):
+            assert self.sys_client.get_server_version().json()["version"] == "6.3.2"
+            self.hw_client.get_devices("DS8000")
+        self.hw_client.get_devices("SVC")
+
+        assert len(responses.calls) == 3
+        assert self.cache.get_statistics() == {"hits": 4, "misses": 3, "evictions": 0,
+                                               "invalidations": 0, "entries": 3}
+
+    @responses.activate
+    def test_mutating_call_invalidates(self):
+        """Test that a call that changes the server removes the related responses"""
+        responses.add(responses.GET, f"{self.base_url}/storagedevices/connectioninfo?type=DS8000",
+                      json=[], status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/system/version",
+                      json={"version": "6.3.2"}, status=HTTPStatus.OK.value)
+        responses.add(responses.PUT, f"{self.base_url}/storagedevices/DS8000:BOX:2107.KXZ91/refreshconfig",
+                      json={"msg": "IWNH1622I"}, status=HTTPStatus.OK.value)
+
+        self.hw_client.get_devices("DS8000")
+        self.sys_client.get_server_version()
+        self.hw_client.refresh_config("DS8000:BOX:2107.KXZ91")
+        self.hw_client.get_devices("DS8000")
+        self.sys_client.get_server_version()
+
+        device_calls = [call for call in responses.calls if "connectioninfo" in call.request.url]
+        assert len(device_calls) == 2
+        assert self.cache.get_statistics()["invalidations"] == 1
+
+    @responses.activate
+    def test_users_not_shared(self):
+        """Test that clients for different users sharing a cache do not get each other's responses"""
+        responses.add(responses.GET, f"{self.base_url}/storagedevices/connectioninfo?type=DS8000",
+                      json=[{"name": "admin view"}], status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/storagedevices/connectioninfo?type=DS8000",
+                      json=[{"name": "monitor view"}], status=HTTPStatus.OK.value)
+        monitor_client = hardwareClient("testserver", "8088", "monitor", token="monitor_token",
+                                        response_cache=self.cache)
+
+        assert self.hw_client.get_devices("DS8000").json() == [{"name": "admin view"}]
+        assert monitor_client.get_devices("DS8000").json() == [{"name": "monitor view"}]
+        assert len(responses.calls) == 2
+
+    def test_invalidated_while_in_flight(self):
+        """Test that a response for a call sent before an invalidation is not kept"""
+        resp = type("resp", (), {"status_code": 200})()
+        key = ("url", "csmadmin", "get_devices", ("DS8000",), ())
+        generation = self.cache.get_generation()
+        self.cache.invalidate("url", ["get_devices"])
+        self.cache.put(key, resp, generation)
+        assert self.cache.get(key) is None
+        self.cache.put(key, resp, self.cache.get_generation())
+        assert self.cache.get(key) is resp
+
+    @responses.activate
+    def test_errors_not_cached(self):
+        """Test that failed responses are not kept"""
+        responses.add(responses.GET, f"{self.base_url}/storagedevices/paths",
+                      status=HTTPStatus.INTERNAL_SERVER_ERROR.value)
+        responses.add(responses.GET, f"{self.base_url}/storagedevices/paths",
+                      json=[], status=HTTPStatus.OK.value)
+
+        assert self.hw_client.get_paths().status_code == HTTPStatus.INTERNAL_SERVER_ERROR.value
+        assert self.hw_client.get_paths().status_code == HTTPStatus.OK.value
+        assert self.hw_client.get_paths().status_code == HTTPStatus.OK.value
+        assert len(responses.calls) == 2
+
+    @patch("pyCSM.util.response_cache.time.monotonic")
+    def test_ttl_and_lru_eviction(self, mock_monotonic):
+        """Test that responses expire after their time and the least recently used is evicted"""
+        cache = responseCache(ttls={"get_devices": 10}, max_entries=2)
+        resp = type("resp", (), {"status_code": 200})()
+        mock_monotonic.return_value = 0
+        cache.put(("url", "csmadmin", "get_devices", ("DS8000",), ()), resp)
+        cache.put(("url", "csmadmin", "get_devices", ("SVC",), ()), resp)
+        assert cache.get(("url", "csmadmin", "get_devices", ("DS8000",), ())) is resp
+        cache.put(("url", "csmadmin", "get_devices", ("XIV",), ()), resp)
+        assert cache.get(("url", "csmadmin", "get_devices", ("SVC",), ())) is None
+        mock_monotonic.return_value = 11
+        assert cache.get(("url", "csmadmin", "get_devices", ("DS8000",), ())) is None
+        assert cache.get_statistics()["evictions"] == 1
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,221 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import unittest
+from urllib.parse import parse_qs
+from unittest.mock import patch
+from http import HTTPStatus
+
+import requests
+import responses
+
+from pyCSM.authorization import auth
+from pyCSM.clients.session_client import sessionClient
+
+
+class TestSessionClient(unittest.TestCase):
+    """Test cases for session client helpers"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.base_url = "https://testserver:8088/CSM/web"
+        auth._token_managers.clear()
+        self.client = sessionClient("testserver", "8088", "csmadmin", token="test_token_12345")
+
+    def tearDown(self):
+        """Clean up after tests"""
+        auth._token_managers.clear()
+        super().tearDown()
+
+    """BATCH READS"""
+
+    @responses.activate
+    def test_get_session_info_batch(self):
+        """Test that session info is returned per session with per-item errors"""
+        for name in ("SessA", "SessB"):
+            responses.add(responses.GET, f"{self.base_url}/sessions/{name}",
+                          json={"name": name, "state": "Prepared"}, status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions/SessC",
+                      body=requests.exceptions.ConnectionError("connection reset"))
+        completed = []
+
+        results = self.client.get_session_info_batch(["SessA", "SessB", "SessC"], max_workers=2,
+                                                     callback=lambda name, result: completed.append(name))
+
+        assert set(results) == {"SessA", "SessB", "SessC"}
+        assert results["SessA"].json()["name"] == "SessA"
+        assert results["SessB"].json()["state"] == "Prepared"
+        assert isinstance(results["SessC"], requests.exceptions.ConnectionError)
+        assert sorted(completed) == ["SessA", "SessB", "SessC"]
+
+    @responses.activate
+    def test_get_copysets_batch(self):
+        """Test that copy sets are returned per session"""
+        for name in ("SessA", "SessB"):
+            responses.add(responses.GET, f"{self.base_url}/sessions/{name}/copysets",
+                          json=[], status=HTTPStatus.OK.value)
+
+        results = self.client.get_copysets_batch(["SessA", "SessB"])
+
+        assert {name: resp.status_code for name, resp in results.items()} == {
+            "SessA": HTTPStatus.OK.value,
+            "SessB": HTTPStatus.OK.value
+        }
+
+    """MULTI-SESSION WAIT"""
+
+    @responses.activate
+    @patch("pyCSM.clients.session_client.time.sleep")
+    @patch("pyCSM.clients.session_client.time.monotonic", side_effect=[0, 0, 30, 61])
+    def test_wait_for_states(self, mock_monotonic, mock_sleep):
+        """Test that many sessions are resolved from one overview poll per interval"""
+        responses.add(responses.GET, f"{self.base_url}/sessions",
+                      json=[{"name": "SessA", "state": "Prepared"}, {"name": "SessB", "state": "Preparing"},
+                            {"name": "SessC", "state": "Defined"}], status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions",
+                      json=[{"name": "SessA", "state": "Prepared"}, {"name": "SessB", "state": "Prepared"},
+                            {"name": "SessC", "state": "Defined"}], status=HTTPStatus.OK.value)
+        completed = []
+
+        results = self.client.wait_for_states({"SessA": "Prepared", "SessB": "Prepared", "SessC": "Prepared"},
+                                              minutes=1,
+                                              callback=lambda name, result: completed.append(name))
+
+        assert completed[:2] == ["SessA", "SessB"]
+        assert results["SessA"]["state_reached"] is True
+        assert results["SessA"]["polls"] == 1
+        assert results["SessB"]["state_reached"] is True
+        assert results["SessB"]["polls"] == 2
+        assert results["SessC"]["state_reached"] is False
+        assert results["SessC"]["polls"] == 3
+        assert results["SessC"]["session_info"]["state"] == "Defined"
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [1, 2]
+        assert all(call.request.url == f"{self.base_url}/sessions" for call in responses.calls)
+
+    @responses.activate
+    @patch("pyCSM.clients.session_client.time.sleep")
+    @patch("pyCSM.clients.session_client.time.monotonic", side_effect=[0, 0, 30, 61])
+    def test_wait_for_states_failed_poll(self, mock_monotonic, mock_sleep):
+        """Test that a failed poll is a missed interval and does not end the wait"""
+        responses.add(responses.GET, f"{self.base_url}/sessions", status=HTTPStatus.SERVICE_UNAVAILABLE.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions",
+                      json=[{"name": "SessA", "state": "Prepared"}], status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions",
+                      body=requests.exceptions.ConnectionError("connection reset"))
+
+        results = self.client.wait_for_states({"SessA": "Prepared", "SessB": "Prepared"}, minutes=1)
+
+        assert results["SessA"]["state_reached"] is True
+        assert results["SessA"]["polls"] == 2
+        assert results["SessB"]["state_reached"] is False
+        assert results["SessB"]["polls"] == 3
+        assert isinstance(results["SessB"]["error"], requests.exceptions.ConnectionError)
+
+    """BULK COPY SETS"""
+
+    @responses.activate
+    @patch("pyCSM.clients.session_client.time.sleep")
+    def test_add_copysets_bulk(self, mock_sleep):
+        """Test that copy sets are sent in batches with bad copy sets isolated and server errors retried"""
+        calls = {"SessA": [], "SessB": []}
+
+        def add_callback(request):
+            name = request.url.split("/")[-2]
+            copysets = parse_qs(request.body)["copysets"][0]
+            calls[name].append(copysets)
+            if name == "SessB" and len(calls[name]) == 1:
+                return (HTTPStatus.SERVICE_UNAVAILABLE.value, {}, "{}")
+            if "BAD" in copysets:
+                return (HTTPStatus.BAD_REQUEST.value, {}, '{"msg": "IWNR2019E The volume BAD is not valid"}')
+            return (HTTPStatus.CREATED.value, {}, '{"msg": "IWNR2001I"}')
+
+        for name in ("SessA", "SessB"):
+            responses.add_callback(responses.POST, f"{self.base_url}/sessions/{name}/copysets",
+                                   callback=add_callback)
+        sess_a = [["V1", "V2"], ["V3", "V4"], ["BAD", "V6"], ["V7", "V8"], ["V9", "V10"]]
+        sess_b = [["W1", "W2"], ["W3", "W4"]]
+
+        bulk_result = self.client.add_copysets_bulk({"SessA": sess_a, "SessB": sess_b}, batch_size=2)
+
+        assert [r["succeeded"] for r in bulk_result["results"]["SessA"]] == [True, True, False, True, True]
+        assert [r["copyset"] for r in bulk_result["results"]["SessA"]] == sess_a
+        assert bulk_result["results"]["SessA"][2]["result"].json()["msg"].startswith("IWNR2019E")
+        assert [r["succeeded"] for r in bulk_result["results"]["SessB"]] == [True, True]
+        assert bulk_result["added"] == 6
+        assert bulk_result["failed"] == 1
+        assert len(calls["SessA"]) == 5
+        assert len(calls["SessB"]) == 2
+        assert bulk_result["batches"] == 7
+        assert bulk_result["copysets_per_second"] > 0
+        mock_sleep.assert_called_once_with(1)
+
+    @responses.activate
+    def test_add_copysets_bulk_session_rejected(self):
+        """Test that a rejection of the session fails all its copy sets without splitting the batches"""
+        responses.add(responses.POST, f"{self.base_url}/sessions/Missing/copysets",
+                      json={"msg": "IWNR1000E The session Missing does not exist"},
+                      status=HTTPStatus.NOT_FOUND.value)
+        copysets = [["V1", "V2"], ["V3", "V4"], ["V5", "V6"]]
+
+        bulk_result = self.client.add_copysets_bulk({"Missing": copysets}, batch_size=2)
+
+        assert bulk_result["failed"] == 3
+        assert bulk_result["batches"] == 1
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_add_copysets_bulk_timeout_checks_session(self):
+        """Test that after a timeout only the copy sets not already in the session are sent again"""
+        add_url = f"{self.base_url}/sessions/SessA/copysets"
+        responses.add(responses.POST, add_url, body=requests.exceptions.ReadTimeout("read timed out"))
+        responses.add(responses.GET, add_url, json=[{"volumes": ["V1", "V2"]}], status=HTTPStatus.OK.value)
+        responses.add(responses.POST, add_url, json={"msg": "IWNR2001I"}, status=HTTPStatus.CREATED.value)
+
+        bulk_result = self.client.add_copysets_bulk({"SessA": [["V1", "V2"], ["V3", "V4"]]})
+
+        assert bulk_result["added"] == 2
+        assert [call.request.method for call in responses.calls] == ["POST", "GET", "POST"]
+        assert "V1" not in parse_qs(responses.calls[2].request.body)["copysets"][0]
+
+    @responses.activate
+    def test_iter_remove_copysets_streams(self):
+        """Test that copy sets are read lazily from a generator and removed in bounded batches"""
+        remove_url = f"{self.base_url}/sessions/SessA/True/False/copysets"
+        responses.add(responses.DELETE, remove_url, json={"msg": "IWNR2012I"}, status=HTTPStatus.OK.value)
+        consumed = []
+
+        def copysets():
+            for i in range(10):
+                consumed.append(i)
+                yield f"DS8000:2107.GXZ91:VOL:{i:04X}"
+
+        batch_results = self.client.iter_remove_copysets("SessA", copysets(), force=True, batch_size=3,
+                                                         max_in_flight=2)
+        first = next(batch_results)
+
+        assert len(consumed) <= 6
+        rest = list(batch_results)
+        assert first["succeeded"] and all(result["succeeded"] for result in rest)
+        assert sorted(len(result["copysets"]) for result in [first] + rest) == [1, 3, 3, 3]
+        assert len(responses.calls) == 4
+
+    @responses.activate
+    def test_remove_copysets_bulk_failures(self):
+        """Test that only failed batches are kept in the bulk removal summary"""
+        remove_url = f"{self.base_url}/sessions/SessA/False/False/copysets"
+        responses.add(responses.DELETE, remove_url, json={"msg": "IWNR2012I"}, status=HTTPStatus.OK.value)
+        responses.add(responses.DELETE, remove_url, json={"msg": "IWNR2019E"},
+                      status=HTTPStatus.BAD_REQUEST.value)
+        responses.add(responses.DELETE, remove_url, json={"msg": "IWNR2012I"}, status=HTTPStatus.OK.value)
+
+        bulk_result = self.client.remove_copysets_bulk("SessA", (f"VOL:{i}" for i in range(5)), batch_size=2,
+                                                       max_in_flight=1)
+
+        assert bulk_result["removed"] == 3
+        assert bulk_result["failed"] == 2
+        assert bulk_result["batches"] == 3
+        assert bulk_result["failed_batches"][0]["copysets"] == ["VOL:2", "VOL:3"]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import json
+import unittest
+from http import HTTPStatus
+from urllib.parse import parse_qs
+
+import responses
+
+from pyCSM.authorization import auth
+from pyCSM.clients.session_client import sessionClient
+from pyCSM.clients.session_reconciler import sessionReconciler
+
+
+class TestSessionReconciler(unittest.TestCase):
+    """Test cases for the declarative session reconciler"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.base_url = "https://testserver:8088/CSM/web"
+        auth._token_managers.clear()
+        self.client = sessionClient("testserver", "8088", "csmadmin", token="test_token_12345")
+        self.reconciler = sessionReconciler(self.client, max_workers=2)
+        self.pair = ["DS8000:2107.GXZ91:VOL:0000", "DS8000:2107.HXZ91:VOL:0000"]
+        self.other_pair = ["DS8000:2107.GXZ91:VOL:0001", "DS8000:2107.HXZ91:VOL:0001"]
+
+    def tearDown(self):
+        """Clean up after tests"""
+        auth._token_managers.clear()
+        super().tearDown()
+
+    def _add_current_state(self, copysets, options=None):
+        responses.add(responses.GET, f"{self.base_url}/sessions",
+                      json=[{"name": "SessA", "type": "MM", "description": "Payroll"}], status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions/SessA/copysets",
+                      json=[{"volumes": copyset} for copyset in copysets], status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions/SessA/options",
+                      json={"data": {"options": {"rpo_threshold": {"value": 300, "modifiable": True}}}}
+                      if options is None else options, status=HTTPStatus.OK.value)
+
+    @staticmethod
+    def _writes():
+        return [call for call in responses.calls if call.request.method != "GET"]
+
+    @responses.activate
+    def test_converged_sessions_only_read(self):
+        """Test that sessions already in the desired state make only read calls"""
+        self._add_current_state([self.pair])
+        spec = {"SessA": {"type": "MM", "description": "Payroll", "options": {"rpo_threshold": 300},
+                          "copysets": [self.pair]}}
+
+        result = self.reconciler.reconcile(spec)
+
+        assert result["steps"] == {"SessA": []}
+        assert result["errors"] == {}
+        assert result["reads"] == 3
+        assert result["writes"] == 0
+        assert self._writes() == []
+
+    @responses.activate
+    def test_only_differences_sent(self):
+        """Test that only the changed description, options and missing copy sets are sent"""
+        self._add_current_state([self.pair])
+        responses.add(responses.POST, f"{self.base_url}/sessions/SessA/description", json={},
+                      status=HTTPStatus.OK.value)
+        responses.add(responses.PUT, f"{self.base_url}/sessions/SessA/options", json={}, status=HTTPStatus.OK.value)
+        responses.add(responses.POST, f"{self.base_url}/sessions/SessA/copysets", json={}, status=HTTPStatus.OK.value)
+        spec = {"SessA": {"description": "Payroll DR", "options": {"rpo_threshold": 300, "auto_start": True},
+                          "copysets": [self.pair, self.other_pair], "roleorder": ["H1", "H2"]}}
+        completed = []
+
+        result = self.reconciler.reconcile(spec, callback=lambda name, action, succeeded: completed.append(action))
+
+        assert completed == ["modify_session_description", "set_session_options", "add_copysets"]
+        assert result["writes"] == 3
+        assert all(step["succeeded"] for step in result["results"]["SessA"])
+        options = json.loads(parse_qs(self._writes()[1].request.body)["options"][0])
+        assert options == [{"auto_start": True}]
+        added = parse_qs(self._writes()[2].request.body)["copysets"][0]
+        assert str(self.other_pair) in added
+        assert str(self.pair) not in added
+
+    @responses.activate
+    def test_create_missing_session(self):
+        """Test that a missing session is created before its copy sets are added"""
+        responses.add(responses.GET, f"{self.base_url}/sessions", json=[], status=HTTPStatus.OK.value)
+        responses.add(responses.PUT, f"{self.base_url}/sessions/SessB", json={}, status=HTTPStatus.OK.value)
+        responses.add(responses.POST, f"{self.base_url}/sessions/SessB/copysets", json={}, status=HTTPStatus.OK.value)
+        spec = {"SessB": {"type": "MM", "description": "New", "copysets": [self.pair]},
+                "SessC": {"description": "No type"}}
+
+        result = self.reconciler.reconcile(spec)
+
+        assert [step["action"] for step in result["results"]["SessB"]] == ["create_session", "add_copysets"]
+        assert isinstance(result["errors"]["SessC"], ValueError)
+        assert result["reads"] == 1
+        assert result["writes"] == 2
+
+    @responses.activate
+    def test_remove_extra_and_dry_run(self):
+        """Test that extra copy sets are removed only when asked and that a dry run changes nothing"""
+        self._add_current_state([self.pair, self.other_pair])
+        spec = {"SessA": {"copysets": [self.pair]}}
+
+        assert sessionReconciler(self.client).reconcile(spec)["steps"] == {"SessA": []}
+        reconciler = sessionReconciler(self.client, remove_extra=True)
+        result = reconciler.reconcile(spec, dry_run=True)
+
+        assert result["steps"] == {"SessA": [("remove_copysets", [self.other_pair[0]])]}
+        assert result["results"] == {}
+        assert self._writes() == []
+
+    @responses.activate
+    def test_reordered_roles_converged(self):
+        """Test that copy sets listed in another role order than the server's are not sent again"""
+        responses.add(responses.GET, f"{self.base_url}/sessions",
+                      json=[{"name": "SessA", "type": "MM"}, {"name": "SessB", "type": "MM"}],
+                      status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions/SessA/copysets",
+                      json=[{"volumes": [{"name": self.pair[0], "role": "H1"},
+                                         {"name": self.pair[1], "role": "H2"}]}],
+                      status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions/SessB/copysets",
+                      json=[{"volumes": self.other_pair}], status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions/SessA/options",
+                      json={"data": {"options": {"rpo_threshold": {"value": "300"}, "auto_start": "true"}}},
+                      status=HTTPStatus.OK.value)
+        spec = {"SessA": {"copysets": [self.pair[::-1]], "roleorder": ["H2", "H1"],
+                          "options": {"rpo_threshold": 300, "auto_start": True}},
+                "SessB": {"copysets": [self.other_pair[::-1]], "roleorder": ["H2", "H1"]}}
+
+        result = sessionReconciler(self.client, remove_extra=True).reconcile(spec)
+
+        assert result["steps"] == {"SessA": [], "SessB": []}
+        assert result["writes"] == 0
+        assert self._writes() == []
+
+    @responses.activate
+    def test_type_mismatch(self):
+        """Test that a session of another type is reported and not changed"""
+        self._add_current_state([self.pair])
+
+        result = self.reconciler.reconcile({"SessA": {"type": "GM", "description": "Other"}})
+
+        assert isinstance(result["errors"]["SessA"], ValueError)
+        assert "SessA" not in result["steps"]
+        assert self._writes() == []
+
+
+if __name__ == '__main__':
+    unittest.main()
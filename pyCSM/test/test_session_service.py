@@ -1152,6 +1152,61 @@ class TestSessionService(unittest.TestCase):
         assert response.json()['data']['total_pairs'] == 25
         assert len(responses.calls) == 1
 
+    """WAIT FOR STATE"""
+
+    @responses.activate
+    @patch("pyCSM.services.session_service.session_service.time.sleep")
+    def test_wait_for_state_backoff(self, mock_sleep):
+        """Test that the polling interval grows by the backoff factor up to the maximum"""
+        session_name = "PROD_SESSION_01"
+        for state in ("Preparing", "Preparing", "Preparing", "Preparing", "Prepared"):
+            responses.add(
+                responses.GET,
+                f"{self.base_url}/sessions/{session_name}",
+                json={"name": session_name, "state": state, "status": "Normal"},
+                status=HTTPStatus.OK.value
+            )
+
+        result = session_service.wait_for_state(
+            self.base_url,
+            self.token,
+            session_name,
+            "Prepared",
+            initial_interval=1,
+            max_interval=3,
+            backoff=2
+        )
+
+        assert result["state_reached"] is True
+        assert result["polls"] == 5
+        assert result["session_info"].json()["state"] == "Prepared"
+        assert "elapsed_seconds" in result
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [1, 2, 3, 3]
+
+    @responses.activate
+    @patch("pyCSM.services.session_service.session_service.time.sleep")
+    def test_wait_for_state_deadline(self, mock_sleep):
+        """Test that the wait stops at a deadline that has already passed"""
+        session_name = "PROD_SESSION_01"
+        responses.add(
+            responses.GET,
+            f"{self.base_url}/sessions/{session_name}",
+            json={"name": session_name, "state": "Preparing", "status": "Normal"},
+            status=HTTPStatus.OK.value
+        )
+
+        result = session_service.wait_for_state(
+            self.base_url,
+            self.token,
+            session_name,
+            "Prepared",
+            deadline=0
+        )
+
+        assert result["state_reached"] is False
+        assert result["polls"] == 1
+        mock_sleep.assert_not_called()
+
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
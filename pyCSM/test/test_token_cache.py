@@ -0,0 +1,78 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import os
+import stat
+import tempfile
+import unittest
+from http import HTTPStatus
+
+import responses
+
+from pyCSM.authorization import auth
+from pyCSM.authorization import token_cache
+from pyCSM.clients.session_client import sessionClient
+
+
+class TestTokenCache(unittest.TestCase):
+    """Test cases for the on-disk token cache"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.base_url = "https://testserver:8088/CSM/web"
+        self.token_url = f"{self.base_url}/system/v1/tokens"
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.temp_dir.name, "pycsm", "tokens.json")
+        auth._token_managers.clear()
+        auth.change_properties({"token_cache_file": self.cache_file})
+
+    def tearDown(self):
+        """Clean up after tests"""
+        auth.change_properties({"token_cache_file": None})
+        auth._token_managers.clear()
+        self.temp_dir.cleanup()
+        super().tearDown()
+
+    def test_store_and_load_token(self):
+        """Test that a stored token is read back and the file is private to the user"""
+        token_cache.store_token(self.cache_file, self.base_url, "csmadmin", "token_1")
+
+        token, age = token_cache.load_token(self.cache_file, self.base_url, "csmadmin")
+        assert token == "token_1"
+        assert age < 5
+        assert token_cache.load_token(self.cache_file, self.base_url, "otheruser") is None
+        assert stat.S_IMODE(os.stat(self.cache_file).st_mode) == 0o600
+
+        token_cache.remove_token(self.cache_file, self.base_url, "csmadmin")
+        assert token_cache.load_token(self.cache_file, self.base_url, "csmadmin") is None
+
+    @responses.activate
+    def test_new_client_reuses_cached_token(self):
+        """Test that a client in a new process reuses the cached token instead of logging in"""
+        responses.add(responses.POST, self.token_url, json={"token": "token_1"}, status=HTTPStatus.OK.value)
+
+        sessionClient("testserver", "8088", "csmadmin", "csm")
+        auth._token_managers.clear()
+        sess_client = sessionClient("testserver", "8088", "csmadmin", "csm")
+
+        assert len(responses.calls) == 1
+        assert sess_client.tk == "token_1"
+
+    @responses.activate
+    def test_stale_cached_token_refreshed(self):
+        """Test that a cached token rejected by the server is replaced in the cache"""
+        token_cache.store_token(self.cache_file, self.base_url, "csmadmin", "stale_token")
+        responses.add(responses.POST, self.token_url, json={"token": "token_2"}, status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions", status=HTTPStatus.UNAUTHORIZED.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions", json=[], status=HTTPStatus.OK.value)
+
+        sess_client = sessionClient("testserver", "8088", "csmadmin", "csm")
+        resp = sess_client.get_session_overviews()
+
+        assert resp.status_code == HTTPStatus.OK.value
+        assert responses.calls[0].request.headers["X-Auth-Token"] == "stale_token"
+        assert token_cache.load_token(self.cache_file, self.base_url, "csmadmin")[0] == "token_2"
+
+
+if __name__ == '__main__':
+    unittest.main()
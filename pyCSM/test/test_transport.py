@@ -0,0 +1,349 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http import HTTPStatus
+from unittest.mock import patch
+
+import requests
+import responses
+
+from pyCSM.authorization import auth
+from pyCSM.util import json_backend
+from pyCSM.util import transport
+from pyCSM.services.session_service import session_service
+from pyCSM.services.system_service import system_service
+from pyCSM.services.hardware_service import hardware_service
+
+
+class TestTransport(unittest.TestCase):
+    """Test cases for the pooled connection transport"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.base_url = "https://testserver:8088/CSM/web"
+        self.token = "test_token_12345"
+        transport.close()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        transport.close()
+        super().tearDown()
+
+    def test_get_session_shared_per_server(self):
+        """Test that one pooled session is shared by every url on the same server"""
+        session = transport.get_session(f"{self.base_url}/sessions")
+        assert transport.get_session(f"{self.base_url}/system/version") is session
+        assert transport.get_session("https://HOSTB:8088/CSM/web") is not session
+
+    def test_close_server(self):
+        """Test that closing a server opens a new pool on the next call"""
+        session = transport.get_session(self.base_url)
+        other = transport.get_session("https://otherserver:9559/CSM/web")
+        transport.close(self.base_url)
+        assert transport.get_session(self.base_url) is not session
+        assert transport.get_session("https://otherserver:9559/CSM/web") is other
+
+    def test_pool_properties(self):
+        """Test that the pool size and keep alive properties are applied to new pools"""
+        original = dict(transport.get_properties())
+        try:
+            transport.change_properties({"pool_maxsize": 3, "keep_alive": False})
+            session = transport.get_session(self.base_url)
+            adapter = session.get_adapter(self.base_url)
+            assert adapter._pool_maxsize == 3
+            assert session.headers["Connection"] == "close"
+        finally:
+            transport.change_properties(original)
+
+    @responses.activate
+    def test_service_calls_use_pool(self):
+        """Test that service calls are sent through the pooled session"""
+        responses.add(
+            responses.GET,
+            f"{self.base_url}/sessions",
+            json=[],
+            status=HTTPStatus.OK.value,
+        )
+        sent = []
+        session = transport.get_session(self.base_url)
+        original_request = session.request
+
+        def tracking_request(method, url, **kwargs):
+            sent.append((method, url))
+            return original_request(method, url, **kwargs)
+
+        session.request = tracking_request
+        session_service.get_session_overviews(self.base_url, self.token)
+        session_service.get_session_overviews(self.base_url, self.token)
+        assert sent == [("GET", f"{self.base_url}/sessions")] * 2
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_cookies_not_shared(self):
+        """Test that a cookie set for one user is not sent with the calls of another user on the same server"""
+        responses.add(responses.POST, f"{self.base_url}/system/v1/tokens", json={"token": "tokA"},
+                      headers={"Set-Cookie": "LtpaToken2=userA-ltpa; Path=/"}, status=HTTPStatus.OK.value)
+        responses.add(responses.POST, f"{self.base_url}/system/v1/tokens", json={"token": "tokB"},
+                      status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions", json=[],
+                      headers={"Set-Cookie": "JSESSIONID=userB-session; Path=/"}, status=HTTPStatus.OK.value)
+
+        auth.get_token(self.base_url, "userA", "passwordA")
+        auth.get_token(self.base_url, "userB", "passwordB")
+        session_service.get_session_overviews(self.base_url, "tokB")
+        session_service.get_session_overviews(self.base_url, "tokB")
+
+        assert len(responses.calls) == 4
+        for call in responses.calls:
+            assert "Cookie" not in call.request.headers
+        assert len(transport.get_session(self.base_url).cookies) == 0
+
+    @responses.activate
+    def test_download_streams_to_file(self):
+        """Test that a download is written to the file in chunks with progress reported"""
+        body = b"x" * 2500
+        responses.add(
+            responses.GET,
+            f"{self.base_url}/system/logpackages/synchronous/download",
+            body=body,
+            status=HTTPStatus.OK.value,
+        )
+        progress = []
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "logs.jar")
+            resp = system_service.create_and_download_log_pkg(self.base_url, self.token, file_name,
+                                                              chunk_size=1000,
+                                                              callback=lambda done, total: progress.append(done))
+            assert resp.status_code == HTTPStatus.OK.value
+            with open(file_name, "rb") as f:
+                assert f.read() == body
+            assert os.listdir(directory) == ["logs.jar"]
+        assert progress == [1000, 2000, 2500]
+
+    @unittest.skipIf(os.name == "nt", "File modes are not POSIX on Windows")
+    @responses.activate
+    def test_download_file_mode(self):
+        """Test that a download has the mode of the file it replaces, or the umask default for a new file"""
+        url = f"{self.base_url}/system/logpackages/synchronous/download"
+        responses.add(responses.GET, url, body=b"logs", status=HTTPStatus.OK.value)
+        umask = os.umask(0o022)
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                new_file = os.path.join(directory, "new.jar")
+                transport.download(url, new_file)
+                assert os.stat(new_file).st_mode & 0o777 == 0o644
+
+                existing_file = os.path.join(directory, "existing.jar")
+                with open(existing_file, "wb"):
+                    pass
+                os.chmod(existing_file, 0o640)
+                transport.download(url, existing_file)
+                assert os.stat(existing_file).st_mode & 0o777 == 0o640
+        finally:
+            os.umask(umask)
+
+    @responses.activate
+    def test_download_error_leaves_file(self):
+        """Test that a failed download does not replace the file"""
+        responses.add(
+            responses.GET,
+            f"{self.base_url}/system/backupserver/download",
+            json={"msg": "unauthorized"},
+            status=HTTPStatus.UNAUTHORIZED.value,
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "backup.zip")
+            with open(file_name, "wb") as f:
+                f.write(b"previous backup")
+            resp = system_service.backup_server_and_download(self.base_url, self.token, file_name)
+            assert resp.status_code == HTTPStatus.UNAUTHORIZED.value
+            assert resp.json()["msg"] == "unauthorized"
+            with open(file_name, "rb") as f:
+                assert f.read() == b"previous backup"
+            assert os.listdir(directory) == ["backup.zip"]
+
+    @responses.activate
+    def test_download_resumes_with_range(self):
+        """Test that a resumed download continues the partial file and checks the checksum"""
+        body = b"0123456789" * 10
+        url = f"{self.base_url}/system/backupserver/download"
+        responses.add(responses.GET, url, body=requests.exceptions.ConnectionError("connection reset"))
+        responses.add(responses.GET, url, body=body[40:], status=HTTPStatus.PARTIAL_CONTENT.value,
+                      headers={"Content-Range": f"bytes 40-99/{len(body)}", "ETag": '"v1"'})
+        checksum = "sha256:" + hashlib.sha256(body).hexdigest()
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "backup.zip")
+            with open(f"{file_name}.part", "wb") as f:
+                f.write(body[:40])
+            with open(f"{file_name}.part.validator", "w") as f:
+                f.write('"v1"')
+            resp = system_service.backup_server_and_download(self.base_url, self.token, file_name,
+                                                             resume=True, checksum=checksum)
+            assert resp.status_code == HTTPStatus.PARTIAL_CONTENT.value
+            with open(file_name, "rb") as f:
+                assert f.read() == body
+            assert os.listdir(directory) == ["backup.zip"]
+        assert [call.request.headers.get("Range") for call in responses.calls] == ["bytes=40-", "bytes=40-"]
+        assert [call.request.headers.get("If-Range") for call in responses.calls] == ['"v1"', '"v1"']
+
+    @responses.activate
+    def test_download_restarts_when_file_changed(self):
+        """Test that a partial download of a file that changed on the server is replaced, not continued"""
+        old_body = b"old-" * 25
+        new_body = b"new-" * 30
+        url = f"{self.base_url}/system/logpackages/synchronous/download"
+        responses.add(responses.GET, url, body=old_body[:60], status=HTTPStatus.OK.value,
+                      headers={"ETag": '"v1"', "Content-Length": str(len(old_body))},
+                      auto_calculate_content_length=False)
+        responses.add(responses.GET, url, body=new_body, status=HTTPStatus.OK.value, headers={"ETag": '"v2"'})
+        transport.change_properties({"download_retries": 0})
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                file_name = os.path.join(directory, "logs.jar")
+                with self.assertRaises(requests.exceptions.RequestException):
+                    system_service.create_and_download_log_pkg(self.base_url, self.token, file_name, chunk_size=20,
+                                                               resume=True)
+                with open(f"{file_name}.part.validator", "r") as f:
+                    assert f.read() == '"v1"'
+                system_service.create_and_download_log_pkg(self.base_url, self.token, file_name, resume=True)
+                with open(file_name, "rb") as f:
+                    assert f.read() == new_body
+                assert os.listdir(directory) == ["logs.jar"]
+        finally:
+            transport.change_properties({"download_retries": 3})
+        assert responses.calls[1].request.headers["Range"] == "bytes=60-"
+        assert responses.calls[1].request.headers["If-Range"] == '"v1"'
+
+    @responses.activate
+    def test_download_restarts_without_range_support(self):
+        """Test that a resumed download starts over when the server sends the whole file"""
+        body = b"0123456789" * 10
+        responses.add(responses.GET, f"{self.base_url}/system/backupserver/download",
+                      body=body, status=HTTPStatus.OK.value)
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "backup.zip")
+            with open(f"{file_name}.part", "wb") as f:
+                f.write(b"stale")
+            system_service.backup_server_and_download(self.base_url, self.token, file_name, resume=True)
+            with open(file_name, "rb") as f:
+                assert f.read() == body
+
+    @responses.activate
+    def test_download_checksum_mismatch(self):
+        """Test that a download that does not match the checksum is not kept"""
+        responses.add(responses.GET, f"{self.base_url}/system/backupserver/download",
+                      body=b"corrupt", status=HTTPStatus.OK.value)
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "backup.zip")
+            with self.assertRaises(ValueError):
+                system_service.backup_server_and_download(self.base_url, self.token, file_name, resume=True,
+                                                          checksum="sha256:" + hashlib.sha256(b"good").hexdigest())
+            assert os.listdir(directory) == []
+
+    @responses.activate
+    def test_identical_gets_coalesced(self):
+        """Test that identical concurrent gets share one call and different tokens do not"""
+        def slow_callback(request):
+            time.sleep(0.2)
+            return (HTTPStatus.OK.value, {"Content-Type": "application/json"}, '{"name": "SessA"}')
+
+        responses.add_callback(responses.GET, f"{self.base_url}/sessions/SessA", callback=slow_callback)
+        before = transport.get_statistics()
+        results = []
+
+        def call(token):
+            results.append(session_service.get_session_info(self.base_url, token, "SessA"))
+
+        threads = [threading.Thread(target=call, args=(token,))
+                   for token in [self.token] * 4 + ["other_token"]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(responses.calls) == 2
+        with patch.object(json_backend, "loads", wraps=json_backend.loads) as mock_loads:
+            assert all(resp.json() == {"name": "SessA"} for resp in results)
+            assert mock_loads.call_count == 2
+        assert transport.get_statistics()["coalesced_gets"] - before["coalesced_gets"] == 3
+
+    @responses.activate
+    def test_conditional_get_not_modified(self):
+        """Test that a 304 answer to a conditional get returns the remembered body"""
+        transport._validators.clear()
+        url = f"{self.base_url}/storagedevices/volumes/DS8000:BOX:2107.KXZ91"
+        responses.add(responses.GET, url, json=[{"name": "vol1"}], status=HTTPStatus.OK.value,
+                      headers={"ETag": '"v1"'})
+        responses.add(responses.GET, url, status=HTTPStatus.NOT_MODIFIED.value)
+
+        first = hardware_service.get_volumes(self.base_url, self.token, "DS8000:BOX:2107.KXZ91")
+        second = hardware_service.get_volumes(self.base_url, self.token, "DS8000:BOX:2107.KXZ91")
+
+        assert first.unchanged is False
+        assert second.unchanged is True
+        assert second.status_code == HTTPStatus.OK.value
+        assert second.json() == [{"name": "vol1"}]
+        assert "If-None-Match" not in responses.calls[0].request.headers
+        assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+
+    @responses.activate
+    def test_conditional_get_per_token(self):
+        """Test that the remembered response of one token is never returned for another token"""
+        transport._validators.clear()
+        last_modified = "Tue, 17 Mar 2026 14:30:00 GMT"
+        responses.add(responses.GET, f"{self.base_url}/sessions", json=[{"name": "SessA"}, {"name": "Payroll"}],
+                      status=HTTPStatus.OK.value, headers={"Last-Modified": last_modified})
+        responses.add(responses.GET, f"{self.base_url}/sessions", json=[{"name": "SessA"}],
+                      status=HTTPStatus.OK.value, headers={"Last-Modified": last_modified})
+
+        first = session_service.get_session_overviews(self.base_url, "tokA")
+        second = session_service.get_session_overviews(self.base_url, "tokB")
+
+        assert "If-Modified-Since" not in responses.calls[1].request.headers
+        assert second.unchanged is False
+        assert second.json() == [{"name": "SessA"}]
+        assert first.json() == [{"name": "SessA"}, {"name": "Payroll"}]
+
+    @responses.activate
+    def test_conditional_get_content_hash(self):
+        """Test that a body without validators is compared by hash"""
+        transport._validators.clear()
+        responses.add(responses.GET, f"{self.base_url}/sessions", json=[{"name": "SessA"}],
+                      status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions", json=[{"name": "SessA"}],
+                      status=HTTPStatus.OK.value)
+        responses.add(responses.GET, f"{self.base_url}/sessions", json=[{"name": "SessB"}],
+                      status=HTTPStatus.OK.value)
+
+        results = [session_service.get_session_overviews(self.base_url, self.token) for _ in range(3)]
+
+        assert [resp.unchanged for resp in results] == [False, True, False]
+        assert results[2].json() == [{"name": "SessB"}]
+        assert all(entry["resp"] is None for entry in transport._validators.values())
+
+    @responses.activate
+    def test_conditional_get_bytes_bound(self):
+        """Test that remembered bodies are limited by size"""
+        transport._validators.clear()
+        transport.change_properties({"conditional_cache_bytes": 100})
+        try:
+            for box in ("KXZ91", "KXZ92"):
+                url = f"{self.base_url}/storagedevices/volumes/DS8000:BOX:2107.{box}"
+                responses.add(responses.GET, url, json=[{"name": "v" * 60}], status=HTTPStatus.OK.value,
+                              headers={"ETag": f'"{box}"'})
+                hardware_service.get_volumes(self.base_url, self.token, f"DS8000:BOX:2107.{box}")
+        finally:
+            transport.change_properties({"conditional_cache_bytes": 16 * 1024 * 1024})
+
+        assert len(transport._validators) == 1
+        assert sum(entry["size"] for entry in transport._validators.values()) <= 100
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,256 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import csv
+import io
+import os
+
+from pyCSM.util import models
+
+
+class volumeId(str):
+    """
+        A volume identifier such as "DS8000:2107.GXZ91:VOL:D000".  It is a string, so it can be used anywhere a
+        volume name is expected, with its parts available as attributes.  Volume identifiers parsed together
+        by a copysetCollection are interned, so each distinct volume is held in memory once.
+    """
+    __slots__ = ()
+
+    @property
+    def device_type(self):
+        """
+        The type of storage system, ex. "DS8000".
+        """
+        return self.split(":", 1)[0]
+
+    @property
+    def system(self):
+        """
+        The storage system, ex. "2107.GXZ91".
+        """
+        parts = self.split(":")
+        return parts[1] if len(parts) > 1 else ""
+
+    @property
+    def volume(self):
+        """
+        The volume on the storage system, ex. "D000".
+        """
+        return self.rsplit(":", 1)[-1]
+
+
+def _is_volume_id(value):
+    # Volume identifiers have a "VOL" part between the storage system and the volume,
+    # ex. "DS8000:2107.GXZ91:VOL:D000" or "SVC:VOL:FAB8:8"
+    if not isinstance(value, str) or any(c.isspace() for c in value):
+        return False
+    parts = value.split(":")
+    return len(parts) >= 3 and "VOL" in parts[1:-1]
+
+
+class copysetCollection:
+    """
+        A set of copy sets, each held as a tuple of volumeId objects in role order, for comparing the copy sets
+        of a session with a planned list.  Union, intersection and difference use hashing, so comparing two
+        collections of 100k copy sets takes milliseconds instead of scanning one list for each copy set of the
+        other.  A copy set can also be found by any one of its volumes.
+|
+        Collections can be combined with the set operators, ex. planned - current gives the copy sets still to add.
+|
+    """
+    __slots__ = ("_copysets", "_by_volume", "roles")
+
+    def __init__(self, copysets=(), roles=None, _interned=None):
+        """
+        Creates a collection from copy sets given as lists of volume identifier strings.
+
+        Args:
+            copysets (iterable): Copy sets to add.
+                ex. [["DS8000:2107.GXZ91:VOL:D000","DS8000:2107.GXZ91:VOL:D001"]]
+            roles (list): (Optional) Role names in the order of the volumes in each copy set.  ex. ["H1", "H2"]
+        """
+        interned = _interned if _interned is not None else {}
+        self._copysets = {self._parse(copyset, interned) for copyset in copysets}
+        self._by_volume = None
+        self.roles = list(roles) if roles is not None else None
+
+    @staticmethod
+    def _parse(copyset, interned):
+        if isinstance(copyset, str):
+            copyset = copyset.split(";")
+        parsed = []
+        for volume in copyset:
+            volume = volume.strip()
+            vol_id = interned.get(volume)
+            if vol_id is None:
+                vol_id = interned[volume] = volumeId(volume)
+            parsed.append(vol_id)
+        return tuple(parsed)
+
+    @classmethod
+    def _from_set(cls, copysets, roles):
+        collection = cls.__new__(cls)
+        collection._copysets = copysets
+        collection._by_volume = None
+        collection.roles = roles
+        return collection
+
+    @classmethod
+    def from_response(cls, resp, key=None):
+        """
+        Creates a collection from the response of get_copysets.  Each copy set in the response may be a list
+        of volume identifiers, a string of identifiers separated by ";", or an object with a "volumes" list.
+        Otherwise the string values of the object that are volume identifiers, with a "VOL" part, are used
+        in order, so names, states and times in the object are never taken for volumes.
+        When the volumes are objects with a "role", the roles of the collection are set from them and each
+        copy set is put in that role order.
+
+        Args:
+            resp (requests.Response): Response of get_copysets.
+            key: (Optional) Key path of the list of copy sets when the response is an object.  ex. "data"
+        """
+        records = models._find_records(resp.json(), key) or []
+        copysets = []
+        roles = None
+        for record in records:
+            if isinstance(record, dict):
+                volumes = record.get("volumes")
+                if volumes is None:
+                    volumes = [value for value in record.values() if _is_volume_id(value)]
+                if volumes and all(isinstance(volume, dict) and "role" in volume for volume in volumes):
+                    by_role = {volume["role"]: volume["name"] for volume in volumes}
+                    if roles is None:
+                        roles = list(by_role)
+                    record = [by_role[role] for role in roles]
+                else:
+                    record = [volume["name"] if isinstance(volume, dict) else volume for volume in volumes]
+            copysets.append(record)
+        return cls(copysets, roles)
+
+    @classmethod
+    def from_csv(cls, source=None, text=None):
+        """
+        Creates a collection from a copy set CSV file, such as one written by export_copysets.
+        Lines starting with "#" are skipped, a line without volume identifiers is read as the role names,
+        and every other line is a copy set.
+
+        Args:
+            source: Path of the CSV file or an open text file.
+            text (str): (Optional) The CSV text, instead of a file.
+        """
+        if text is not None:
+            source = io.StringIO(text)
+        elif isinstance(source, (str, os.PathLike)):
+            with open(source, "r", newline="") as f:
+                return cls.from_csv(f)
+        roles = None
+        copysets = []
+        for row in csv.reader(source):
+            row = [cell.strip() for cell in row if cell.strip()]
+            if not row or row[0].startswith("#"):
+                continue
+            if not any(_is_volume_id(cell) for cell in row):
+                roles = row
+                continue
+            copysets.append(row)
+        return cls(copysets, roles)
+
+    def in_role_order(self, roles):
+        """
+        Returns a collection with the volumes of each copy set put in the given role order.
+
+        Args:
+            roles (list): Role names in the new order.  ex. ["H2", "H1"]
+                A ValueError is raised if the roles of the collection are not known or are not the same roles.
+        """
+        roles = list(roles)
+        if self.roles == roles:
+            return self
+        if self.roles is None or sorted(self.roles) != sorted(roles):
+            raise ValueError(f"Cannot put copy sets with roles {self.roles} in the role order {roles}")
+        order = [self.roles.index(role) for role in roles]
+        return self._from_set({tuple(copyset[i] for i in order) for copyset in self._copysets}, roles)
+
+    def _volume_index(self):
+        if self._by_volume is None:
+            self._by_volume = {volume: copyset for copyset in self._copysets for volume in copyset}
+        return self._by_volume
+
+    def find(self, volume):
+        """
+        Returns the copy set that contains the given volume, or None.
+
+        Args:
+            volume (str): Volume identifier.  ex. "DS8000:2107.GXZ91:VOL:D000"
+        """
+        return self._volume_index().get(volume)
+
+    def has_volume(self, volume):
+        """
+        Returns True if any copy set in the collection contains the given volume.
+
+        Args:
+            volume (str): Volume identifier.  ex. "DS8000:2107.GXZ91:VOL:D000"
+        """
+        return volume in self._volume_index()
+
+    def volumes(self):
+        """
+        Returns a set of every volume in the collection.
+        """
+        return set(self._volume_index())
+
+    def union(self, other):
+        """
+        Returns a collection with the copy sets in either collection.
+        """
+        return self._from_set(self._copysets | other._copysets, self.roles)
+
+    def intersection(self, other):
+        """
+        Returns a collection with the copy sets in both collections.
+        """
+        return self._from_set(self._copysets & other._copysets, self.roles)
+
+    def difference(self, other):
+        """
+        Returns a collection with the copy sets in this collection that are not in the other.
+        """
+        return self._from_set(self._copysets - other._copysets, self.roles)
+
+    def diff(self, other):
+        """
+        Compares this collection, ex. the planned copy sets, with another, ex. the copy sets of the session.
+
+        Returns:
+            A dictionary with the copy sets "missing" from the other collection and the copy sets in the other
+            collection that are "extra", each as a copysetCollection.
+        """
+        return {"missing": self.difference(other), "extra": other.difference(self)}
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def to_lists(self):
+        """
+        Returns the copy sets as lists of volume identifier strings, the format taken by add_copysets.
+        """
+        return [list(copyset) for copyset in sorted(self._copysets)]
+
+    def __contains__(self, copyset):
+        if not isinstance(copyset, tuple):
+            copyset = tuple(copyset.split(";") if isinstance(copyset, str) else copyset)
+        return copyset in self._copysets
+
+    def __iter__(self):
+        return iter(self._copysets)
+
+    def __len__(self):
+        return len(self._copysets)
+
+    def __eq__(self, other):
+        return isinstance(other, copysetCollection) and self._copysets == other._copysets
+
+    def __repr__(self):
+        return f"copysetCollection({len(self._copysets)} copy sets)"
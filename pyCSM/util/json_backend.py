@@ -0,0 +1,113 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import json
+import threading
+
+import requests
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+properties = {
+    "backend": "auto"
+}
+
+
+def get_properties():
+    """
+    Returns a dictionary of the current JSON decoding properties and
+    their values set for the file.
+    """
+    return properties
+
+
+def change_properties(property_dictionary):
+    """
+    Takes a dictionary of JSON decoding properties and the values that
+    user wants to change and changes them in the file.
+
+    Args:
+        property_dictionary (dict): Dictionary of the keys and values that need
+        to be changed in the file.
+        ex. {"backend": "json"}
+
+    Return:
+        Returns the new properties dictionary.
+    """
+    for key in property_dictionary:
+        properties[key] = property_dictionary[key]
+    return properties
+
+
+def get_backend():
+    """
+    Returns the name of the backend used to decode JSON.  The "backend" property may be "orjson", "json",
+    or "auto" to use orjson when it is installed and the standard library json module otherwise.
+    """
+    backend = properties["backend"]
+    if backend == "auto":
+        return "orjson" if orjson is not None else "json"
+    if backend == "orjson" and orjson is None:
+        raise ImportError("The orjson backend was selected but orjson is not installed")
+    return backend
+
+
+def loads(data):
+    """
+    Decodes a JSON document with the selected backend.
+
+    Args:
+        data (bytes): The UTF-8 encoded document.  A str is also accepted.
+
+    Returns:
+        The decoded document.
+    """
+    if get_backend() == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class fastJsonResponse(requests.Response):
+    """
+        The response class returned by every call made through the transport.  json() decodes the body bytes
+        with the selected backend instead of first building the text of the response.
+|
+        The body is decoded once and the result kept on the response, so callers sharing a response, such as
+        identical GET calls coalesced by the transport, share one parse.  The result is the same object for
+        every caller, so copy it before changing it.
+|
+    """
+
+    def json(self, **kwargs):
+        """
+        Returns the decoded JSON body of the response.  Keyword arguments, or a body that is not
+        UTF-8 encoded, are passed to requests.Response.json and are not kept.
+        """
+        if kwargs or (self.encoding is not None and self.encoding.lower().replace("-", "") != "utf8"):
+            return super().json(**kwargs)
+        lock = self.__dict__.get("_json_lock")
+        if lock is None:
+            return self._decode()
+        with lock:
+            if "_decoded" not in self.__dict__:
+                self._decoded = self._decode()
+            return self._decoded
+
+    def _decode(self):
+        try:
+            return loads(self.content)
+        except ValueError as e:
+            raise requests.exceptions.JSONDecodeError(getattr(e, "msg", str(e)), getattr(e, "doc", ""),
+                                                      getattr(e, "pos", 0))
+
+
+def response_hook(resp, *args, **kwargs):
+    """
+    Requests response hook that makes each response a fastJsonResponse.
+    """
+    resp.__class__ = fastJsonResponse
+    resp._json_lock = threading.Lock()
+    return resp
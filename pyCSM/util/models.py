@@ -0,0 +1,188 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import sys
+from collections.abc import Sequence
+
+
+class _model:
+    # Each model lists the JSON keys it keeps as attributes in _fields.  Keys with short, repeated
+    # values such as names and states are listed in _interned so equal strings share one object.
+    # Any other keys in the JSON are kept in "extra", which is None when there are none.
+    __slots__ = ("extra",)
+    _fields = ()
+    _interned = ()
+
+    def __init__(self, values):
+        values = dict(values)
+        for field in self._fields:
+            setattr(self, field, values.pop(field, None))
+        self.extra = values or None
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Creates the model from one decoded JSON record.
+
+        Args:
+            data (dict): The record, ex. one element of resp.json()
+        """
+        values = dict(data)
+        for field in cls._interned:
+            value = values.get(field)
+            if type(value) is str:
+                values[field] = sys.intern(value)
+        return cls(values)
+
+    def to_dict(self):
+        """
+        Returns the model as a dictionary with the same keys as the JSON record it was created from.
+        """
+        values = {field: getattr(self, field) for field in self._fields if getattr(self, field) is not None}
+        if self.extra:
+            values.update(self.extra)
+        return values
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        values = ", ".join(f"{field}={getattr(self, field)!r}" for field in self._fields
+                           if getattr(self, field) is not None)
+        return f"{type(self).__name__}({values})"
+
+
+class session(_model):
+    """
+        A session from get_session_info or get_session_overviews.
+    """
+    __slots__ = _fields = ("name", "type", "state", "status", "description", "group", "recoverable", "copying",
+                           "numcopysets")
+    _interned = ("name", "type", "state", "status", "group")
+
+
+class copySet(_model):
+    """
+        A copy set from get_copysets.
+    """
+    __slots__ = _fields = ("name", "state", "status", "volumes", "sessionname")
+    _interned = ("state", "status", "sessionname")
+
+
+class rolePair(_model):
+    """
+        A role pair from get_rolepair_info.
+    """
+    __slots__ = _fields = ("name", "state", "status", "recoverable", "copying", "progress", "numcopysets")
+    _interned = ("name", "state", "status")
+
+
+class volume(_model):
+    """
+        A volume from get_volumes, iter_volumes or get_volumes_by_wwn.
+    """
+    __slots__ = _fields = ("id", "name", "capacity", "state", "pool", "lss", "wwn", "devicename")
+    _interned = ("state", "pool", "lss", "devicename")
+
+
+class device(_model):
+    """
+        A storage system connection from get_devices.
+    """
+    __slots__ = _fields = ("name", "systemid", "type", "ipaddress", "location", "status")
+    _interned = ("type", "location", "status")
+
+
+class scheduledTask(_model):
+    """
+        A scheduled task from get_scheduled_tasks.
+    """
+    __slots__ = _fields = ("id", "name", "description", "enabled", "schedule", "lastrun", "nextrun")
+    _interned = ("name",)
+
+
+class logEvent(_model):
+    """
+        A console log event from get_log_events.
+    """
+    __slots__ = _fields = ("id", "time", "severity", "message", "session")
+    _interned = ("severity", "session")
+
+
+def _find_records(data, key=None):
+    # Uses the document if it is a list, otherwise the list at the key path, ex. "data.volumes" for
+    # {"status": "success", "data": {"volumes": [...]}}
+    if isinstance(data, list):
+        return data
+    for name in key.split(".") if isinstance(key, str) else list(key or []):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(name)
+    return data if isinstance(data, list) else None
+
+
+class modelList(Sequence):
+    """
+        A read-only list of models that creates each model from its JSON record the first time it is accessed,
+        so a large inventory that is only partly used is never fully converted.
+    """
+    __slots__ = ("_records", "_models", "_model_class")
+
+    def __init__(self, records, model_class):
+        """
+        Args:
+            records (list): Decoded JSON records.
+            model_class (class): The model to create for each record, ex. models.volume
+        """
+        self._records = list(records)
+        self._models = [None] * len(records)
+        self._model_class = model_class
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        model = self._models[index]
+        if model is None:
+            model = self._models[index] = self._model_class.from_json(self._records[index])
+            self._records[index] = None
+        return model
+
+
+def parse(resp, model_class, key=None):
+    """
+    Decodes a response once and returns its records as models.
+
+    Args:
+        resp (requests.Response): Response of a call, ex. the result of hardwareClient.get_volumes
+        model_class (class): The model to create for each record, ex. models.volume
+        key: (Optional) Key path of the list of records when the response is an object, as a string with the
+            keys separated by "." or a list of keys.  ex. "data.volumes"
+
+    Returns:
+        A single model if the response is one record, which has the first field of the model
+        ("name" or "id"), otherwise a modelList of the records in the response if it is a list,
+        or of the list at the key path.  The modelList is empty if there is no list at the key path.
+    """
+    data = resp.json()
+    if isinstance(data, dict) and model_class._fields[0] in data:
+        return model_class.from_json(data)
+    records = _find_records(data, key)
+    return modelList(records if records is not None else [], model_class)
+
+
+def iter_models(records, model_class):
+    """
+    Creates a model for each record as it is yielded, ex. iter_models(client.iter_volumes("DS8K"), models.volume)
+
+    Args:
+        records (iterable): Decoded JSON records.
+        model_class (class): The model to create for each record.
+
+    Returns:
+        A generator that yields the models.
+    """
+    for record in records:
+        yield model_class.from_json(record)
@@ -0,0 +1,170 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+default_ttls = {
+    "get_session_types": 3600,
+    "get_server_version": 3600,
+    "get_devices": 300,
+    "get_paths": 300,
+    "get_path_on_storage_system": 300,
+    "get_svchosts": 300,
+    "get_zos_host": 300,
+    "get_zos_candidate": 300
+}
+
+
+class responseCache:
+    """
+        The responseCache class keeps the responses of slow changing GET calls made by clients for a number of
+        seconds, so that a tool asking for the same data again and again during one run only calls the
+        server once.  Pass one to the response_cache argument of a hardwareClient or systemClient to use it.
+        One cache can be shared by clients for many servers.
+|
+        Responses are kept per server and user, so clients for different users sharing one cache never see
+        each other's responses.  Only successful responses are kept.  Calls that change the server, such as
+        add_device or refresh_config, remove the related responses for that server from the cache, and a call
+        that was already waiting for the server when they did is not kept.  When the cache is full the least
+        recently used response is removed.
+|
+    """
+
+    def __init__(self, ttls=None, max_entries=256):
+        """
+        Creates an empty response cache.
+
+        Args:
+            ttls (dict): (Optional) Number of seconds to keep the responses of each method, keyed by method name.
+                Added to and overriding the default_ttls.  A method with a time of 0 is not cached.
+                ex. {"get_devices": 60, "get_server_version": 0}
+            max_entries (int): Maximum number of responses kept.
+        """
+        self.ttls = dict(default_ttls)
+        if ttls is not None:
+            self.ttls.update(ttls)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._statistics = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._generation = 0
+
+    def get(self, key):
+        """
+        Returns the cached response for the key, or None if it is not cached or has expired.
+
+        Args:
+            key (tuple): Tuple of the base url, user, method name and arguments of the call.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._statistics["hits"] += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self._statistics["misses"] += 1
+            return None
+
+    def get_generation(self):
+        """
+        Returns a number that changes every time responses are invalidated.  Pass the number read before a call
+        is sent to put, so that the response is not kept if the cache was invalidated while it was in flight.
+        """
+        with self._lock:
+            return self._generation
+
+    def put(self, key, resp, generation=None):
+        """
+        Keeps a successful response for the time set for its method.
+
+        Args:
+            key (tuple): Tuple of the base url, user, method name and arguments of the call.
+            resp (requests.Response): Response of the call.
+            generation (int): (Optional) The result of get_generation from before the call was sent.
+        """
+        ttl = self.ttls.get(key[2], 0)
+        if ttl <= 0 or resp.status_code != 200:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, resp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._statistics["evictions"] += 1
+
+    def invalidate(self, base_url=None, method_names=None):
+        """
+        Removes cached responses.
+
+        Args:
+            base_url (str): (Optional) Only remove the responses from this server.
+            method_names (list): (Optional) Only remove the responses of these methods.
+        """
+        with self._lock:
+            self._generation += 1
+            for key in list(self._entries):
+                if (base_url is None or key[0] == base_url) and (method_names is None or key[2] in method_names):
+                    del self._entries[key]
+                    self._statistics["invalidations"] += 1
+
+    def clear(self):
+        """
+        Removes all cached responses.
+        """
+        self.invalidate()
+
+    def get_statistics(self):
+        """
+        Returns a dictionary with the number of cache "hits" and "misses", the number of responses removed for
+        space ("evictions") or by calls that change the server ("invalidations"), and the current "entries".
+        """
+        with self._lock:
+            return dict(self._statistics, entries=len(self._entries))
+
+
+def cached(method):
+    """
+    Decorates a client GET method so that its responses are kept in the client's response cache, if it has one.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = getattr(self, "response_cache", None)
+        if cache is None:
+            return method(self, *args, **kwargs)
+        key = (self.base_url, self.username, method.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            resp = cache.get(key)
+        except TypeError:
+            # Arguments that cannot be used as a key are not cached
+            return method(self, *args, **kwargs)
+        if resp is None:
+            generation = cache.get_generation()
+            resp = method(self, *args, **kwargs)
+            cache.put(key, resp, generation)
+        return resp
+    return wrapper
+
+
+def invalidates(*method_names):
+    """
+    Decorates a client method that changes the server so that the responses of the given methods
+    for that server are removed from the client's response cache after it is called.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                cache = getattr(self, "response_cache", None)
+                if cache is not None:
+                    cache.invalidate(self.base_url, method_names)
+        return wrapper
+    return decorator
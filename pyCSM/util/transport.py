@@ -0,0 +1,480 @@
+# Copyright (C) 2022 IBM CORPORATION
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+import copy
+import functools
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from pyCSM.util import json_backend
+
+properties = {
+    "pool_connections": 10,
+    "pool_maxsize": 10,
+    "keep_alive": True,
+    "max_retries": 0,
+    "timeout": None,
+    "chunk_size": 1024 * 1024,
+    "download_retries": 3,
+    "coalesce_gets": True,
+    "conditional_cache_size": 64,
+    "conditional_cache_bytes": 16 * 1024 * 1024
+}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+_validators = OrderedDict()
+_validators_lock = threading.Lock()
+_umask_lock = threading.Lock()
+_statistics = {"gets": 0, "coalesced_gets": 0, "not_modified": 0, "unchanged": 0}
+
+
+def get_properties():
+    """
+    Returns a dictionary of the current connection pool properties and
+    their values set for the file.
+    """
+    return properties
+
+
+def change_properties(property_dictionary):
+    """
+    Takes a dictionary of connection pool properties and the values that
+    user wants to change and changes them in the file.
+    Pools that are already open keep their settings until they are closed.
+
+    Args:
+        property_dictionary (dict): Dictionary of the keys and values that need
+        to be changed in the file.
+        ex. {"pool_maxsize": 20, "keep_alive": False, "chunk_size": 65536, "coalesce_gets": False}
+
+    Return:
+        Returns the new properties dictionary.
+    """
+    for key in property_dictionary:
+        properties[key] = property_dictionary[key]
+    return properties
+
+
+def _server_key(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class _noCookiesPolicy(DefaultCookiePolicy):
+    # The session is shared by every user of the server, so no cookie set for one user may be sent with
+    # the calls of another.  Calls are authorized by their X-Auth-Token header alone.
+
+    def set_ok(self, cookie, request):
+        return False
+
+    def return_ok(self, cookie, request):
+        return False
+
+
+def _new_session():
+    session = requests.Session()
+    session.cookies.set_policy(_noCookiesPolicy())
+    adapter = HTTPAdapter(pool_connections=properties["pool_connections"],
+                          pool_maxsize=properties["pool_maxsize"],
+                          max_retries=properties["max_retries"])
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not properties["keep_alive"]:
+        session.headers["Connection"] = "close"
+    session.hooks["response"].append(json_backend.response_hook)
+    return session
+
+
+def get_session(url):
+    """
+    Returns the pooled keep-alive session used for all calls to the CSM server in the given url.
+    One session is created per server (scheme, host and port) and shared by every service and client.
+    Since the session is shared by every user of the server, cookies sent by the server are never kept.
+
+    Args:
+        url (str): Any url on the csm server. ex. https://servername:port/CSM/web.
+
+    Returns:
+        The requests.Session object for the server.
+    """
+    key = _server_key(url)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _new_session()
+            _sessions[key] = session
+        return session
+
+
+def close(url=None):
+    """
+    Closes the pooled connections for the server in the given url, or for every server if no url is passed in.
+    A new pool is opened automatically the next time a call is made to a closed server.
+
+    Args:
+        url (str): (Optional) Any url on the csm server. ex. https://servername:port/CSM/web.
+    """
+    with _sessions_lock:
+        if url is None:
+            sessions = list(_sessions.values())
+            _sessions.clear()
+        else:
+            session = _sessions.pop(_server_key(url), None)
+            sessions = [session] if session is not None else []
+    for session in sessions:
+        session.close()
+
+
+def request(method, url, **kwargs):
+    """
+    Sends a REST request over the pooled session for the server.
+    Takes the same keyword arguments as requests.request.  If no timeout is passed in,
+    the "timeout" property is used (None waits indefinitely).
+
+    Args:
+        method (str): HTTP method.  ex. "GET"
+        url (str): url for the csm server and the rest call to run
+
+    Returns:
+        The requests.Response object for the call.
+    """
+    kwargs.setdefault("timeout", properties["timeout"])
+    return get_session(url).request(method, url, **kwargs)
+
+
+class _inFlightGet:
+    def __init__(self):
+        self.done = threading.Event()
+        self.resp = None
+        self.error = None
+
+
+def _get_key(url, kwargs):
+    # The auth token is in the headers, so calls for different users or tokens are never shared
+    headers = tuple(sorted((kwargs.get("headers") or {}).items()))
+    others = tuple(sorted((key, repr(value)) for key, value in kwargs.items() if key != "headers"))
+    return url, headers, others
+
+
+def _conditional_request(url, **kwargs):
+    headers = dict(kwargs.get("headers") or {})
+    # Users may be allowed to see different data, so the saved validators and response are kept per url and
+    # headers including the auth token.  A refreshed token starts over with a full response.
+    key = (url, tuple(sorted(headers.items())))
+    with _validators_lock:
+        saved = _validators.get(key)
+    if saved is not None and saved["resp"] is not None:
+        if saved["etag"] is not None:
+            headers["If-None-Match"] = saved["etag"]
+        if saved["last_modified"] is not None:
+            headers["If-Modified-Since"] = saved["last_modified"]
+    resp = request("GET", url, **dict(kwargs, headers=headers))
+    if resp.status_code == 304 and saved is not None and saved["resp"] is not None:
+        resp = copy.copy(saved["resp"])
+        resp.unchanged = True
+        with _validators_lock:
+            _statistics["not_modified"] += 1
+        return resp
+    resp.unchanged = False
+    if resp.status_code != 200:
+        return resp
+    content_hash = hashlib.sha256(resp.content).hexdigest()
+    resp.unchanged = saved is not None and saved["hash"] == content_hash
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    size = len(resp.content)
+    # The response is only needed to answer a 304, which the server can only send when it sent a validator
+    keep = (etag is not None or last_modified is not None) and size <= properties["conditional_cache_bytes"]
+    with _validators_lock:
+        if resp.unchanged:
+            _statistics["unchanged"] += 1
+        _validators[key] = {"etag": etag, "last_modified": last_modified, "hash": content_hash,
+                            "resp": resp if keep else None, "size": size if keep else 0}
+        _validators.move_to_end(key)
+        kept_bytes = sum(entry["size"] for entry in _validators.values())
+        while (len(_validators) > properties["conditional_cache_size"] or
+               kept_bytes > properties["conditional_cache_bytes"]):
+            kept_bytes -= _validators.popitem(last=False)[1]["size"]
+    return resp
+
+
+def get(url, conditional=False, **kwargs):
+    """
+    Sends a REST get call over the pooled session for the server.
+    While the "coalesce_gets" property is True, a get call made while an identical call (same url,
+    headers including the auth token, and arguments) is still waiting for the server does not send
+    a new request, and returns the same response object as the call already in flight.
+
+    A conditional call remembers a hash of the body of the last response for the url and headers, including
+    the auth token, for up to "conditional_cache_size" urls.  When the server sent an ETag or Last-Modified
+    validator, the response is remembered too, up to "conditional_cache_bytes" bytes of bodies for all urls
+    together, and later calls with the same token send If-None-Match and If-Modified-Since.  A 304 Not Modified
+    answer is returned as a copy of the remembered response.
+    The response has an "unchanged" attribute that is True when the body is the same as the last time,
+    either because the server answered 304 or because the body has the same hash, so the caller can
+    skip parsing it again.
+
+    Args:
+        url (str): url for the csm server and the rest call to run
+        conditional (boolean): True to send a conditional call.
+    """
+    send = _conditional_request if conditional else functools.partial(request, "GET")
+    if not properties["coalesce_gets"] or kwargs.get("stream"):
+        return send(url, **kwargs)
+    key = _get_key(url, dict(kwargs, conditional=conditional))
+    with _in_flight_lock:
+        _statistics["gets"] += 1
+        in_flight = _in_flight.get(key)
+        if in_flight is None:
+            in_flight = _in_flight[key] = _inFlightGet()
+            leader = True
+        else:
+            _statistics["coalesced_gets"] += 1
+            leader = False
+    if not leader:
+        in_flight.done.wait()
+        if in_flight.error is not None:
+            raise in_flight.error
+        return in_flight.resp
+    try:
+        in_flight.resp = send(url, **kwargs)
+        return in_flight.resp
+    except BaseException as e:
+        in_flight.error = e
+        raise
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+        in_flight.done.set()
+
+
+def get_statistics():
+    """
+    Returns a dictionary with the number of "gets" sent through get(), the number of them that
+    were "coalesced_gets", answered by an identical call already in flight instead of the server,
+    and the number of conditional calls answered "not_modified" by the server or found "unchanged"
+    by comparing the hash of the body.
+    """
+    with _in_flight_lock, _validators_lock:
+        return dict(_statistics)
+
+
+def put(url, **kwargs):
+    """
+    Sends a REST put call over the pooled session for the server.
+    """
+    return request("PUT", url, **kwargs)
+
+
+def post(url, **kwargs):
+    """
+    Sends a REST post call over the pooled session for the server.
+    """
+    return request("POST", url, **kwargs)
+
+
+def delete(url, **kwargs):
+    """
+    Sends a REST delete call over the pooled session for the server.
+    """
+    return request("DELETE", url, **kwargs)
+
+
+def download(url, file_name, chunk_size=None, callback=None, resume=False, checksum=None, **kwargs):
+    """
+    Sends a REST get call and streams the body of a successful response to a file in chunks,
+    so the whole download is never held in memory.  The body is written to a partial file
+    in the same directory which is renamed to file_name once the download is complete, so
+    file_name is never left partly written.  If the call fails, file_name is not touched.
+    The file keeps the permissions of the file it replaces, and a new file gets the default permissions.
+
+    In resume mode the partial file is kept as file_name + ".part" when the connection drops,
+    and the download is continued from the end of it with a Range request, up to the
+    "download_retries" property times in the same call or on a later call with the same file_name.
+    The ETag or Last-Modified validator of the download is kept in file_name + ".part.validator" and sent
+    as If-Range, so a file that changed on the server since the partial file was written is sent again in
+    full and the download starts over.  A partial file without a validator is never continued, and
+    servers that do not support ranges send the whole file again and the download starts over.
+
+    Args:
+        url (str): url for the csm server and the rest call to run
+        file_name (str): The file to write the body of the response to
+        chunk_size (int): (Optional) Number of bytes read at a time.  Defaults to the "chunk_size" property.
+        callback (function): (Optional) Called with (bytes_written, total_bytes) after each chunk is written.
+            total_bytes is None if the server did not send the length of the download.
+        resume (boolean): True to continue a partial download instead of starting over.
+        checksum (str): (Optional) Expected checksum of the whole file as "algorithm:hexdigest".
+            ex. "sha256:9f86d081884c7d65..."  A ValueError is raised if the file does not match.
+
+    Returns:
+        The requests.Response object for the last call.  The body of a successful response is in the file
+        and is not kept on the response.  The checksum of the file, computed while it is written, is set
+        on a successful response as resp.checksum in the format "algorithm:hexdigest" (sha256 unless
+        another algorithm was given in checksum).
+    """
+    chunk_size = chunk_size or properties["chunk_size"]
+    algorithm = checksum.split(":", 1)[0] if checksum is not None else "sha256"
+    if resume:
+        part_name = f"{file_name}.part"
+        retries = properties["download_retries"]
+        while True:
+            try:
+                resp = _download_part(url, part_name, chunk_size, callback, True, algorithm, kwargs)
+                break
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError):
+                if retries <= 0:
+                    raise
+                retries -= 1
+        if not resp.ok:
+            return resp
+    else:
+        directory, base_name = os.path.split(os.path.abspath(file_name))
+        fd, part_name = tempfile.mkstemp(dir=directory, prefix=f".{base_name}.", suffix=".part")
+        os.close(fd)
+        try:
+            resp = _download_part(url, part_name, chunk_size, callback, False, algorithm, kwargs)
+        except BaseException:
+            os.remove(part_name)
+            raise
+        if not resp.ok:
+            os.remove(part_name)
+            return resp
+    if checksum is not None and resp.checksum.lower() != checksum.lower():
+        os.remove(part_name)
+        _save_validator(part_name, None)
+        raise ValueError(f"Checksum of the download from {url} is {resp.checksum}, expected {checksum}")
+    os.chmod(part_name, _file_mode(file_name))
+    os.replace(part_name, file_name)
+    if resume:
+        _save_validator(part_name, None)
+    return resp
+
+
+def _file_mode(file_name):
+    # The partial file from mkstemp is only readable by the owner, so give the download the mode of the file
+    # it replaces, or the mode open() would have created it with
+    try:
+        return os.stat(file_name).st_mode & 0o7777
+    except FileNotFoundError:
+        pass
+    with _umask_lock:
+        umask = os.umask(0o022)
+        os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _validator(resp):
+    # If-Range only accepts a strong ETag, so a weak one falls back to Last-Modified
+    etag = resp.headers.get("ETag")
+    if etag is not None and not etag.startswith("W/"):
+        return etag
+    return resp.headers.get("Last-Modified")
+
+
+def _load_validator(part_name):
+    try:
+        with open(f"{part_name}.validator", "r") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _save_validator(part_name, validator):
+    validator_name = f"{part_name}.validator"
+    if validator is None:
+        if os.path.exists(validator_name):
+            os.remove(validator_name)
+        return
+    with open(validator_name, "w") as f:
+        f.write(validator)
+
+
+def _download_part(url, part_name, chunk_size, callback, resume, algorithm, kwargs):
+    offset = os.path.getsize(part_name) if resume and os.path.exists(part_name) else 0
+    validator = _load_validator(part_name) if offset else None
+    if offset and validator is None:
+        # Without a validator there is no way to know the partial file is still what the server has
+        os.remove(part_name)
+        offset = 0
+    headers = dict(kwargs.get("headers") or {})
+    if resume:
+        # Ranges are byte offsets into the body as sent, so ask for it unencoded
+        headers["Accept-Encoding"] = "identity"
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = validator
+    resp = request("GET", url, stream=True, **dict(kwargs, headers=headers))
+    try:
+        if offset and resp.status_code == 416:
+            # The partial file is not the start of what the server has now, so start over
+            os.remove(part_name)
+            resp.close()
+            return _download_part(url, part_name, chunk_size, callback, resume, algorithm, kwargs)
+        if not resp.ok:
+            # Read the error body so it is still available to the caller
+            resp.content
+            return resp
+        if offset and resp.status_code == 206:
+            start, total = _content_range(resp)
+            if start != offset or _validator(resp) not in (None, validator):
+                os.remove(part_name)
+                resp.close()
+                return _download_part(url, part_name, chunk_size, callback, resume, algorithm, kwargs)
+            mode = "ab"
+            digest = _hash_file(part_name, algorithm)
+        else:
+            # A 200 answer to If-Range is the whole file as it is now, so the partial file is replaced
+            offset = 0
+            mode = "wb"
+            digest = hashlib.new(algorithm)
+            if resume:
+                _save_validator(part_name, _validator(resp))
+            total = resp.headers.get("Content-Length")
+            if total is not None and resp.headers.get("Content-Encoding", "identity") == "identity":
+                total = int(total)
+            else:
+                total = None
+        written = offset
+        with open(part_name, mode) as f:
+            for chunk in resp.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                digest.update(chunk)
+                written += len(chunk)
+                if callback is not None:
+                    callback(written, total)
+        if total is not None and written != total:
+            raise requests.exceptions.ConnectionError(f"Download from {url} ended after {written} of {total} bytes")
+        resp.checksum = f"{algorithm}:{digest.hexdigest()}"
+    finally:
+        resp.close()
+    return resp
+
+
+def _content_range(resp):
+    # "bytes 100-999/1000" gives (100, 1000), the total is None if the server sent "*"
+    content_range = resp.headers.get("Content-Range", "")
+    try:
+        byte_range, total = content_range.split(" ", 1)[1].split("/")
+        start = int(byte_range.split("-")[0])
+    except (IndexError, ValueError):
+        return None, None
+    return start, None if total == "*" else int(total)
+
+
+def _hash_file(file_name, algorithm):
+    digest = hashlib.new(algorithm)
+    with open(file_name, "rb") as f:
+        for block in iter(lambda: f.read(properties["chunk_size"]), b""):
+            digest.update(block)
+    return digest
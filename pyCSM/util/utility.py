@@ -1,6 +1,12 @@
 # Copyright (C) 2022 IBM CORPORATION
 # Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
 
+import codecs
+import json
+import itertools
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+
 def add_query_params(url, params):
     # params is a list of dictionaries where each dictionary contains the param 'name' and 'value'
     valid_param_found = False
@@ -14,4 +20,199 @@ def add_query_params(url, params):
                 url = url + "?" + param_name + "=" + param_value
             valid_param_found = True
 
-    return url
\ No newline at end of file
+    return url
+
+
+def run_concurrently(func, items, max_workers=8):
+    """
+    Calls func once for each item on a bounded pool of worker threads.
+
+    Args:
+        func (function): Function that takes a single item.
+        items (list): Items to call the function with.
+        max_workers (int): Maximum number of calls running at the same time.
+
+    Returns:
+        A generator that yields a tuple of (item, result, error) as each call completes.
+        error is the exception raised by the call, or None if it succeeded.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(func, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                yield item, future.result(), None
+            except Exception as e:
+                yield item, None, e
+
+
+_end = object()
+
+
+def batched(items, batch_size):
+    """
+    Splits any iterable into lists of batch_size items, reading only one batch at a time.
+
+    Args:
+        items (iterable): Items to split, ex. a generator.
+        batch_size (int): Number of items in each list.  The last list may be shorter.
+
+    Returns:
+        A generator that yields the lists.
+    """
+    items = iter(items)
+    while True:
+        batch = list(itertools.islice(items, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def run_pipelined(func, items, max_in_flight=4):
+    """
+    Calls func once for each item on a pool of worker threads, reading the items lazily so that no more
+    than max_in_flight calls are running or waiting at a time.  Unlike run_concurrently, items can be
+    a generator of any length without all of them being held in memory.
+
+    Args:
+        func (function): Function that takes a single item.
+        items (iterable): Items to call the function with.
+        max_in_flight (int): Maximum number of calls running at the same time.
+
+    Returns:
+        A generator that yields a tuple of (item, result, error) as each call completes.
+        error is the exception raised by the call, or None if it succeeded.
+    """
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        in_flight = {}
+        items = iter(items)
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < max_in_flight:
+                item = next(items, _end)
+                if item is _end:
+                    exhausted = True
+                else:
+                    in_flight[executor.submit(func, item)] = item
+            if not in_flight:
+                return
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = in_flight.pop(future)
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, e
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class _jsonReader:
+    # Reads a JSON document from an iterable of bytes chunks, keeping only the part not parsed yet
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.position = 0
+        self.exhausted = False
+
+    def read_more(self):
+        if self.exhausted:
+            return False
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.exhausted = True
+            text = self.text_decoder.decode(b"", final=True)
+        else:
+            text = self.text_decoder.decode(chunk)
+        self.buffer = self.buffer[self.position:] + text
+        self.position = 0
+        return True
+
+    def peek(self):
+        # Returns the next character that is not whitespace, or None at the end of the document
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in " \t\r\n":
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.read_more():
+                return None
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in the JSON document but found {found!r}")
+        self.position += 1
+
+    def decode(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except ValueError:
+                if not self.read_more():
+                    raise
+                continue
+            # A number may continue in the next chunk, ex. "1" of "1.5", so wait for the separator after it
+            if ((end == len(self.buffer) or _is_number(value) and self.buffer[end] in "0123456789+-.eE")
+                    and self.read_more()):
+                continue
+            self.position = end
+            return value
+
+    def enter(self, key):
+        # Moves to the value of the key in the object at the current position, skipping the values before it
+        self.expect("{")
+        while True:
+            char = self.peek()
+            if char == ",":
+                self.position += 1
+                continue
+            if char == "}" or char is None:
+                return False
+            name = self.decode()
+            self.expect(":")
+            if name == key:
+                return True
+            self.decode()
+
+
+def iter_json_array(chunks, key=None):
+    """
+    Parses a JSON document incrementally and yields the elements of an array in it one at a time,
+    so a very large list never has to be held in memory.  The array is the whole document, or the
+    value at the given key path in it, ex. "data.volumes" for {"status": "success", "data": {"volumes": [...]}}
+
+    Args:
+        chunks (iterable): The document as an iterable of bytes chunks, ex. resp.iter_content(65536)
+        key: (Optional) Key path of the array when the document is an object, as a string with the
+            keys separated by "." or a list of keys.  ex. "data.volumes"
+
+    Returns:
+        A generator that yields each element of the array after it has been decoded.
+        A ValueError is raised if the document is an object and the key path is not in it.
+    """
+    reader = _jsonReader(chunks)
+    if reader.peek() != "[":
+        path = key.split(".") if isinstance(key, str) else list(key or [])
+        if not path:
+            raise ValueError("The JSON document is not an array and no key path of the array was given")
+        for name in path:
+            if not reader.enter(name):
+                raise ValueError(f"The JSON document has no array at {'.'.join(path)}")
+    reader.expect("[")
+    while True:
+        char = reader.peek()
+        if char == ",":
+            reader.position += 1
+            continue
+        if char == "]":
+            return
+        if char is None:
+            raise ValueError("JSON array is not terminated")
+        yield reader.decode()